@@ -3,17 +3,18 @@ import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
 import threading
 import cv2
-import numpy as np
 import mss
 import time
 import pyautogui
 import os
-import subprocess
 from PIL import Image, ImageTk
 import logging
 import pyaudio
-import wave
 import json
+import multiprocessing
+from recorder import (APP_AUDIO_DEVICE, AUDIO_CODECS, AUDIO_MODES, COMPOSITE_LAYOUTS, ENCODER_PRESETS, OUTPUT_MODES, VIDEO_ENCODERS, Compositor, FrameBus,
+                      FramePacer, MultiRecorder, TEST_TONE_DEVICE, create_capture_source, create_quality_controller, log_print,
+                      pulse_available, wrap_screenshot)
 try:
     import win32gui
     import win32con
@@ -29,19 +30,128 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def log_print(message, level="info"):
-    """Konsola çıktı veren ve log dosyasına yazan yardımcı fonksiyon."""
-    print(message)
-    if level == "error":
-        logging.error(message)
-    elif level == "warning":
-        logging.warning(message)
-    else:
-        logging.info(message)
-
 # MSS objesini thread'ler arasında güvenli bir şekilde paylaşmak için
 thread_local_data = threading.local()
 
+# settings.json'da audio_test_tone açıksa mikrofon listesine eklenen sanal cihaz
+TEST_TONE_LABEL = "Test Sinyali (440 Hz)"
+# Linux'ta PulseAudio/PipeWire varsa listeye eklenen, hariç tutulan uygulamaları dışarıda bırakan giriş
+APP_AUDIO_LABEL = "Uygulama Sesleri (hariç tutulanlar olmadan)"
+
+class PreviewRenderer:
+    """Önizlemeyi tek bir PhotoImage ve tek bir canvas öğesi üzerinde yerinde günceller.
+
+    PhotoImage yalnızca önizleme boyutu değiştiğinde yeniden oluşturulur, diğer
+    karelerde ``paste`` ile içeriği değiştirilir. Canvas boyutu ``<Configure>``
+    olayından alınır; worker thread Tk'ye boyut sormaz. Tk olay kuyruğu geride
+    kalırsa (önceki kare çizilmeden yenisi gelirse veya çizim gecikirse) önizleme
+    hızı düşürülür, kuyruk rahatladığında hedef hıza geri çıkılır.
+    """
+
+    MIN_FPS = 2
+    SELECTION_HEIGHT = 260
+
+    def __init__(self, canvas, target_fps, tag="preview_image"):
+        self.canvas = canvas
+        self.tag = tag
+        self.target_fps = max(self.MIN_FPS, target_fps)
+        self.current_fps = self.target_fps
+        self.canvas_width = max(1, int(canvas.cget("width")))
+        self.canvas_height = max(1, int(canvas.cget("height")))
+
+        self._lock = threading.Lock()
+        self._pending = None
+        self._submitted_at = 0.0
+        self._scheduled = False
+        self._photo = None
+        self._item = None
+        self._calm_frames = 0
+
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self.last_lag = 0.0
+
+    def on_configure(self, event):
+        """Canvas boyutu değiştiğinde (Tk thread'inde) çağrılır."""
+        self.canvas_width = max(1, event.width)
+        self.canvas_height = max(1, event.height)
+        self._place()
+
+    def target_size(self, img_w, img_h):
+        """Görüntüyü en-boy oranını koruyarak canvas'a sığdıran boyutu döndürür."""
+        aspect_ratio = img_w / img_h
+        if self.canvas_width / self.canvas_height > aspect_ratio:
+            new_h = self.canvas_height
+            new_w = int(new_h * aspect_ratio)
+        else:
+            new_w = self.canvas_width
+            new_h = int(new_w / aspect_ratio)
+        return max(1, new_w), max(1, new_h)
+
+    def submit(self, rgb):
+        """Worker thread'den yeni bir RGB kare verir; çizim Tk thread'inde yapılır."""
+        with self._lock:
+            if self._pending is not None:
+                # Önceki kare daha çizilmedi: Tk geride, bu kare onun yerine geçer
+                self.frames_skipped += 1
+                self._slow_down()
+            self._pending = rgb
+            self._submitted_at = time.monotonic()
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.canvas.after(0, self._render)
+
+    def _slow_down(self):
+        self.current_fps = max(self.MIN_FPS, self.current_fps * 0.75)
+        self._calm_frames = 0
+
+    def _adapt(self, lag):
+        self.last_lag = lag
+        if lag > 0.5 / self.current_fps:
+            with self._lock:
+                self._slow_down()
+            return
+        self._calm_frames += 1
+        # Yaklaşık bir saniye boyunca gecikme yoksa hızı kademeli olarak geri artır
+        if self.current_fps < self.target_fps and self._calm_frames >= self.current_fps:
+            self.current_fps = min(self.target_fps, self.current_fps * 1.25)
+            self._calm_frames = 0
+
+    def _render(self):
+        with self._lock:
+            rgb = self._pending
+            submitted_at = self._submitted_at
+            self._pending = None
+            self._scheduled = False
+        if rgb is None or not self.canvas.winfo_exists():
+            return
+        self._adapt(time.monotonic() - submitted_at)
+
+        image = Image.fromarray(rgb)
+        if self._photo is None or (self._photo.width(), self._photo.height()) != image.size:
+            # Boyut değişti: PhotoImage yeniden oluşturulur, canvas öğesi korunur
+            self._photo = ImageTk.PhotoImage(image)
+            if self._item is None:
+                self._item = self.canvas.create_image(0, 0, image=self._photo, anchor=tk.NW, tags=self.tag)
+                self.canvas.tag_lower(self._item)
+            else:
+                self.canvas.itemconfigure(self._item, image=self._photo)
+            self._place()
+        else:
+            self._photo.paste(image)
+        self.frames_rendered += 1
+
+    def _place(self):
+        """Önizleme öğesini seçim alanının altına ortalayarak taşır."""
+        if self._item is None or self._photo is None:
+            return
+        available_height = self.canvas_height - self.SELECTION_HEIGHT
+        x_offset = (self.canvas_width - self._photo.width()) // 2
+        y_offset = self.SELECTION_HEIGHT + max(-150, (available_height - self._photo.height()) // 2)
+        self.canvas.coords(self._item, x_offset, y_offset)
+
+
 class ScreenRecorderApp:
     def __init__(self, master):
         try:
@@ -75,6 +185,9 @@ class ScreenRecorderApp:
             helpmenu = tk.Menu(menubar, tearoff=0)
             helpmenu.add_command(label="Ayarlar", command=self.open_settings)
             helpmenu.add_command(label="Tam Ekran Aç/Kapat", command=self.toggle_fullscreen)
+            # Kayıt sırasında kare süreleri önizlemenin üstünde gösterilir
+            self.stats_overlay_var = tk.BooleanVar(value=False)
+            helpmenu.add_checkbutton(label="İstatistik Katmanı", variable=self.stats_overlay_var)
             helpmenu.add_separator()
             helpmenu.add_command(label="Yardım Merkezi", command=self.show_advanced_help)
             helpmenu.add_command(
@@ -94,19 +207,21 @@ class ScreenRecorderApp:
             self.recording = False
             self.output_directory = os.path.join(os.path.expanduser("~"), "EkranKayitlari")
             self.fps = 20
-            self.record_thread = None
-            self.audio_record_thread = None
-            self.out = None
-            self.audio_frames = []
-            self.audio_stream = None
-            self.p = None # PyAudio instance
+            self.p = None # PyAudio instance (yalnızca cihaz listesi için)
 
             # Ses kayıt ayarları
-            self.audio_format = pyaudio.paInt16
             self.audio_channels = 2 # Stereo
             self.audio_rate = 44100 # Örnekleme oranı (Hz)
             self.audio_chunk_size = 1024 # Ses verisi boyutu
 
+            # Kayıtlı ayarlar (kodlayıcı, halka tampon ve değişim tespiti kayıt motoruna aktarılır)
+            self.settings = self._load_settings()
+
+            # Kayıt motoru (seçilen her monitör ortak saatle kendi dosyasına kaydedilir)
+            self.recorder = None
+            # Uyarlamalı kalite denetleyicisi kayıtlar arasında korunur (düşürülen preset/ölçek sonraki kayıtta uygulanır)
+            self.quality_controller = None
+
             self.monitor_region = {"top": 0, "left": 0, "width": pyautogui.size().width, "height": pyautogui.size().height}
             self.is_selecting_region = False
             self.selection_rect_id = None
@@ -131,6 +246,10 @@ class ScreenRecorderApp:
             self.current_target = {'type': 'monitor', 'index': 0}  # Varsayılan: ilk monitor
             self.monitor_previews = []  # Önizleme canvas'ları için
             self.preview_update_thread = None
+
+            # Kayıt sırasında önizleme ekranı yeniden yakalamaz, kaydedicinin karelerine abone olur
+            self.frame_bus = FrameBus()
+            self.preview_fps = int(self.settings.get("preview_fps", 15))
             
             # Kayıt dizinini varsayılan olarak ayarla
             self.output_directory = os.path.join(os.path.expanduser("~"), "EkranKayitlari")
@@ -147,8 +266,10 @@ class ScreenRecorderApp:
             self._update_selection_ui()
             # Önizleme thread'ini başlat
             self._start_preview_thread()
+            self._update_stats_overlay()
 
             master.protocol("WM_DELETE_WINDOW", self.on_closing)
+            master.bind(f"<{self.settings.get('shortcut_replay', 'F10')}>", lambda e: self.save_replay())
 
             # Uygulama simgesi ayarı (icon.ico dosyası ile aynı dizinde olmalı)
             try:
@@ -160,10 +281,22 @@ class ScreenRecorderApp:
             log_print(f"ScreenRecorderApp başlatılırken hata oluştu: {e}", level="error")
             messagebox.showerror("Başlatma Hatası", f"Uygulama başlatılırken hata oluştu: {e}")
 
+    def _load_settings(self):
+        """settings/settings.json dosyasındaki kayıtlı ayarları okur."""
+        settings_path = os.path.join(os.path.dirname(__file__), "settings", "settings.json")
+        try:
+            with open(settings_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log_print(f"Ayarlar dosyası okunamadı: {e}", level="warning")
+            return {}
+
     def _detect_monitors(self):
         """Tüm monitörleri tespit eder."""
         try:
-            with mss.mss() as sct:
+            with create_capture_source(self.settings) as sct:
                 self.available_monitors = []
                 for i, monitor in enumerate(sct.monitors[1:], 1):  # İlk monitor (0) tüm ekranlar
                     self.available_monitors.append({
@@ -172,6 +305,15 @@ class ScreenRecorderApp:
                         'region': monitor,
                         'type': 'monitor'
                     })
+                if len(self.available_monitors) > 1:
+                    # Tüm monitörleri tek bir dosyada birleştiren kompozit hedef
+                    self.available_monitors.append({
+                        'index': 0,
+                        'name': 'Tüm Ekranlar',
+                        'region': sct.monitors[0],
+                        'type': 'monitor',
+                        'composite': True
+                    })
                 log_print(f"Tespit edilen monitor sayısı: {len(self.available_monitors)}")
         except Exception as e:
             log_print(f"Monitor tespitinde hata: {e}", level="error")
@@ -245,8 +387,8 @@ class ScreenRecorderApp:
                 except:
                     pass
             
-            # Ekran görüntüsü yakala
-            with mss.mss() as sct:
+            # Ekran görüntüsü yakala (ayarlardaki yakalama kaynağından)
+            with create_capture_source(self.settings) as sct:
                 screenshot = sct.grab(region)
                 img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
                 
@@ -319,7 +461,8 @@ class ScreenRecorderApp:
                 size_label.bind("<Button-1>", click_handler)
                 
                 # Seçili hedefi vurgula
-                is_selected = (self.current_target['type'] == target['type'] and 
+                is_selected = (self.current_target['type'] == target['type'] and
+                              bool(self.current_target.get('composite')) == bool(target.get('composite')) and 
                               ((target['type'] == 'monitor' and self.current_target.get('index') == target.get('index')) or
                                (target['type'] == 'window' and self.current_target.get('hwnd') == target.get('hwnd'))))
                 
@@ -358,6 +501,9 @@ class ScreenRecorderApp:
         """Kayıt hedefini seçer."""
         if target['type'] == 'monitor':
             self.current_target = {'type': 'monitor', 'index': target['index']}
+            if target.get('composite'):
+                # Yalnızca "Tüm Ekranlar" girişi kompozit kaydı seçer
+                self.current_target['composite'] = True
             self.monitor_region = target['region']
         else:  # window
             self.current_target = {'type': 'window', 'hwnd': target['hwnd']}
@@ -542,6 +688,12 @@ class ScreenRecorderApp:
         self.pause_button.pack(pady=10)
         self._add_button_hover_effect(self.pause_button, "#FF9800", "#F57C00")
 
+        # Anlık tekrar modunda kayıt sürerken tampondaki son saniyeleri dosyaya aktarır
+        self.replay_button = tk.Button(control_frame, text="💾 Anlık Tekrarı Kaydet", command=self.save_replay,
+                                       bg="#6A1B9A", fg="white", **button_style, state=tk.DISABLED)
+        self.replay_button.pack(pady=button_pady)
+        self._add_button_hover_effect(self.replay_button, "#8E24AA", "#6A1B9A")
+
         # FPS ayarı
         tk.Label(control_frame, text="FPS (Kare/Saniye):", font=("Helvetica", 13), bg=frame_bg_color).pack(pady=10)
         fps_options = (30, 60, 100, 120)
@@ -608,9 +760,11 @@ class ScreenRecorderApp:
         self.canvas_height = 700
         self.preview_canvas = tk.Canvas(preview_frame, width=self.canvas_width, height=self.canvas_height, bg="black", bd=0, highlightthickness=0)
         self.preview_canvas.pack(expand=True, fill=tk.BOTH)
+        self.preview_renderer = PreviewRenderer(self.preview_canvas, self.preview_fps)
+        self.preview_canvas.bind("<Configure>", self._on_preview_configure)
 
         monitor_list = []
-        with mss.mss() as sct:
+        with create_capture_source(self.settings) as sct:
             for idx, monitor in enumerate(sct.monitors[1:], start=1):
                 monitor_list.append(f"Ekran {idx}: {monitor['width']}x{monitor['height']}")
 
@@ -629,7 +783,7 @@ class ScreenRecorderApp:
 
         def set_selected_monitor(event=None):
             idx = monitor_combobox.current() + 1  # mss.monitors[1] ana ekran, [2] ikinci ekran vs.
-            with mss.mss() as sct:
+            with create_capture_source(self.settings) as sct:
                 monitor = sct.monitors[idx]
                 self.monitor_region = {
                     "top": monitor["top"],
@@ -637,6 +791,8 @@ class ScreenRecorderApp:
                     "width": monitor["width"],
                     "height": monitor["height"]
                 }
+            # Açıkça seçilen ekran önceki "Tüm Ekranlar" seçimini geçersiz kılar
+            self.current_target.pop('composite', None)
             self.region_info_label.config(text=f"Kayıt Alanı: Ekran {idx} ({monitor['width']}x{monitor['height']})", fg="purple")
             log_print(f"Kayıt alınacak ekran değiştirildi: {self.monitor_region}")
 
@@ -647,6 +803,15 @@ class ScreenRecorderApp:
         self.preview_canvas.bind("<ButtonRelease-1>", self._on_canvas_mouse_release)
         self.master.bind("<Escape>", self._cancel_canvas_selection)
 
+    def _on_preview_configure(self, event):
+        """Önizleme canvas'ı yeniden boyutlandığında boyutları günceller (Tk thread'i)."""
+        self.canvas_width = event.width
+        self.canvas_height = event.height
+        self.preview_renderer.on_configure(event)
+        # Disk uyarısını sağ üstte tut
+        if hasattr(self, 'disk_warning_label') and self.disk_warning_label:
+            self.preview_canvas.coords(self.disk_warning_label, self.canvas_width - 10, 10)
+
     def _get_audio_devices(self):
         """Sistemdeki mevcut ses giriş cihazlarını (mikrofonları) listeler."""
         devices = []
@@ -665,10 +830,20 @@ class ScreenRecorderApp:
         finally:
             # PyAudio instance'ı uygulamanın ömrü boyunca açık kalmalı, burada terminate etme
             pass 
+        if self.settings.get("audio_test_tone"):
+            # Mikrofonsuz deneme için sinüs sinyali üreten sanal cihaz
+            devices.append(TEST_TONE_LABEL)
+        if pulse_available():
+            # Ayarlardaki "Kayda alınmayacak uygulamalar" bu girişe uygulanır
+            devices.append(APP_AUDIO_LABEL)
         return devices
 
     def _get_microphone_index(self, mic_name):
         """Mikrofon adına göre indeksini döndürür."""
+        if mic_name == TEST_TONE_LABEL:
+            return TEST_TONE_DEVICE
+        if mic_name == APP_AUDIO_LABEL:
+            return APP_AUDIO_DEVICE
         try:
             if not self.p:
                 self.p = pyaudio.PyAudio()
@@ -709,47 +884,41 @@ class ScreenRecorderApp:
         """Ekranın canlı önizlemesini Canvas üzerinde gösteren döngü."""
         try:
             if not hasattr(thread_local_data, 'sct'):
-                thread_local_data.sct = mss.mss()
+                thread_local_data.sct = create_capture_source(self.settings)
             sct = thread_local_data.sct
         except Exception as e:
-            log_print(f"Önizleme thread'inde MSS başlatılırken hata: {e}", level="error")
+            log_print(f"Önizleme thread'inde yakalama kaynağı başlatılırken hata: {e}", level="error")
             self.master.after(0, lambda err_msg=str(e): self.status_label.config(text=f"Önizleme hatası: {err_msg}", fg="red"))
             return
 
+        renderer = self.preview_renderer
+        pacer = FramePacer(renderer.current_fps)
+        subscription = self.frame_bus.subscribe()
         while True:
             if not self.master.winfo_exists():
                 log_print("Ana pencere kapandı, önizleme thread'i durduruluyor.")
                 break
 
             try:
-                # Pencere boyutlandığında Canvas boyutlarını güncelle
-                self.canvas_width = self.preview_canvas.winfo_width()
-                self.canvas_height = self.preview_canvas.winfo_height()
-
-                # Seçilen hedefi kullan (tüm ekran yerine)
-                sct_img = sct.grab(self.monitor_region)
-                img = np.array(sct_img)
-                img = cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
-
-                img_h, img_w, _ = img.shape
-                aspect_ratio = img_w / img_h
-
-                if self.canvas_width / self.canvas_height > aspect_ratio:
-                    new_h = self.canvas_height
-                    new_w = int(new_h * aspect_ratio)
+                # Tk geride kaldıysa önizleme hızı düşürülmüş olabilir
+                if pacer.fps != renderer.current_fps:
+                    pacer = FramePacer(renderer.current_fps)
+                pacer.wait()
+
+                if self.recording and not self.paused:
+                    # Kayıt sırasında ikinci bir yakalama yapılmaz; kaydedicinin en son
+                    # yayınladığı kare alınır (ekran değişmediyse önizleme de değişmez)
+                    img = subscription.get(timeout=0.5)
+                    if img is None:
+                        continue
                 else:
-                    new_w = self.canvas_width
-                    new_h = int(new_w / aspect_ratio)
+                    # Seçilen hedefi kullan (tüm ekran yerine)
+                    img = wrap_screenshot(sct.grab(self.monitor_region))
 
+                img_h, img_w = img.shape[:2]
+                new_w, new_h = renderer.target_size(img_w, img_h)
                 preview_img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-
-                img_rgb = cv2.cvtColor(preview_img, cv2.COLOR_BGR2RGB)
-                img_pil = Image.fromarray(img_rgb)
-                img_tk = ImageTk.PhotoImage(image=img_pil)
-
-                self.master.after(0, self._update_canvas, img_tk)
-
-                time.sleep(1 / self.fps)
+                renderer.submit(cv2.cvtColor(preview_img, cv2.COLOR_BGRA2RGB))
 
             except mss.exception.ScreenShotError as e:
                 log_print(f"Önizleme ekranı yakalama hatası: {e}", level="error")
@@ -760,111 +929,12 @@ class ScreenRecorderApp:
                 self.master.after(0, lambda err_msg=str(e): self.status_label.config(text=f"Önizleme hatası: {err_msg}", fg="red"))
                 break
         
+        subscription.close()
         if hasattr(thread_local_data, 'sct'):
             thread_local_data.sct.close()
             del thread_local_data.sct
         log_print("Önizleme thread'i sonlandı.")
 
-    def _update_canvas(self, img_tk):
-        """Canvas üzerindeki görüntüyü günceller."""
-        if not self.master.winfo_exists():
-            return
-        
-        # Sadece ana önizleme görüntüsünü sil, seçim alanını koru
-        self.preview_canvas.delete("preview_image")
-        self.preview_canvas.delete("selection_rect")
-        
-        self.preview_canvas.image = img_tk
-        
-        # Ana önizleme görüntüsünü seçim alanının altına yerleştir
-        selection_height = 260
-        available_height = self.canvas_height - selection_height
-        
-        x_offset = (self.canvas_width - img_tk.width()) // 2
-        y_offset = selection_height + max(-150, (available_height - img_tk.height()) // 2)
-        
-        # Ana önizleme görüntüsünü oluştur
-        self.preview_canvas.create_image(x_offset, y_offset, image=img_tk, anchor=tk.NW, tags="preview_image")
-        
-        # Disk uyarısını sağ üste ekle
-        if hasattr(self, 'disk_warning_label') and self.disk_warning_label:
-            self.preview_canvas.coords(self.disk_warning_label, self.canvas_width - 10, 10)
-        
-        # Seçim frame'ini tekrar üste getir (eğer kayıp olduysa)
-        if hasattr(self, 'selection_window_id'):
-            self.preview_canvas.coords(self.selection_window_id, 0, 0)
-
-        # Eğer alan seçimi yapılıyorsa, Canvas üzerinde dikdörtgeni çiz
-        if self.is_selecting_region and self.start_x is not None and self.current_x is not None:
-            self.selection_rect_id = self.preview_canvas.create_rectangle(
-                self.start_x, self.start_y, self.current_x, self.current_y, 
-                outline="blue", width=2, dash=(5, 2), tags="selection_rect"
-            )
-
-    def _record_audio_thread(self, audio_filename, input_device_index):
-        """Mikrofondan ses kaydını yürüten thread fonksiyonu."""
-        log_print(f"Ses kaydı başlatılıyor: {audio_filename} (Cihaz Indeksi: {input_device_index})")
-        self.audio_frames = []
-        try:
-            # PyAudio instance'ı zaten ana thread'de başlatıldı, burada tekrar başlatmaya gerek yok.
-            # Ancak thread-safe olması için PyAudio objesini burada da kontrol edelim.
-            # Eğer self.p ana thread'de başlatıldıysa, bu thread'de de kullanılabilir olmalı.
-            # Bazı durumlarda PyAudio objesi thread'ler arasında doğrudan paylaşım sorunları yaşatabilir.
-            # En güvenli yol, her thread'in kendi PyAudio objesini oluşturmasıdır,
-            # ancak bu da kaynak tüketimini artırabilir.
-            # Şu anki thread_local_data yaklaşımı MSS için, PyAudio için de benzer bir durum olabilir.
-            # PyAudio'nun kendisi thread-safe olmayabilir.
-            # Basitlik adına, ana thread'deki self.p'yi kullanmaya devam edelim ve sorun çıkarsa değiştirelim.
-            
-            # Alternatif: Her thread kendi PyAudio objesini oluşturup kapatır
-            # p_local = pyaudio.PyAudio()
-            # stream_local = p_local.open(...)
-            # ...
-            # stream_local.close()
-            # p_local.terminate()
-
-            self.audio_stream = self.p.open(format=self.audio_format,
-                                            channels=self.audio_channels,
-                                            rate=self.audio_rate,
-                                            input=True,
-                                            frames_per_buffer=self.audio_chunk_size,
-                                            input_device_index=input_device_index)
-            
-            while self.recording:
-                if self.paused:
-                    time.sleep(0.1)
-                    continue
-                data = self.audio_stream.read(self.audio_chunk_size)
-                self.audio_frames.append(data)
-            
-            log_print("Ses akışı durduruldu.")
-            self.audio_stream.stop_stream()
-            self.audio_stream.close()
-
-            # Ses dosyasını kaydet
-            wf = wave.open(audio_filename, 'wb')
-            wf.setnchannels(self.audio_channels)
-            wf.setsampwidth(self.p.get_sample_size(self.audio_format))
-            wf.setframerate(self.audio_rate)
-            wf.writeframes(b''.join(self.audio_frames))
-            wf.close()
-            log_print(f"Ses dosyası kaydedildi: {audio_filename}")
-
-        except Exception as e:
-            log_print(f"Ses kaydı sırasında hata oluştu: {e}", level="error")
-            self.master.after(0, lambda: messagebox.showerror("Ses Kayıt Hatası", f"Ses kaydı sırasında hata oluştu: {e}"))
-            self.recording = False # Ses hatası olursa kaydı durdur
-        finally:
-            # Ses kaydı thread'i sonlandığında akışı kapat
-            try:
-                if self.audio_stream and hasattr(self.audio_stream, 'is_active') and self.audio_stream.is_active():
-                    self.audio_stream.stop_stream()
-                    self.audio_stream.close()
-            except:
-                pass
-            log_print("Ses kayıt thread'i sonlandı.")
-
-
     def start_recording(self):
         if not self.recording:
             self.fps = self.fps_var.get()
@@ -882,37 +952,88 @@ class ScreenRecorderApp:
                 messagebox.showwarning("Ses Kaydı Uyarısı", "Sistemde mikrofon bulunamadı. Sadece ekran kaydedilecek.")
                 microphone_index = -1
 
-            self.recording = True
-            self._update_button_states_on_record_start()
-            self.label.config(text="Kayıt Yapılıyor...", fg="red")
-
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             ext = self.format_var.get()
             self.current_record_filename_video = os.path.join(self.output_directory, f"ekran_kaydi_{timestamp}.{ext}")  # .mp4 uzantısı!
             self.current_record_filename_audio = os.path.join(self.output_directory, f"ses_kaydi_{timestamp}.wav")
-            
-            self.status_label.config(text=f"Video kaydediliyor: '{os.path.basename(self.current_record_filename_video)}'", fg="blue")
-            log_print(f"Video kaydı başlatılıyor: {self.current_record_filename_video}")
-
-            if hasattr(self, "selected_monitors") and self.selected_monitors:
-                for idx in self.selected_monitors:
-                    with mss.mss() as sct:
-                        monitor = sct.monitors[idx]
+            audio_device = microphone_index if microphone_index != -1 else None
+            if audio_device is not None:
+                # Ayarlarda seçilen ek girişler ana mikrofonla birlikte kaydedilir
+                devices = [audio_device]
+                for name in self.settings.get("extra_audio_devices", []):
+                    index = self._get_microphone_index(name)
+                    if index == -1:
+                        log_print(f"Ek ses girişi bulunamadı, atlanıyor: {name}", level="warning")
+                    elif index not in devices:
+                        devices.append(index)
+                if len(devices) > 1:
+                    audio_device = devices
+
+            track_position = None
+            compositor = None
+            if self.current_target.get('composite'):
+                # Tüm ekranlar tek çıktı karesinde birleştirilir
+                try:
+                    compositor = Compositor([m['region'] for m in self.available_monitors if not m.get('composite')],
+                                            layout=self.settings.get("composite_layout", "desktop"),
+                                            scale=float(self.settings.get("composite_scale", 1.0)))
+                except ValueError as e:
+                    messagebox.showerror("Kayıt Hatası", f"Kompozit kayıt ayarları geçersiz: {e}")
+                    return
+                log_print(f"Kompozit kayıt: {compositor.describe()}")
+                sources = [(self.current_record_filename_video, self.monitor_region)]
+            elif hasattr(self, "selected_monitors") and self.selected_monitors:
+                if self.settings.get("replay_buffer") and len(self.selected_monitors) > 1:
+                    messagebox.showerror("Kayıt Hatası", "Anlık tekrar tek bir kaynakla kullanılabilir. "
+                                                         "Tek monitör veya tüm ekranlar (kompozit) seçin.")
+                    return
+                sources = []
+                with create_capture_source(self.settings) as sct:
+                    for idx in self.selected_monitors:
                         # Her monitör için ayrı dosya adı oluştur
                         video_filename = os.path.join(self.output_directory, f"ekran_kaydi_monitor{idx}_{timestamp}.{ext}")
-                        # Her monitör için ayrı thread başlat
-                        threading.Thread(target=self._record_screen_thread, args=(monitor, video_filename)).start()
+                        sources.append((video_filename, sct.monitors[idx]))
             else:
-                # Tek monitör için eski sistem
-                self.record_thread = threading.Thread(target=self._record_screen_thread, args=(self.monitor_region, self.current_record_filename_video))
-                self.record_thread.start()
-
-            if microphone_index != -1:
-                log_print(f"Ses kaydı başlatılıyor: {self.current_record_filename_audio}")
-                self.audio_record_thread = threading.Thread(target=self._record_audio_thread, args=(self.current_record_filename_audio, microphone_index))
-                self.audio_record_thread.start()
+                sources = [(self.current_record_filename_video, self.monitor_region)]
+                track_position = self._tracked_window_position
+
+            quality = None
+            if self.settings.get("adaptive_quality"):
+                controller = self.quality_controller
+                if (controller is None or controller.fps != self.fps
+                        or controller.base_preset != self.settings.get("encoder_preset", "veryfast")):
+                    controller = create_quality_controller(self.settings, self.fps, on_change=self._on_quality_change)
+                    self.quality_controller = controller
+                quality = controller
+
+            # Ses, önizleme, pencere takibi ve uyarlamalı kalite ilk kaynağa bağlanır
+            self.recorder = MultiRecorder(
+                sources, fps=self.fps, settings=self.settings,
+                use_processes=bool(self.settings.get("capture_processes", True)),
+                on_error=self._on_recorder_error,
+                audio_device=audio_device, audio_filename=self.current_record_filename_audio,
+                audio_channels=self.audio_channels, audio_rate=self.audio_rate,
+                audio_chunk_size=self.audio_chunk_size, frame_bus=self.frame_bus,
+                track_position=track_position, compositor=compositor, quality=quality)
+            try:
+                self.recorder.start()
+            except Exception as e:
+                log_print(f"Kayıt başlatılamadı: {e}", level="error")
+                self.recorder = None
+                messagebox.showerror("Kayıt Hatası", f"Kayıt başlatılamadı: {e}\nDosya yolu veya codec sorunu olabilir.")
+                return
+            self.current_record_filename_video = self.recorder.filename
+
+            self.recording = True
+            self.paused = False
+            self._update_button_states_on_record_start()
+            self.label.config(text="Kayıt Yapılıyor...", fg="red")
+            
+            if self.settings.get("replay_buffer"):
+                self.status_label.config(text=f"Anlık tekrar tamponu: son {self.settings.get('replay_buffer_seconds', 30)} sn "
+                                              f"({self.settings.get('shortcut_replay', 'F10')} ile kaydedin)", fg="blue")
             else:
-                self.audio_record_thread = None # Ses kaydı yapılmayacaksa thread'i None yap
+                self.status_label.config(text=f"Video kaydediliyor: '{os.path.basename(self.current_record_filename_video)}'", fg="blue")
 
             # Kayıt süresi ayarı (varsa)
             if hasattr(self, 'record_duration_var') and self.record_duration_var.get() > 0:
@@ -921,120 +1042,119 @@ class ScreenRecorderApp:
         else:
             messagebox.showwarning("Uyarı", "Kayıt zaten devam ediyor!")
 
+    def _tracked_window_position(self):
+        """Pencere kaydında pencerenin güncel (left, top) konumunu döndürür (kayıt thread'inden çağrılır)."""
+        if self.current_target['type'] == 'window' and WIN32_AVAILABLE:
+            try:
+                hwnd = self.current_target['hwnd']
+                if win32gui.IsWindow(hwnd):
+                    rect = win32gui.GetWindowRect(hwnd)
+                    return rect[0], rect[1]
+            except Exception:
+                pass
+        return None
+
+    def _on_recorder_error(self, message):
+        """Kayıt motorundaki hatayı Tk thread'ine aktarır ve kaydı durdurur."""
+        def show():
+            messagebox.showerror("Kayıt Hatası", f"{message}. Kayıt durduruldu.")
+            if self.recording:
+                self.stop_recording()
+        self.master.after(0, show)
+
+    def _update_stats_overlay(self):
+        """Kayıt metriklerini önizlemenin sol üst köşesinde gösterir (yarım saniyede bir)."""
+        self.preview_canvas.delete("stats_overlay")
+        metrics = self.recorder.metrics if self.recorder is not None else None
+        if self.stats_overlay_var.get() and metrics is not None:
+            self.preview_canvas.create_text(10, 10, anchor="nw", text="\n".join(metrics.summary_lines()),
+                                            fill="#00FF66", font=("Consolas", 10), tags="stats_overlay")
+            self.preview_canvas.tag_raise("stats_overlay")
+        self.master.after(500, self._update_stats_overlay)
+
+    def _on_quality_change(self, controller):
+        """Uyarlamalı kalite ayarını durum satırında gösterir (kayıt thread'inden çağrılır)."""
+        text = (f"Uyarlamalı kalite: etkin {controller.effective_fps:g} FPS (hedef {controller.fps}), "
+                f"sonraki kayıt: {controller.preset}, ölçek {controller.scale:g}")
+        self.master.after(0, lambda: self.status_label.config(text=text, fg="orange"))
+
+    def save_replay(self):
+        """Anlık tekrar tamponundaki son saniyeleri kayıt dizinine aktarır (kısayol veya buton)."""
+        recorder = self.recorder
+        if not self.recording or recorder is None or not self.settings.get("replay_buffer"):
+            return
+        path = os.path.join(self.output_directory, f"anlik_tekrar_{time.strftime('%Y%m%d_%H%M%S')}.{self.format_var.get()}")
+
+        def run():
+            returncode, stderr, saved = recorder.save_replay(path)
+            if returncode == 0:
+                text, color = f"Anlık tekrar kaydedildi: '{os.path.basename(saved)}'", "green"
+            else:
+                text, color = f"Anlık tekrar kaydedilemedi: {stderr[:120]}", "red"
+            self.master.after(0, lambda: self.status_label.config(text=text, fg=color))
+        # Birleştirme kısa sürer ama Tk thread'ini bekletmesin
+        threading.Thread(target=run, daemon=True).start()
+
     def stop_recording(self):
         if self.recording:
             self.recording = False
             self.label.config(text="Durduruluyor...", fg="orange")
             self.status_label.config(text="Lütfen bekleyiniz, kayıtlar sonlandırılıyor...", fg="orange")
-            log_print("Kayıt durdurma sinyali gönderildi.")
-
-            # Video thread'inin bitmesini bekle
-            if self.record_thread and self.record_thread.is_alive():
-                log_print("Video kayıt thread'inin bitmesi bekleniyor...")
-                self.record_thread.join(timeout=10)
-                if self.record_thread.is_alive():
-                    log_print("Uyarı: Video kayıt thread'i zaman aşımına uğradı.", level="warning")
-                else:
-                    log_print("Video kayıt thread'i başarıyla sonlandı.")
-
-            # Ses thread'inin bitmesini bekle
-            if self.audio_record_thread and self.audio_record_thread.is_alive():
-                log_print("Ses kayıt thread'inin bitmesi bekleniyor...")
-                self.audio_record_thread.join(timeout=10)
-                if self.audio_record_thread.is_alive():
-                    log_print("Uyarı: Ses kayıt thread'i zaman aşımına uğradı.", level="warning")
-                else:
-                    log_print("Ses kayıt thread'i başarıyla sonlandı.")
 
-            # Video ve ses dosyalarını birleştir
-            if (hasattr(self, 'current_record_filename_video') and self.current_record_filename_video and 
-                hasattr(self, 'current_record_filename_audio') and self.current_record_filename_audio and 
-                os.path.exists(self.current_record_filename_video) and os.path.exists(self.current_record_filename_audio)):
-                
-                self.status_label.config(text="Video ve ses birleştiriliyor...", fg="orange")
-                log_print("Video ve ses dosyaları birleştiriliyor...")
-                
-                # Birleştirme işlemini ayrı thread'de yap
-                threading.Thread(target=self._merge_audio_video_thread).start()
-            else:
-                self._finalize_recording()
+            # Thread'lerin bitmesi ve dosyanın tamamlanması (gerekirse birleştirme) ayrı thread'de beklenir
+            threading.Thread(target=self._finish_recording_thread, args=(self.recorder,)).start()
+            self.recorder = None
         else:
             messagebox.showwarning("Uyarı", "Zaten kayıt yapılmıyor!")
 
-    def _merge_audio_video_thread(self):
-        """Video ve ses dosyalarını birleştiren thread fonksiyonu."""
-        try:
-            video_path = self.current_record_filename_video
-            audio_path = self.current_record_filename_audio
-            
-            # Geçici dosya adı oluştur
-            base_name = os.path.splitext(video_path)[0]
-            temp_output = base_name + "_temp.mp4"
-            
-            # FFmpeg komutu
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,  # Video girişi
-                '-i', audio_path,  # Ses girişi
-                '-c:v', 'copy',    # Video codec'ini kopyala (yeniden encode etme)
-                '-c:a', 'aac',     # Ses codec'i AAC
-                '-strict', 'experimental',
-                '-y',              # Dosya varsa üzerine yaz
-                temp_output
-            ]
-            
-            log_print(f"FFmpeg komutu çalıştırılıyor: {' '.join(cmd)}")
-            
-            # FFmpeg'i çalıştır
-            result = subprocess.run(cmd, capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            if result.returncode == 0:
-                # Başarılı - orijinal video dosyasını sil ve temp dosyayı yeniden adlandır
-                if os.path.exists(video_path):
-                    os.remove(video_path)
-                os.rename(temp_output, video_path)
-                
-                # Ses dosyasını sil
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
-                    log_print(f"Geçici ses dosyası silindi: {audio_path}")
-                
-                log_print(f"Video ve ses başarıyla birleştirildi: {video_path}")
-                self.master.after(0, self._finalize_recording)
-            else:
-                # Hata durumunda
-                log_print(f"FFmpeg hatası: {result.stderr}", level="error")
-                # Temp dosyayı sil
-                if os.path.exists(temp_output):
-                    os.remove(temp_output)
-                
-                # Kullanıcıya hata bildir ve ayrı dosyaları koru
-                self.master.after(0, lambda: messagebox.showwarning(
-                    "Birleştirme Hatası", 
+    def _finish_recording_thread(self, recorder):
+        """Kayıt motorunu durdurup dosyaların tamamlanmasını bekleyen thread fonksiyonu."""
+        results = recorder.stop(timeout=60)
+        self.master.after(0, self._show_recording_results, results)
+
+    def _show_recording_results(self, results):
+        """Kodlayıcı ve birleştirme sorunlarını kullanıcıya bildirir, kaydı sonlandırır."""
+        for result in results:
+            if result.get("replays") is not None:
+                # Anlık tekrar modunda kalıcı video yoktur; yalnızca kaydedilen tekrarlar bildirilir
+                if result["replays"]:
+                    messagebox.showinfo("Anlık Tekrar", f"{len(result['replays'])} anlık tekrar kaydedildi:\n" +
+                                        "\n".join(os.path.basename(path) for path in result["replays"]))
+                continue
+            if result["audio"]:
+                # Ses kayıt sırasında sıkıştırıldıysa ayrı kalan dosyanın uzantısı farklıdır
+                self.current_record_filename_audio = result["audio"]
+            if result["encoder_error"] is not None:
+                messagebox.showwarning(
+                    "Kayıt Hatası",
+                    f"Kodlayıcı kaydı tamamlarken hata verdi. Dosya eksik olabilir.\n\n"
+                    f"Video: {os.path.basename(result['video'])}\n\n"
+                    f"FFmpeg hatası: {result['encoder_error'][:200]}..."
+                )
+            if result.get("segments"):
+                # Parçalar kaybolmaz; dizin dosyası daha sonra "python -m recorder --finalize" ile birleştirilebilir
+                messagebox.showwarning(
+                    "Parçalar Birleştirilemedi",
+                    f"Kayıt {len(result['segments'])} parça olarak korundu:\n"
+                    f"{os.path.dirname(result['segments'][0])}\n\n"
+                    f"İlk parça: {os.path.basename(result['segments'][0])}"
+                )
+            if result["ffmpeg_missing"]:
+                messagebox.showerror(
+                    "FFmpeg Bulunamadı",
+                    "FFmpeg bulunamadı. Video ve ses ayrı dosyalar olarak kaydedildi.\n\n"
+                    "FFmpeg'i indirmek için: https://ffmpeg.org/download.html"
+                )
+            elif result["merge_error"] is not None:
+                messagebox.showwarning(
+                    "Birleştirme Hatası",
                     f"Video ve ses birleştirilemedi. Dosyalar ayrı ayrı kaydedildi.\n\n"
-                    f"Video: {os.path.basename(video_path)}\n"
-                    f"Ses: {os.path.basename(audio_path)}\n\n"
-                    f"FFmpeg hatası: {result.stderr[:200]}..."
-                ))
-                self.master.after(0, self._finalize_recording)
-                
-        except FileNotFoundError:
-            log_print("FFmpeg bulunamadı. Lütfen FFmpeg'in sistem PATH'inde olduğundan emin olun.", level="error")
-            self.master.after(0, lambda: messagebox.showerror(
-                "FFmpeg Bulunamadı", 
-                "FFmpeg bulunamadı. Video ve ses ayrı dosyalar olarak kaydedildi.\n\n"
-                "FFmpeg'i indirmek için: https://ffmpeg.org/download.html"
-            ))
-            self.master.after(0, self._finalize_recording)
-        except Exception as e:
-            log_print(f"Birleştirme sırasında beklenmeyen hata: {e}", level="error")
-            self.master.after(0, lambda: messagebox.showerror(
-                "Birleştirme Hatası", 
-                f"Video ve ses birleştirilemedi: {e}\n\n"
-                f"Dosyalar ayrı ayrı kaydedildi."
-            ))
-            self.master.after(0, self._finalize_recording)
-    
+                    f"Video: {os.path.basename(result['video'])}\n"
+                    f"Ses: {os.path.basename(result['audio'])}\n\n"
+                    f"FFmpeg hatası: {result['merge_error'][:200]}..."
+                )
+        self._finalize_recording()
+
     def _finalize_recording(self):
         """Kayıt işlemini sonlandırır ve kullanıcıya bilgi verir."""
         self._update_button_states_on_record_stop()
@@ -1109,112 +1229,6 @@ class ScreenRecorderApp:
             font=("Arial", 12, "bold"), anchor="ne", tags="disk_warning"
         )
 
-    def _record_screen_thread(self, monitor_to_record, video_filename):
-        """Kayıt işlemini yürüten thread fonksiyonu."""
-        try:
-            if not hasattr(thread_local_data, 'sct'):
-                thread_local_data.sct = mss.mss()
-            sct = thread_local_data.sct
-        except Exception as e:
-            log_print(f"Kayıt thread'inde MSS başlatılırken hata: {e}", level="error")
-            messagebox.showerror("Kayıt Hatası", f"MSS başlatılırken hata oluştu: {e}. Kayıt başlatılamadı.")
-            self.recording = False
-            self.master.after(0, self._update_button_states_on_record_stop)
-            self.master.after(0, lambda: self.label.config(text="Hata!", fg="red"))
-            self.master.after(0, lambda: self.status_label.config(text="Kayıt başlatılamadı.", fg="red"))
-            return
-
-        monitor_to_record = self.monitor_region
-        
-        video_width = monitor_to_record['width']
-        video_height = monitor_to_record['height']
-
-        if video_width <= 0 or video_height <= 0:
-            log_print(f"Hata: Geçersiz kayıt alanı boyutları: Genişlik={video_width}, Yükseklik={video_height}", level="error")
-            messagebox.showerror("Kayıt Hatası", "Geçersiz kayıt alanı boyutları. Kayıt başlatılamadı.")
-            self.recording = False
-            self.master.after(0, self._update_button_states_on_record_stop)
-            self.master.after(0, lambda: self.label.config(text="Hata!", fg="red"))
-            self.master.after(0, lambda: self.status_label.config(text="Kayıt başlatılamadı (geçersiz alan).", fg="red"))
-            return
-
-        ext = self.format_var.get()
-        if ext == 'mp4':
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        else:
-            fourcc = cv2.VideoWriter_fourcc(*'XVID')
-        
-        # Ses ile birlikte kayıt için fourcc ayarla
-        try:
-            self.out = cv2.VideoWriter(video_filename, fourcc, self.fps, (video_width, video_height), True)
-        except Exception as e:
-            log_print(f"Video yazıcısı oluşturulurken hata: {e}", level="error")
-            messagebox.showerror("Kayıt Hatası", f"Video yazıcısı oluşturulurken hata oluştu: {e}\nDosya yolu veya codec sorunu olabilir.")
-            self.recording = False
-            self.master.after(0, self._update_button_states_on_record_stop)
-            self.master.after(0, lambda: self.label.config(text="Hata!", fg="red"))
-            self.master.after(0, lambda: self.status_label.config(text="Kayıt başlatılamadı.", fg="red"))
-            return
-
-        if not self.out.isOpened():
-            log_print(f"Hata: Video yazıcısı açılamadı. Dosya: {self.current_record_filename_video}", level="error")
-            messagebox.showerror("Kayıt Hatası", f"Video yazıcısı açılamadı. '{self.current_record_filename_video}' yazılabilir mi veya codec destekleniyor mu?")
-            self.recording = False
-            self.master.after(0, self._update_button_states_on_record_stop)
-            self.master.after(0, lambda: self.label.config(text="Hata!", fg="red"))
-            self.master.after(0, lambda: self.status_label.config(text="Kayıt başlatılamadı.", fg="red"))
-            return
-        
-        log_print("Video yazıcısı başarıyla açıldı.")
-
-        while self.recording:
-            if self.paused:
-                time.sleep(0.1)
-                continue
-            try:
-                # Pencere seçildiyse pencere konumunu güncelle
-                if self.current_target['type'] == 'window' and WIN32_AVAILABLE:
-                    try:
-                        hwnd = self.current_target['hwnd']
-                        if win32gui.IsWindow(hwnd):
-                            rect = win32gui.GetWindowRect(hwnd)
-                            monitor_to_record = {
-                                'top': rect[1], 
-                                'left': rect[0], 
-                                'width': rect[2] - rect[0], 
-                                'height': rect[3] - rect[1]
-                            }
-                    except:
-                        pass
-                
-                sct_img = sct.grab(monitor_to_record)
-                img = np.array(sct_img)
-                img = cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
-                self.out.write(img)
-                time.sleep(1 / self.fps)
-            except mss.exception.ScreenShotError as e:
-                log_print(f"Ekran yakalama hatası (kayıt thread): {e}", level="error")
-                messagebox.showerror("Hata", f"Ekran yakalama hatası: {e}. Kayıt durduruldu.")
-                self.recording = False
-                self.master.after(0, self.stop_recording)
-                break
-            except Exception as e:
-                log_print(f"Beklenmeyen hata (kayıt thread): {e}", level="error")
-                messagebox.showerror("Hata", f"Beklenmeyen hata oluştu: {e}. Kayıt durduruldu.")
-                self.recording = False
-                self.master.after(0, self.stop_recording)
-                break
-
-        if self.out:
-            self.out.release()
-            self.out = None
-            log_print("Video yazıcısı serbest bırakıldı.")
-        
-        if hasattr(thread_local_data, 'sct'):
-            thread_local_data.sct.close()
-            del thread_local_data.sct
-        log_print("Kayıt thread'i sonlandı.")
-
     # Kayıt dizini seçme işlemi ana ekrana taşındığı için bu fonksiyonun adı değişti.
     def _select_output_directory_from_main(self):
         """Kayıt dizinini değiştirmek için dosya diyaloğu açar (ana ekrandan)."""
@@ -1328,6 +1342,8 @@ class ScreenRecorderApp:
             log_print("Geçersiz seçim (boyut çok küçük), kayıt alanı tüm ekrana sıfırlandı.", level="warning")
         elif width > 0 and height > 0:
             self.monitor_region = {"top": real_y1, "left": real_x1, "width": width, "height": height}
+            # Çizilen alan kompozit kayıt yerine bu bölgeyle kaydedilir
+            self.current_target.pop('composite', None)
             self.region_info_label.config(text=f"Kayıt Alanı: Sol: {real_x1}, Üst: {real_y1}, Genişlik: {width}, Yükseklik: {height}", fg="purple")
             messagebox.showinfo("Kayıt Alanı", f"Ekran kayıt alanı seçildi:\nSol: {real_x1}, Üst: {real_y1}\nGenişlik: {width}, Yükseklik: {height}")
             log_print(f"Seçilen gerçek kayıt alanı: {self.monitor_region}")
@@ -1367,6 +1383,8 @@ class ScreenRecorderApp:
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.pause_button.config(state=tk.NORMAL)  # Duraklat butonunu aktif et
+        if self.settings.get("replay_buffer"):
+            self.replay_button.config(state=tk.NORMAL)
         self.fps_spinbox.config(state=tk.DISABLED)
         self.microphone_combobox.config(state=tk.DISABLED)
         self.dir_entry.config(state=tk.DISABLED)
@@ -1384,6 +1402,7 @@ class ScreenRecorderApp:
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.pause_button.config(state=tk.DISABLED)  # Duraklat butonunu pasif et
+        self.replay_button.config(state=tk.DISABLED)
         self.fps_spinbox.config(state=tk.NORMAL)
         self.microphone_combobox.config(state="readonly")
         self.dir_entry.config(state=tk.NORMAL)
@@ -1399,6 +1418,11 @@ class ScreenRecorderApp:
 
     def toggle_pause(self):
         self.paused = not self.paused
+        if self.recorder:
+            if self.paused:
+                self.recorder.pause()
+            else:
+                self.recorder.resume()
         if self.paused:
             self.pause_button.config(text="Devam Et", bg="#2196F3")
             self.label.config(text="Kayıt Duraklatıldı", fg="orange")
@@ -1416,10 +1440,9 @@ class ScreenRecorderApp:
         if self.recording:
             if messagebox.askokcancel("Çıkış", "Kayıt devam ediyor. Çıkmak istiyor musunuz?"):
                 self.recording = False
-                if self.record_thread and self.record_thread.is_alive():
-                    self.record_thread.join(timeout=2)
-                if self.audio_record_thread and self.audio_record_thread.is_alive():
-                    self.audio_record_thread.join(timeout=2)
+                if self.recorder:
+                    self.recorder.stop(timeout=10)
+                    self.recorder = None
                 
                 if self.p:
                     self.p.terminate()
@@ -1531,7 +1554,7 @@ class ScreenRecorderApp:
     def open_settings(self):
         settings_win = tk.Toplevel(self.master)
         settings_win.title("Ayarlar")
-        settings_win.geometry("520x650")
+        settings_win.geometry("520x1200")
         tk.Label(settings_win, text="Ayarlar", font=("Helvetica", 16, "bold")).pack(pady=10)
 
         # Uygulama sesi hariç tutma
@@ -1590,42 +1613,175 @@ class ScreenRecorderApp:
         self.shortcut_screen_var = tk.StringVar(value="F7")
         tk.Entry(shortcut_frame, textvariable=self.shortcut_screen_var, width=10).grid(row=2, column=1, padx=5)
 
+        tk.Label(shortcut_frame, text="Anlık Tekrarı Kaydet:", font=("Helvetica", 12)).grid(row=3, column=0, sticky="w")
+        self.shortcut_replay_var = tk.StringVar(value=self.settings.get("shortcut_replay", "F10"))
+        tk.Entry(shortcut_frame, textvariable=self.shortcut_replay_var, width=10).grid(row=3, column=1, padx=5)
+
         # Kayıt formatı ayarı
         tk.Label(settings_win, text="Kayıt Formatı:", font=("Helvetica", 12)).pack(pady=10)
         self.format_var = tk.StringVar(value="mp4")
         tk.OptionMenu(settings_win, self.format_var, "mp4", "avi", "mkv").pack(pady=5)
 
+        # Çökmeye dayanıklı çıktı: parçalı dosya veya ayrı parçalar + dizin (kayıt sonunda birleştirilir)
+        output_mode_frame = tk.Frame(settings_win)
+        output_mode_frame.pack(pady=5)
+        tk.Label(output_mode_frame, text="Çıktı modu:", font=("Helvetica", 11)).pack(side=tk.LEFT)
+        self.output_mode_var = tk.StringVar(value=self.settings.get("output_mode", "single"))
+        tk.OptionMenu(output_mode_frame, self.output_mode_var, *OUTPUT_MODES).pack(side=tk.LEFT, padx=5)
+        tk.Label(output_mode_frame, text="Parça (sn):", font=("Helvetica", 11)).pack(side=tk.LEFT)
+        self.output_segment_seconds_var = tk.DoubleVar(value=float(self.settings.get("output_segment_seconds", 10.0)))
+        tk.Spinbox(output_mode_frame, from_=1, to=600, textvariable=self.output_segment_seconds_var,
+                   width=5).pack(side=tk.LEFT, padx=5)
+
+        # Uyarlamalı kalite: yük altında etkin kare hızı düşer, preset/ölçek sonraki kayıtta hafifler
+        adaptive_frame = tk.Frame(settings_win)
+        adaptive_frame.pack(pady=5)
+        self.adaptive_quality_var = tk.BooleanVar(value=bool(self.settings.get("adaptive_quality", False)))
+        tk.Checkbutton(adaptive_frame, text="Uyarlamalı kalite", variable=self.adaptive_quality_var,
+                       font=("Helvetica", 11)).pack(side=tk.LEFT)
+        tk.Label(adaptive_frame, text="En düşük FPS:", font=("Helvetica", 11)).pack(side=tk.LEFT)
+        self.adaptive_min_fps_var = tk.IntVar(value=int(self.settings.get("adaptive_min_fps", 10)))
+        tk.Spinbox(adaptive_frame, from_=5, to=60, textvariable=self.adaptive_min_fps_var,
+                   width=5).pack(side=tk.LEFT, padx=5)
+
+        # Anlık tekrar: kayıt yalnızca dairesel bir tamponda tutulur, kısayolla son saniyeler kaydedilir
+        replay_frame = tk.Frame(settings_win)
+        replay_frame.pack(pady=5)
+        self.replay_buffer_var = tk.BooleanVar(value=bool(self.settings.get("replay_buffer", False)))
+        tk.Checkbutton(replay_frame, text="Anlık tekrar tamponu", variable=self.replay_buffer_var,
+                       font=("Helvetica", 11)).pack(side=tk.LEFT)
+        tk.Label(replay_frame, text="Süre (sn):", font=("Helvetica", 11)).pack(side=tk.LEFT)
+        self.replay_buffer_seconds_var = tk.IntVar(value=int(self.settings.get("replay_buffer_seconds", 30)))
+        tk.Spinbox(replay_frame, from_=5, to=600, textvariable=self.replay_buffer_seconds_var,
+                   width=5).pack(side=tk.LEFT, padx=5)
+
+        # Video kodlayıcı ayarları (CPU ve dosya boyutu arasındaki denge)
+        tk.Label(settings_win, text="Video Kodlayıcı:", font=("Helvetica", 12)).pack(pady=(10, 0))
+        encoder_frame = tk.Frame(settings_win)
+        encoder_frame.pack(pady=5)
+
+        self.video_encoder_var = tk.StringVar(value=self.settings.get("video_encoder", "libx264"))
+        tk.OptionMenu(encoder_frame, self.video_encoder_var, *VIDEO_ENCODERS).grid(row=0, column=0, columnspan=2, pady=2)
+
+        tk.Label(encoder_frame, text="Preset:", font=("Helvetica", 11)).grid(row=1, column=0, sticky="w")
+        self.encoder_preset_var = tk.StringVar(value=self.settings.get("encoder_preset", "veryfast"))
+        tk.OptionMenu(encoder_frame, self.encoder_preset_var, *ENCODER_PRESETS).grid(row=1, column=1, sticky="w")
+
+        tk.Label(encoder_frame, text="CRF (kalite):", font=("Helvetica", 11)).grid(row=2, column=0, sticky="w")
+        self.encoder_crf_var = tk.IntVar(value=int(self.settings.get("encoder_crf", 23)))
+        tk.Spinbox(encoder_frame, from_=0, to=51, textvariable=self.encoder_crf_var, width=5).grid(row=2, column=1, sticky="w", padx=5)
+
+        tk.Label(encoder_frame, text="Bit hızı (boş = CRF):", font=("Helvetica", 11)).grid(row=3, column=0, sticky="w")
+        self.encoder_bitrate_var = tk.StringVar(value=self.settings.get("encoder_bitrate", ""))
+        tk.Entry(encoder_frame, textvariable=self.encoder_bitrate_var, width=8).grid(row=3, column=1, sticky="w", padx=5)
+
+        tk.Label(encoder_frame, text="İş parçacığı (0 = otomatik):", font=("Helvetica", 11)).grid(row=4, column=0, sticky="w")
+        self.encoder_threads_var = tk.IntVar(value=int(self.settings.get("encoder_threads", 0)))
+        tk.Spinbox(encoder_frame, from_=0, to=64, textvariable=self.encoder_threads_var, width=5).grid(row=4, column=1, sticky="w", padx=5)
+
+        tk.Label(encoder_frame, text="Paralel kodlama süreci (0 = kapalı):", font=("Helvetica", 11)).grid(row=5, column=0, sticky="w")
+        self.parallel_workers_var = tk.IntVar(value=int(self.settings.get("parallel_encoding_workers", 0)))
+        tk.Spinbox(encoder_frame, from_=0, to=16, textvariable=self.parallel_workers_var, width=5).grid(row=5, column=1, sticky="w", padx=5)
+
+        tk.Label(settings_win, text="Önizleme FPS (üst sınır):", font=("Helvetica", 12)).pack(pady=(10, 0))
+        self.preview_fps_var = tk.IntVar(value=self.preview_fps)
+        tk.Spinbox(settings_win, from_=PreviewRenderer.MIN_FPS, to=60, textvariable=self.preview_fps_var, width=5).pack(pady=5)
+
+        # "Tüm Ekranlar" hedefinin monitörleri nasıl birleştireceği
+        tk.Label(settings_win, text="Tüm Ekranlar (kompozit) yerleşimi ve ölçeği:", font=("Helvetica", 12)).pack(pady=(10, 0))
+        composite_frame = tk.Frame(settings_win)
+        composite_frame.pack(pady=5)
+        self.composite_layout_var = tk.StringVar(value=self.settings.get("composite_layout", "desktop"))
+        tk.OptionMenu(composite_frame, self.composite_layout_var, *COMPOSITE_LAYOUTS).pack(side=tk.LEFT, padx=5)
+        self.composite_scale_var = tk.DoubleVar(value=float(self.settings.get("composite_scale", 1.0)))
+        tk.Spinbox(composite_frame, values=("1.0", "0.75", "0.5", "0.25"), textvariable=self.composite_scale_var,
+                   width=5).pack(side=tk.LEFT, padx=5)
+
+        # Ek ses girişleri: seçilen mikrofonla birlikte kaydedilir, tek izde karıştırılır veya ayrı iz olur
+        tk.Label(settings_win, text="Ek ses girişleri ve birleştirme:", font=("Helvetica", 12)).pack(pady=(10, 0))
+        extra_audio_frame = tk.Frame(settings_win)
+        extra_audio_frame.pack(pady=5)
+        extra_audio_listbox = tk.Listbox(extra_audio_frame, selectmode=tk.MULTIPLE, height=3, width=40,
+                                         exportselection=False)
+        extra_audio_listbox.pack(side=tk.LEFT)
+        saved_extra_devices = self.settings.get("extra_audio_devices", [])
+        for i, name in enumerate(self.microphone_options):
+            extra_audio_listbox.insert(tk.END, name)
+            if name in saved_extra_devices:
+                extra_audio_listbox.selection_set(i)
+        self.audio_mode_var = tk.StringVar(value=self.settings.get("audio_mode", "mix"))
+        tk.OptionMenu(extra_audio_frame, self.audio_mode_var, *AUDIO_MODES).pack(side=tk.LEFT, padx=5)
+
+        # Ses kayıt sırasında bu kodlayıcıyla sıkıştırılır; ayrı ses dosyası da WAV yerine bu biçimde yazılır
+        audio_codec_frame = tk.Frame(settings_win)
+        audio_codec_frame.pack(pady=5)
+        tk.Label(audio_codec_frame, text="Ses kodlayıcı:", font=("Helvetica", 11)).pack(side=tk.LEFT)
+        self.audio_codec_var = tk.StringVar(value=self.settings.get("audio_codec", "aac"))
+        tk.OptionMenu(audio_codec_frame, self.audio_codec_var, *AUDIO_CODECS).pack(side=tk.LEFT, padx=5)
+        tk.Label(audio_codec_frame, text="Bit hızı:", font=("Helvetica", 11)).pack(side=tk.LEFT)
+        self.audio_bitrate_var = tk.StringVar(value=self.settings.get("audio_bitrate", "160k"))
+        tk.Entry(audio_codec_frame, textvariable=self.audio_bitrate_var, width=6).pack(side=tk.LEFT, padx=5)
+
         def save_selection():
             selected_indices = app_listbox.curselection()
             self.excluded_apps = [app_listbox.get(i) for i in selected_indices]
             self.shortcut_record = self.shortcut_record_var.get()
             self.shortcut_mute = self.shortcut_mute_var.get()
             self.shortcut_screen = self.shortcut_screen_var.get()
+            self.shortcut_replay = self.shortcut_replay_var.get()
+            self.preview_fps = max(PreviewRenderer.MIN_FPS, self.preview_fps_var.get())
+            self.preview_renderer.target_fps = self.preview_fps
+            self.preview_renderer.current_fps = self.preview_fps
 
             # Ayarları JSON olarak kaydet
-            settings_data = {
+            # Bu pencerede düzenlenmeyen anahtarlar (ör. halka tamponu) korunur
+            settings_data = dict(self.settings)
+            settings_data.update({
                 "excluded_apps": self.excluded_apps,
                 "shortcut_record": self.shortcut_record,
                 "shortcut_mute": self.shortcut_mute,
                 "shortcut_screen": self.shortcut_screen,
+                "shortcut_replay": self.shortcut_replay,
                 "record_duration": self.record_duration_var.get(),
                 "format": self.format_var.get(),
+                "output_mode": self.output_mode_var.get(),
+                "output_segment_seconds": self.output_segment_seconds_var.get(),
+                "adaptive_quality": self.adaptive_quality_var.get(),
+                "adaptive_min_fps": self.adaptive_min_fps_var.get(),
+                "replay_buffer": self.replay_buffer_var.get(),
+                "replay_buffer_seconds": self.replay_buffer_seconds_var.get(),
+                "preview_fps": self.preview_fps,
+                "composite_layout": self.composite_layout_var.get(),
+                "composite_scale": self.composite_scale_var.get(),
+                "video_encoder": self.video_encoder_var.get(),
+                "encoder_preset": self.encoder_preset_var.get(),
+                "encoder_crf": self.encoder_crf_var.get(),
+                "encoder_bitrate": self.encoder_bitrate_var.get().strip(),
+                "encoder_threads": self.encoder_threads_var.get(),
+                "parallel_encoding_workers": self.parallel_workers_var.get(),
+                "extra_audio_devices": [extra_audio_listbox.get(i) for i in extra_audio_listbox.curselection()],
+                "audio_mode": self.audio_mode_var.get(),
+                "audio_codec": self.audio_codec_var.get(),
+                "audio_bitrate": self.audio_bitrate_var.get().strip() or "160k",
                 # "selected_monitors" removed - handled on main screen
-            }
+            })
             settings_dir = os.path.join(os.path.dirname(__file__), "settings")
             os.makedirs(settings_dir, exist_ok=True)
             settings_path = os.path.join(settings_dir, "settings.json")
             with open(settings_path, "w", encoding="utf-8") as f:
                 json.dump(settings_data, f, ensure_ascii=False, indent=4)
+            self.settings = settings_data
 
             messagebox.showinfo(
                 "Ayarlar",
                 f"Kayda alınmayacak uygulamalar ve tuş atamaları:\n{', '.join(self.excluded_apps)}\n\n"
                 f"Kayıt Başlat/Durdur: {self.shortcut_record}\n"
                 f"Mute/Unmute: {self.shortcut_mute}\n"
-                f"Ekran Seçimi: {self.shortcut_screen}"
+                f"Ekran Seçimi: {self.shortcut_screen}\n"
+                f"Anlık Tekrarı Kaydet: {self.shortcut_replay}"
                 f"\n\nKayıt süresi: {self.record_duration_var.get()} saniye\n"
-                f"Kayıt Formatı: {self.format_var.get()}"
+                f"Kayıt Formatı: {self.format_var.get()}\n"
+                f"Video Kodlayıcı: {self.video_encoder_var.get()} ({self.encoder_preset_var.get()}, CRF {self.encoder_crf_var.get()})"
                 f"\n\nAyarlar kaydedildi."
                 f"\n\nNot: Kısayolları kullanabilmek için uygulamayı yeniden başlatmanız gerekebilir."
                 f"\n\nAyarlar dosyası: {settings_path}"
@@ -1647,6 +1803,7 @@ class ScreenRecorderApp:
             self.master.bind(f"<{self.shortcut_record_var.get()}>", lambda e: self.start_recording() if not self.recording else self.stop_recording())
             self.master.bind(f"<{self.shortcut_mute_var.get()}>", lambda e: self.toggle_mute())
             self.master.bind(f"<{self.shortcut_screen_var.get()}>", lambda e: self.start_region_selection())
+            self.master.bind(f"<{self.shortcut_replay_var.get()}>", lambda e: self.save_replay())
         settings_win.protocol("WM_DELETE_WINDOW", lambda: [bind_shortcuts(), settings_win.destroy()])
 
     # Mute/Unmute fonksiyonu örneği:
@@ -1747,6 +1904,8 @@ Teşekkür ederiz. Yazılımı daha iyi hale getirmek için geri bildirimleriniz
         self._add_button_hover_effect(close_button, "#f44336", "#D32F2F")
 
 if __name__ == "__main__":
+    # Çoklu monitör kaydındaki yakalama süreçleri için (Windows / paketlenmiş exe)
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ScreenRecorderApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Ekran kaydedicinin arayüzden bağımsız kayıt motoru bileşenleri."""
+from .adaptive import AdaptiveQualityController, create_quality_controller
+from .audio import (APP_AUDIO_DEVICE, AUDIO_MODES, TEST_TONE_DEVICE, AudioCapture, AudioMixer, AudioRing, StreamingWavWriter,
+                    ToneInputStream)
+from .avsync import AudioSyncCorrector
+from .composite import COMPOSITE_LAYOUTS, Compositor
+from .damage import DamageDetector
+from .encodeproc import ProcessEncoder
+from .encoders import (ENCODER_PRESETS, FFMPEG_CODECS, VIDEO_ENCODERS, FFmpegEncoder,
+                       OpenCVEncoder, create_encoder)
+from .engine import PYAUDIO_AVAILABLE, Recorder
+from .framebus import FrameBus, FrameSubscription
+from .framepath import FramePath, wrap_screenshot
+from .log import log_print
+from .metrics import Histogram, MetricsDumper, MetricsServer, RecorderMetrics
+from .multi import MultiRecorder
+from .mux import AUDIO_CODECS, FFmpegAudioWriter, FFmpegMuxer, audio_codec_args, ffmpeg_available, merge_audio_video
+from .parallel import SegmentParallelEncoder
+from .pacing import CaptureClock, FramePacer
+from .pulse import AppAudioExcluder, PulseInputStream, pulse_available
+from .pipeline import FrameRing, RING_POLICIES, drain_ring
+from .replay import ReplayBufferEncoder
+from .segments import OUTPUT_MODES, concat_segments, read_segment_index, segment_paths, write_segment_index
+from .shmring import SharedFrameRing
+from .sources import CAPTURE_SOURCES, VideoFileSource, create_capture_source
+from .synthetic import SyntheticScreen, SyntheticShot
+
+__all__ = [
+    "AdaptiveQualityController", "create_quality_controller",
+    "AudioSyncCorrector",
+    "COMPOSITE_LAYOUTS", "Compositor",
+    "DamageDetector",
+    "ENCODER_PRESETS", "FFMPEG_CODECS", "VIDEO_ENCODERS", "FFmpegEncoder", "OpenCVEncoder", "create_encoder",
+    "MultiRecorder",
+    "AUDIO_CODECS", "FFmpegAudioWriter", "FFmpegMuxer", "audio_codec_args", "ffmpeg_available", "merge_audio_video",
+    "FrameBus", "FrameSubscription",
+    "FramePath", "wrap_screenshot",
+    "CaptureClock", "FramePacer",
+    "AppAudioExcluder", "PulseInputStream", "pulse_available",
+    "PYAUDIO_AVAILABLE", "Recorder",
+    "FrameRing", "RING_POLICIES", "drain_ring",
+    "ProcessEncoder",
+    "SharedFrameRing",
+    "CAPTURE_SOURCES", "VideoFileSource", "create_capture_source",
+    "SyntheticScreen", "SyntheticShot",
+    "ReplayBufferEncoder",
+    "SegmentParallelEncoder",
+    "OUTPUT_MODES", "concat_segments", "read_segment_index", "segment_paths", "write_segment_index",
+    "APP_AUDIO_DEVICE", "AUDIO_MODES", "TEST_TONE_DEVICE", "AudioCapture", "AudioMixer", "AudioRing", "StreamingWavWriter",
+    "ToneInputStream",
+    "Histogram", "MetricsDumper", "MetricsServer", "RecorderMetrics",
+    "log_print",
+]
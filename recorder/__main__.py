@@ -0,0 +1,287 @@
+"""Arayüz olmadan kayıt: ``python -m recorder --duration 10 --output kayit.mp4``."""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from .audio import APP_AUDIO_DEVICE, AUDIO_MODES, TEST_TONE_DEVICE
+from .composite import COMPOSITE_LAYOUTS, Compositor
+from .encoders import ENCODER_PRESETS, VIDEO_ENCODERS
+from .engine import Recorder
+from .log import log_print
+from .multi import MultiRecorder
+from .mux import AUDIO_CODECS
+from .segments import OUTPUT_MODES, concat_segments, read_segment_index
+from .sources import CAPTURE_SOURCES, create_capture_source
+
+
+def parse_region(text):
+    """``left,top,width,height`` biçimindeki bölgeyi mss sözlüğüne çevirir."""
+    try:
+        left, top, width, height = (int(part) for part in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("bölge 'left,top,width,height' biçiminde olmalı")
+    return {"left": left, "top": top, "width": width, "height": height}
+
+
+def parse_monitors(text):
+    """Virgülle ayrılmış, birbirinden farklı mss monitör indeksleri (ör. ``1,2``)."""
+    try:
+        indices = [int(part) for part in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("monitörler virgülle ayrılmış indeksler olmalı (ör. 1,2)")
+    repeated = sorted({index for index in indices if indices.count(index) > 1})
+    if repeated:
+        raise argparse.ArgumentTypeError(f"monitör birden çok kez verildi: {', '.join(map(str, repeated))}")
+    return indices
+
+
+def parse_audio_device(text):
+    """PyAudio cihaz indeksi, test sinyali için ``tone`` veya uygulama sesi için ``apps``; virgülle çok cihaz."""
+    devices = []
+    for part in text.split(","):
+        part = part.strip()
+        if part in (TEST_TONE_DEVICE, APP_AUDIO_DEVICE):
+            devices.append(part)
+            continue
+        try:
+            devices.append(int(part))
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"cihaz indeksi, '{TEST_TONE_DEVICE}' veya '{APP_AUDIO_DEVICE}' olmalı: {part}")
+    return devices[0] if len(devices) == 1 else devices
+
+
+def parse_gains(text):
+    """Virgülle ayrılmış, giriş başına dB kazanç listesi (ör. ``0,-6``)."""
+    try:
+        return [float(part) for part in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("kazançlar virgülle ayrılmış dB değerleri olmalı (ör. 0,-6)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m recorder", description="Arayüzsüz ekran kaydı.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--region", type=parse_region, help="kaydedilecek bölge: left,top,width,height")
+    target.add_argument("--monitor", type=int, default=1, help="kaydedilecek monitör (mss indeksi, varsayılan 1)")
+    target.add_argument("--monitors", type=parse_monitors, help="ayrı dosyalara, ortak saatle kaydedilecek monitörler (ör. 1,2)")
+    parser.add_argument("--composite", action="store_true",
+                        help="monitörleri (--monitors verilmezse hepsini) tek bir karede birleştirip kaydet")
+    parser.add_argument("--layout", choices=COMPOSITE_LAYOUTS, default="desktop", help="kompozit yerleşim")
+    parser.add_argument("--scale", type=float, default=1.0, help="kompozit küçültme oranı (0-1]")
+    parser.add_argument("--fps", type=int, default=20, help="kare hızı (varsayılan 20)")
+    parser.add_argument("--codec", choices=VIDEO_ENCODERS, help="video kodlayıcı (varsayılan ayarlardan)")
+    parser.add_argument("--preset", choices=ENCODER_PRESETS, help="kodlayıcı preset'i")
+    parser.add_argument("--crf", type=int, help="sabit kalite değeri")
+    parser.add_argument("--bitrate", help="hedef bit hızı (ör. 6M); verilirse CRF yerine kullanılır")
+    parser.add_argument("--threads", type=int, help="kodlayıcı iş parçacığı sayısı (0 = otomatik)")
+    parser.add_argument("--workers", type=int,
+                        help="parçaları paralel kodlayan süreç sayısı (0/1 = tek kodlayıcı)")
+    parser.add_argument("--segment-seconds", type=float, help="paralel kodlamada parça uzunluğu (saniye)")
+    parser.add_argument("--output-mode", choices=OUTPUT_MODES,
+                        help="single: tek dosya, fragmented: parçalı mp4/mkv, segmented: ayrı parçalar + dizin")
+    parser.add_argument("--output-segment-seconds", type=float,
+                        help="segmented/fragmented modda parça (anahtar kare) aralığı, saniye")
+    parser.add_argument("--finalize", metavar="DIZIN",
+                        help="yarıda kalmış parçalı kaydın dizinindeki parçaları birleştir ve çık")
+    parser.add_argument("--replay", type=float, metavar="SANIYE",
+                        help="anlık tekrar: yalnızca son SANIYE saniyeyi tampona al, kayıt bitince onu kaydet")
+    parser.add_argument("--encode-process", action="store_true", default=None,
+                        help="kodlayıcıyı ayrı süreçte çalıştır (kareler paylaşılan bellekten aktarılır)")
+    parser.add_argument("--encoder-scale", type=float, help="kodlamadan önce küçültme oranı (0-1]")
+    parser.add_argument("--adaptive", action="store_true", default=None,
+                        help="yük altında etkin kare hızını düşür, yük azalınca geri yükselt")
+    parser.add_argument("--min-fps", type=float, help="uyarlamalı kalitede inilebilecek en düşük etkin kare hızı")
+    parser.add_argument("--metrics-dump", action="store_true", default=None,
+                        help="kare süresi metriklerini kaydın yanına .metrics.jsonl olarak yaz")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Prometheus metriklerini http://127.0.0.1:PORT/metrics adresinden sun")
+    parser.add_argument("--source", choices=CAPTURE_SOURCES,
+                        help="yakalama kaynağı: mss (ekran), synthetic (yapay desen), file (video dosyası)")
+    parser.add_argument("--source-file", help="file kaynağında oynatılacak video dosyası (--source file anlamına gelir)")
+    parser.add_argument("--source-rate", type=float,
+                        help="file kaynağında saniyedeki dosya karesi (0 = her yakalamada bir sonraki kare)")
+    parser.add_argument("--change-rate", type=float,
+                        help="synthetic kaynakta değişen karelerin oranı (0-1, 1 = her kare)")
+    parser.add_argument("--no-av-sync", dest="av_sync", action="store_false", default=None,
+                        help="sesi kayıt saatine hizalama (başlangıç, taşma ve kayma düzeltmesi) kapalı")
+    parser.add_argument("--sync-report", action="store_true", default=None,
+                        help="ses/görüntü senkron raporunu kaydın yanına .sync.json olarak yaz")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="kayıt süresi (saniye); 0 ise Ctrl+C'ye kadar kaydeder")
+    parser.add_argument("--output", help="çıktı dosyası (varsayılan ekran_kaydi_<zaman>.mp4)")
+    parser.add_argument("--audio-device", type=parse_audio_device,
+                        help=f"ses kaydı için PyAudio giriş cihazı indeksi ('{TEST_TONE_DEVICE}': 440 Hz test "
+                             f"sinyali, '{APP_AUDIO_DEVICE}': uygulama sesleri, Linux PulseAudio/PipeWire); "
+                             f"birden çok giriş virgülle verilir (ör. 1,{APP_AUDIO_DEVICE})")
+    parser.add_argument("--exclude-app", type=lambda text: [part for part in text.split(",") if part],
+                        metavar="AD", help="uygulama sesinde kayda alınmayacak uygulamalar (ör. chrome,discord)")
+    parser.add_argument("--pulse-server", help="uygulama sesi için PulseAudio sunucusu (ör. unix:/tmp/pa.sock)")
+    parser.add_argument("--audio-mode", choices=AUDIO_MODES,
+                        help="birden çok ses girişinde mix: tek izde karıştır, tracks: ayrı izler")
+    parser.add_argument("--audio-gain", type=parse_gains, metavar="DB",
+                        help="karıştırmada giriş başına kazanç, dB (ör. 0,-6)")
+    parser.add_argument("--audio-codec", choices=tuple(AUDIO_CODECS),
+                        help="ses kodlayıcısı; ayrı ses dosyası da kayıt sırasında bununla sıkıştırılır")
+    parser.add_argument("--audio-bitrate", help="ses bit hızı (ör. 128k)")
+    parser.add_argument("--settings", help="temel alınacak settings.json dosyası")
+    parser.add_argument("--threads-only", action="store_true",
+                        help="çoklu monitörde tüm kaynakları ayrı süreçler yerine bu süreçte yakala")
+    parser.add_argument("--log-file", help="logların yazılacağı dosya")
+    return parser
+
+
+def load_settings(args):
+    """settings.json'u okur ve komut satırı seçenekleriyle günceller."""
+    settings = {}
+    if args.settings:
+        with open(args.settings, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    overrides = {"video_encoder": args.codec, "encoder_preset": args.preset, "encoder_crf": args.crf,
+                 "encoder_bitrate": args.bitrate, "encoder_threads": args.threads,
+                 "parallel_encoding_workers": args.workers, "parallel_segment_seconds": args.segment_seconds,
+                 "encode_process": args.encode_process, "output_mode": args.output_mode,
+                 "output_segment_seconds": args.output_segment_seconds,
+                 "replay_buffer": True if args.replay else None, "replay_buffer_seconds": args.replay,
+                 "encoder_scale": args.encoder_scale, "adaptive_quality": args.adaptive,
+                 "adaptive_min_fps": args.min_fps, "metrics_dump": args.metrics_dump,
+                 "metrics_port": args.metrics_port,
+                 "capture_source": args.source or ("file" if args.source_file else None),
+                 "capture_source_file": args.source_file, "capture_source_rate": args.source_rate,
+                 "synthetic_change_rate": args.change_rate, "av_sync": args.av_sync,
+                 "sync_report": args.sync_report, "audio_mode": args.audio_mode,
+                 "audio_gains_db": args.audio_gain, "excluded_apps": args.exclude_app,
+                 "pulse_server": args.pulse_server, "audio_codec": args.audio_codec,
+                 "audio_bitrate": args.audio_bitrate}
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+
+def finalize(index_path, output=None):
+    """Çökme sonrası kalan parçaları yeniden kodlamadan tek dosyada birleştirir."""
+    try:
+        segments = read_segment_index(index_path)
+    except OSError as e:
+        log_print(f"Dizin dosyası okunamadı: {e}", level="error")
+        return 2
+    if not segments:
+        log_print(f"Dizinde tamamlanmış parça yok: {index_path}", level="error")
+        return 1
+    if output is None:
+        base = index_path[:-len(".segments.ffconcat")] if index_path.endswith(".segments.ffconcat") else \
+            os.path.splitext(index_path)[0]
+        output = base + os.path.splitext(segments[0])[1]
+    returncode, stderr = concat_segments(index_path, output)
+    if returncode != 0:
+        log_print(f"Parçalar birleştirilemedi: {stderr}", level="error")
+        return 1
+    log_print(f"{len(segments)} parça birleştirildi: {output}")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.log_file:
+        logging.basicConfig(filename=args.log_file, level=logging.INFO,
+                            format="%(asctime)s - %(levelname)s - %(message)s")
+    else:
+        # Mesajlar zaten konsola yazılıyor, logging ikinci kez stderr'e basmasın
+        logging.getLogger().addHandler(logging.NullHandler())
+
+    if args.finalize:
+        return finalize(args.finalize, args.output)
+
+    if args.replay and args.monitors and not args.composite:
+        log_print("Anlık tekrar tek bir kaynakla (bölge, monitör veya kompozit) kullanılabilir.", level="error")
+        return 2
+
+    output = args.output or f"ekran_kaydi_{time.strftime('%Y%m%d_%H%M%S')}.mp4"
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    settings = load_settings(args)
+    try:
+        # Monitör listesi de kaydın kullanacağı kaynaktan alınır
+        source = create_capture_source(settings)
+    except Exception as e:
+        log_print(f"Yakalama kaynağı açılamadı: {e}", level="error")
+        return 2
+
+    if args.composite:
+        with source as sct:
+            indices = args.monitors or list(range(1, len(sct.monitors)))
+            invalid = [index for index in indices if not 1 <= index < len(sct.monitors)]
+            if invalid:
+                # Kompozitte 0 (tüm ekranlar) tek bir monitör değildir
+                log_print(f"Geçersiz monitör indeksi: {invalid[0]}", level="error")
+                return 2
+            monitors = [sct.monitors[index] for index in indices]
+        try:
+            compositor = Compositor(monitors, layout=args.layout, scale=args.scale)
+        except ValueError as e:
+            log_print(str(e), level="error")
+            return 2
+        log_print(f"Kompozit kayıt: {compositor.describe()}")
+        recorder = Recorder(output, None, fps=args.fps, settings=settings, audio_device=args.audio_device,
+                            compositor=compositor)
+    elif args.monitors:
+        base, ext = os.path.splitext(output)
+        sources = []
+        with source as sct:
+            for index in args.monitors:
+                if not 0 <= index < len(sct.monitors):
+                    log_print(f"Geçersiz monitör indeksi: {index}", level="error")
+                    return 2
+                sources.append((f"{base}_monitor{index}{ext}", sct.monitors[index]))
+        recorder = MultiRecorder(sources, fps=args.fps, settings=settings, use_processes=not args.threads_only,
+                                 audio_device=args.audio_device)
+    else:
+        region = args.region
+        with source as sct:
+            if region is None:
+                if not 0 <= args.monitor < len(sct.monitors):
+                    log_print(f"Geçersiz monitör indeksi: {args.monitor}", level="error")
+                    return 2
+                region = dict(sct.monitors[args.monitor])
+        recorder = Recorder(output, region, fps=args.fps, settings=settings, audio_device=args.audio_device)
+
+    try:
+        recorder.start()
+    except Exception as e:
+        log_print(f"Kayıt başlatılamadı: {e}", level="error")
+        return 1
+
+    try:
+        recorder.wait(args.duration or None)
+    except KeyboardInterrupt:
+        pass
+    if args.replay:
+        # Tampon durdurulmadan önce son saniyeler kalıcı dosyaya aktarılır
+        try:
+            returncode = recorder.save_replay(output)[0]
+        except Exception as e:
+            log_print(f"Anlık tekrar kaydedilemedi: {e}", level="error")
+            returncode = 1
+        if returncode != 0:
+            # Nedeni kodlayıcı logladı; çıkış kodu 1 olur
+            log_print(f"Anlık tekrar dosyası oluşturulmadı: {output}", level="error")
+    results = recorder.stop()
+    if isinstance(results, dict):
+        results = [results]
+
+    failed = False
+    for result in results:
+        if result["replays"] is not None:
+            failed = failed or not result["replays"] or result["error"] is not None
+            continue
+        if result["audio"]:
+            audio = ", ".join(result["audio_tracks"] or [result["audio"]])
+            log_print(f"Video ve ses ayrı kaldı: {result['video']}, {audio}", level="warning")
+        log_print(f"Kayıt tamamlandı: {result['video']}")
+        failed = failed or result["error"] is not None or result["returncode"] != 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""Sistem yüküne göre kayıt kalitesini ayarlayan uyarlamalı kalite denetleyicisi."""
+import threading
+import time
+
+from .encoders import ENCODER_PRESETS
+from .log import log_print
+
+# Kodlayıcı yeniden başlatılmadan değiştirilemeyen ölçek adımları (en büyükten küçüğe)
+SCALE_STEPS = (1.0, 0.75, 0.5)
+
+
+def _shown(value):
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class AdaptiveQualityController:
+    """Yakalama gecikmesi, kuyruk doluluğu ve kare başına kodlama süresini izleyip kaliteyi ayarlar.
+
+    Ölçümler ``window`` saniyelik pencerelerde toplanır. Art arda ``degrade_after``
+    pencerede bütçe aşılırsa (yakalama gecikmesinin 90. yüzdeliği etkin kare
+    aralığının ``headroom`` katını, kodlama thread'inin meşguliyeti ``headroom``
+    oranını veya ortalama kuyruk doluluğu yarıyı geçerse ya da halka kare
+    düşürürse) kalite bir adım düşürülür; ``upgrade_after`` pencere boyunca bir
+    üst adımda bile ``relax`` payı kalıyorsa bir adım yükseltilir.
+
+    Canlı ayarlanan tek değer etkin kare hızıdır: yakalama her ``capture_divisor``
+    kare zamanından birinde yapılır, sabit kare hızlı çıktıdaki boşluklar önceki
+    kare tekrarlanarak doldurulur. Etkin hız ``min_fps`` altına inemiyorsa önce
+    daha hızlı preset, sonra daha küçük ölçek seçilir; bunlar çalışan ffmpeg
+    sürecinde değiştirilemediği için ``encoder_overrides`` ile aynı denetleyiciyi
+    kullanan bir sonraki kayıtta uygulanır; etkisi ölçülemeden üst üste binmesin
+    diye kayıt başına en fazla bir adım değişir. Her ayar ``log_print`` ile yazılır ve
+    ``on_change`` verilirse (ölçüm thread'inden) çağrılır.
+    """
+
+    def __init__(self, fps, preset="veryfast", scale=1.0, min_fps=10, min_scale=0.5, window=2.0,
+                 degrade_after=2, upgrade_after=5, headroom=0.9, relax=0.6, on_change=None):
+        if fps <= 0:
+            raise ValueError(f"Geçersiz FPS değeri: {fps}")
+        if preset not in ENCODER_PRESETS:
+            raise ValueError(f"Geçersiz preset: {preset}")
+        self.fps = fps
+        self.min_fps = min(min_fps, fps)
+        self.window = window
+        self.degrade_after = degrade_after
+        self.upgrade_after = upgrade_after
+        self.headroom = headroom
+        self.relax = relax
+        self.on_change = on_change
+
+        # Kullanıcının seçtiği değerler üst sınırdır; denetleyici bunların üstüne çıkmaz
+        self.base_preset = preset
+        self.base_scale = scale
+        self.preset = preset
+        self.scale = scale
+        self.min_scale = min_scale
+        self.capture_divisor = 1
+        self.max_divisor = max(1, int(fps // self.min_fps))
+
+        self.adjustments = []
+        self._lock = threading.Lock()
+        self._clock = time.monotonic
+        self._over_windows = 0
+        self._under_windows = 0
+        self._last_dropped = 0
+        self._restart_changed = False
+        self._reset_window()
+
+    @property
+    def effective_fps(self):
+        """Yakalamanın şu an hedeflediği kare hızı."""
+        return self.fps / self.capture_divisor
+
+    def begin(self, clock=time.monotonic):
+        """Yeni kaydın ölçümlerine başlar; duraklamaları dışlayan bir saat (``CaptureClock.now``) verilebilir."""
+        with self._lock:
+            self._clock = clock
+            self._over_windows = 0
+            self._under_windows = 0
+            self._last_dropped = 0
+            self._restart_changed = False
+            self._reset_window()
+
+    def _reset_window(self):
+        self._window_start = None
+        self._latencies = []
+        self._encode_time = 0.0
+        self._encode_frames = 0
+        self._queue_sum = 0.0
+        self._queue_samples = 0
+        self._drops = 0
+
+    def should_capture(self, frame_index):
+        """Bu kare zamanında yakalama yapılacaksa True döner (etkin kare hızı seyreltmesi)."""
+        return frame_index % self.capture_divisor == 0
+
+    def observe_capture(self, latency, queued, capacity):
+        """Yakalama thread'inden: kare zamanından kuyruğa eklenene kadar geçen süre ve kuyruk durumu."""
+        with self._lock:
+            self._latencies.append(latency)
+            self._queue_sum += queued / capacity
+            self._queue_samples += 1
+
+    def observe_encode(self, seconds, frames=1):
+        """Kodlama thread'inden: ``frames`` çıktı karesini dönüştürüp yazmak için geçen süre."""
+        with self._lock:
+            self._encode_time += seconds
+            self._encode_frames += frames
+
+    def update(self, ring_stats=None):
+        """Pencere dolduysa ölçümleri değerlendirir; kalite değiştiyse True döner.
+
+        ``ring_stats`` halkanın ``stats`` fonksiyonudur; yalnızca pencere sonunda
+        düşürülen kare sayısını okumak için çağrılır.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._window_start is None:
+                self._window_start = now
+                return False
+            elapsed = now - self._window_start
+            if elapsed < self.window or not self._latencies:
+                return False
+            if ring_stats is not None:
+                dropped = ring_stats()["dropped"]
+                self._drops, self._last_dropped = dropped - self._last_dropped, dropped
+            metrics = self._window_metrics(elapsed)
+            self._reset_window()
+            self._window_start = now
+
+            if self._overloaded(metrics):
+                self._over_windows += 1
+                self._under_windows = 0
+                if self._over_windows >= self.degrade_after:
+                    self._over_windows = 0
+                    return self._degrade(metrics)
+            elif self._relaxed(metrics):
+                self._under_windows += 1
+                self._over_windows = 0
+                if self._under_windows >= self.upgrade_after:
+                    self._under_windows = 0
+                    return self._upgrade(metrics)
+            else:
+                self._over_windows = self._under_windows = 0
+            return False
+
+    def _window_metrics(self, elapsed):
+        latencies = sorted(self._latencies)
+        return {
+            "latency_p90": latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))],
+            # Kodlama ayrı süreçteyse bu süreçte ölçülemez
+            "encode_busy": self._encode_time / elapsed if self._encode_frames else None,
+            "encode_ms": self._encode_time / self._encode_frames * 1000.0 if self._encode_frames else None,
+            "queue_fill": self._queue_sum / self._queue_samples if self._queue_samples else 0.0,
+            "drops": self._drops,
+        }
+
+    def _overloaded(self, metrics):
+        interval = self.capture_divisor / self.fps
+        return (metrics["latency_p90"] > interval * self.headroom
+                or (metrics["encode_busy"] is not None and metrics["encode_busy"] > self.headroom)
+                or metrics["queue_fill"] > 0.5 or metrics["drops"] > 0)
+
+    def _relaxed(self, metrics):
+        # Bir üst adımın yükü tahmin edilir: daha sık yakalama, kodlayıcıya daha çok yeni kare demektir
+        divisor = max(1, self.capture_divisor - 1)
+        ratio = self.capture_divisor / divisor
+        encode_busy = metrics["encode_busy"] or 0.0
+        return (metrics["latency_p90"] < divisor / self.fps * self.relax and encode_busy * ratio < self.relax
+                and metrics["queue_fill"] < 0.1 and not metrics["drops"])
+
+    def _degrade(self, metrics):
+        if self.capture_divisor < self.max_divisor:
+            return self._change("etkin FPS", "capture_divisor", self.capture_divisor + 1, metrics)
+        if self._restart_changed:
+            return False
+        preset_index = ENCODER_PRESETS.index(self.preset)
+        if preset_index > 0:
+            return self._change("preset", "preset", ENCODER_PRESETS[preset_index - 1], metrics)
+        smaller = [s for s in SCALE_STEPS if self.min_scale <= s < self.scale]
+        if smaller:
+            return self._change("ölçek", "scale", smaller[0], metrics)
+        return False
+
+    def _upgrade(self, metrics):
+        # Önce canlı kare hızı geri alınır; ölçek ve preset düşürüldükleri sıranın tersiyle geri döner
+        if self.capture_divisor == 1:
+            if self._restart_changed:
+                return False
+            larger = [s for s in SCALE_STEPS if self.scale < s <= self.base_scale]
+            if larger:
+                return self._change("ölçek", "scale", larger[-1], metrics)
+            if self.preset != self.base_preset:
+                preset_index = ENCODER_PRESETS.index(self.preset)
+                return self._change("preset", "preset", ENCODER_PRESETS[preset_index + 1], metrics)
+            return False
+        return self._change("etkin FPS", "capture_divisor", self.capture_divisor - 1, metrics)
+
+    def _change(self, label, attr, value, metrics):
+        old = getattr(self, attr)
+        setattr(self, attr, value)
+        if attr == "capture_divisor":
+            attr, old, value = "fps", self.fps / old, self.fps / value
+            when = "hemen"
+        else:
+            when = "sonraki kayıtta"
+            self._restart_changed = True
+        encode = f"{metrics['encode_ms']:.1f} ms" if metrics["encode_ms"] is not None else "ayrı süreçte"
+        reason = (f"yakalama p90={metrics['latency_p90'] * 1000:.1f} ms, kodlama/kare={encode}, "
+                  f"kuyruk=%{metrics['queue_fill'] * 100:.0f}, düşen={metrics['drops']}")
+        self.adjustments.append({"setting": attr, "from": old, "to": value, "applies": when, "reason": reason})
+        log_print(f"Uyarlamalı kalite: {label} {_shown(old)} -> {_shown(value)} ({when}; {reason})")
+        if self.on_change:
+            self.on_change(self)
+        return True
+
+    def encoder_overrides(self):
+        """Kodlayıcı açılırken ``settings`` üzerine yazılacak preset ve ölçek."""
+        return {"encoder_preset": self.preset, "encoder_scale": self.scale}
+
+    def stats(self):
+        """Güncel kalite düzeyini ve yapılan ayarların listesini döndürür."""
+        return {
+            "effective_fps": self.effective_fps,
+            "capture_divisor": self.capture_divisor,
+            "preset": self.preset,
+            "scale": self.scale,
+            "adjustments": list(self.adjustments),
+        }
+
+
+def create_quality_controller(settings, fps, on_change=None):
+    """settings.json'daki ``adaptive_quality`` açıksa denetleyiciyi oluşturur; kapalıysa None."""
+    if not settings.get("adaptive_quality"):
+        return None
+    preset = settings.get("encoder_preset", "veryfast")
+    return AdaptiveQualityController(
+        fps, preset=preset if preset in ENCODER_PRESETS else "veryfast",
+        scale=float(settings.get("encoder_scale", 1.0)),
+        min_fps=float(settings.get("adaptive_min_fps", 10)),
+        min_scale=float(settings.get("adaptive_min_scale", 0.5)),
+        window=float(settings.get("adaptive_window_seconds", 2.0)),
+        on_change=on_change)
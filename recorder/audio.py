@@ -0,0 +1,419 @@
+"""Ses kaydı için geri çağrı tabanlı yakalama, kilitsiz halka, karıştırıcı ve akış tabanlı yazıcılar."""
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .pulse import PulseInputStream
+
+_WAV_HEADER_SIZE = 44
+_MAX_CHUNK_SIZE = 0xFFFFFFFF
+
+# 16 bit PCM örnek boyutu (pyaudio.paInt16)
+SAMPLE_WIDTH = 2
+# PortAudio geri çağrı durum bayrakları ve dönüş kodu (pyaudio.paInputUnderflow vb.)
+PA_INPUT_UNDERFLOW = 1
+PA_INPUT_OVERFLOW = 2
+PA_CONTINUE = 0
+# Mikrofon yerine test sinyali üreten cihaz
+TEST_TONE_DEVICE = "tone"
+# Hariç tutulan uygulamalar olmadan uygulama sesi (Linux, PulseAudio/PipeWire)
+APP_AUDIO_DEVICE = "apps"
+# Birden çok ses girişi: tek izde karıştırma veya kapsayıcıda ayrı izler
+AUDIO_MODES = ("mix", "tracks")
+
+
+class StreamingWavWriter:
+    """Ses parçalarını geldikçe diske yazan PCM WAV yazıcısı.
+
+    Kayıt süresinden bağımsız olarak bellek kullanımı sabittir. RIFF ve ``data``
+    boyut alanları ``patch_interval`` saniyede bir ve kapanışta güncellenir;
+    uygulama çökse bile dosya son güncellemeye kadar oynatılabilir kalır.
+    """
+
+    def __init__(self, filename, channels, sample_width, rate, patch_interval=5.0, clock=time.monotonic):
+        self.filename = filename
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+        self.patch_interval = patch_interval
+        self._clock = clock
+        self.data_bytes = 0
+        self._file = open(filename, "wb")
+        self._write_header()
+        self._last_patch = self._clock()
+
+    def _write_header(self):
+        block_align = self.channels * self.sample_width
+        self._file.write(b"RIFF")
+        self._file.write(struct.pack("<I", 36))
+        self._file.write(b"WAVE")
+        self._file.write(b"fmt ")
+        self._file.write(struct.pack("<IHHIIHH", 16, 1, self.channels, self.rate,
+                                     self.rate * block_align, block_align, self.sample_width * 8))
+        self._file.write(b"data")
+        self._file.write(struct.pack("<I", 0))
+
+    def _patch_header(self):
+        data_size = min(self.data_bytes, _MAX_CHUNK_SIZE - 36)
+        position = self._file.tell()
+        self._file.seek(4)
+        self._file.write(struct.pack("<I", 36 + data_size))
+        self._file.seek(_WAV_HEADER_SIZE - 4)
+        self._file.write(struct.pack("<I", data_size))
+        self._file.seek(position)
+        self._file.flush()
+        self._last_patch = self._clock()
+
+    @property
+    def frames_written(self):
+        return self.data_bytes // (self.channels * self.sample_width)
+
+    def write(self, data):
+        """Bir ses parçasını dosyanın sonuna ekler."""
+        self._file.write(data)
+        self.data_bytes += len(data)
+        if self.patch_interval and self._clock() - self._last_patch >= self.patch_interval:
+            self._patch_header()
+
+    def close(self):
+        """Başlık boyutlarını son haliyle yazar ve dosyayı kapatır."""
+        if self._file.closed:
+            return
+        self._patch_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AudioRing:
+    """Tek üretici / tek tüketici için kilitsiz, önceden ayrılmış ses parçası halkası.
+
+    Üretici (PortAudio geri çağrısı) yalnızca ``_written``, tüketici yalnızca
+    ``_read`` sayacını artırır; parça yuvaya kopyalandıktan sonra sayaç
+    güncellendiği için kilit gerekmez. Halka doluysa yeni parça düşürülür ve
+    ``dropped`` artar; her parça kendinden önce düşürülenlerin toplamını taşır,
+    böylece tüketici boşluğu sessizlikle doldurup sesi videoya göre kaydırmaz.
+    Her parça ilk örneğinin ``time.monotonic`` cinsinden yakalanma anını taşır.
+    """
+
+    def __init__(self, chunk_bytes, capacity=64):
+        if capacity < 2:
+            raise ValueError("Halka kapasitesi en az 2 olmalıdır.")
+        self.chunk_bytes = chunk_bytes
+        self.capacity = capacity
+        self._slots = np.zeros((capacity, chunk_bytes), dtype=np.uint8)
+        self._lengths = [0] * capacity
+        self._device_times = [0.0] * capacity
+        self._capture_times = [0.0] * capacity
+        self._status = [0] * capacity
+        self._drops_before = [0] * capacity
+        self._written = 0
+        self._read = 0
+        self.dropped = 0
+        self.max_queued = 0
+
+    @property
+    def queued(self):
+        return self._written - self._read
+
+    def push(self, data, device_time=0.0, status=0, capture_time=None):
+        """Üretici: parçayı kopyalar; halka doluysa düşürür ve False döner."""
+        queued = self._written - self._read
+        if queued >= self.capacity:
+            self.dropped += 1
+            return False
+        index = self._written % self.capacity
+        length = min(len(data), self.chunk_bytes)
+        self._slots[index, :length] = np.frombuffer(data, dtype=np.uint8, count=length)
+        self._lengths[index] = length
+        self._device_times[index] = device_time
+        self._capture_times[index] = time.monotonic() if capture_time is None else capture_time
+        self._status[index] = status
+        self._drops_before[index] = self.dropped
+        # Sayaç en son güncellenir: tüketici yuvayı ancak tamamen yazıldıktan sonra görür
+        self._written += 1
+        if queued + 1 > self.max_queued:
+            self.max_queued = queued + 1
+        return True
+
+    def pop(self):
+        """Tüketici: ``(veri, cihaz zamanı, yakalanma anı, durum, önceki düşürülen)`` ya da boşsa None."""
+        if self._read == self._written:
+            return None
+        index = self._read % self.capacity
+        chunk = (self._slots[index, :self._lengths[index]].tobytes(), self._device_times[index],
+                 self._capture_times[index], self._status[index], self._drops_before[index])
+        self._read += 1
+        return chunk
+
+    def stats(self):
+        return {"pushed": self._written, "consumed": self._read, "dropped": self.dropped,
+                "queued": self.queued, "max_queued": self.max_queued, "capacity": self.capacity}
+
+
+class ToneInputStream:
+    """Mikrofon yerine sinüs sinyali üreten, PyAudio geri çağrı akışını taklit eden test cihazı.
+
+    Parçaları gerçek zamanlı hızda kendi thread'inden ``callback``'e verir;
+    ``time_info`` ve ``status`` PortAudio'daki gibidir. Thread ``overflow_chunks``
+    parçadan fazla geride kalırsa kaçırılan parçalar atlanır ve sonraki parça
+    ``PA_INPUT_OVERFLOW`` ile işaretlenir. ``drift_ppm`` cihaz saatinin sistem
+    saatinden bu kadar hızlı (negatifse yavaş) çalıştığını taklit eder.
+    """
+
+    def __init__(self, callback, channels=2, rate=44100, chunk_size=1024, frequency=440.0, amplitude=0.25,
+                 overflow_chunks=4, drift_ppm=0.0, clock=time.monotonic):
+        self.callback = callback
+        self.channels = channels
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.overflow_chunks = overflow_chunks
+        self.drift_ppm = drift_ppm
+        self._clock = clock
+        self._sample = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _chunk(self):
+        t = (self._sample + np.arange(self.chunk_size)) / self.rate
+        wave = (np.sin(2 * np.pi * self.frequency * t) * self.amplitude * 32767).astype("<i2")
+        self._sample += self.chunk_size
+        return np.repeat(wave[:, None], self.channels, axis=1).tobytes()
+
+    def _run(self):
+        period = self.chunk_size / (self.rate * (1.0 + self.drift_ppm / 1e6))
+        started = self._clock()
+        index = 0
+        while not self._stop_event.is_set():
+            deadline = started + (index + 1) * period
+            now = self._clock()
+            if now < deadline:
+                self._stop_event.wait(deadline - now)
+                continue
+            status = 0
+            behind = int((now - deadline) / period)
+            if behind > self.overflow_chunks:
+                # Gerçek cihazda bu parçalar sürücü tamponunda ezilirdi
+                index += behind
+                self._sample += behind * self.chunk_size
+                status = PA_INPUT_OVERFLOW
+            time_info = {"input_buffer_adc_time": started + index * period, "current_time": now,
+                         "output_buffer_dac_time": 0.0}
+            self.callback(self._chunk(), self.chunk_size, time_info, status)
+            index += 1
+
+    def start_stream(self):
+        self._thread = threading.Thread(target=self._run, name="recorder-test-tone", daemon=True)
+        self._thread.start()
+
+    def stop_stream(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        self.stop_stream()
+
+
+class AudioCapture:
+    """Bir giriş cihazından PortAudio geri çağrı modunda ses yakalayıp ``AudioRing``'e yazar.
+
+    Geri çağrı yalnızca parçayı halkaya kopyalar ve cihaz durum bayraklarını
+    sayar; dosyaya veya ffmpeg'e yazmak tüketicinin işidir. Akış duraklatmada da
+    okunmaya devam eder, böylece cihaz tamponu taşmaz. ``device`` bir PyAudio
+    cihaz indeksi, ``TEST_TONE_DEVICE`` (mikrofonsuz test sinyali) ya da
+    ``APP_AUDIO_DEVICE`` (``source`` PulseAudio kaynağı, ``parec`` ile) olabilir.
+    Cihaz zaman damgaları (``input_buffer_adc_time``) ilk ve son parça için
+    saklanır; geri çağrı anından cihaz gecikmesi (``current_time`` ile ADC
+    zamanının farkı) çıkarılarak parçanın yakalanma anı ``time.monotonic``
+    cinsinden bulunur.
+    """
+
+    def __init__(self, device, channels=2, rate=44100, chunk_size=1024, ring_chunks=64, source=None,
+                 pulse_server=None):
+        self.device = device
+        self.source = source
+        self.pulse_server = pulse_server
+        self.channels = channels
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.ring = AudioRing(chunk_size * channels * SAMPLE_WIDTH, ring_chunks)
+        self.input_overflows = 0
+        self.input_underflows = 0
+        self.callbacks = 0
+        self.first_device_time = None
+        self.last_device_time = None
+        self._pa = None
+        self._stream = None
+
+    @property
+    def chunk_seconds(self):
+        return self.chunk_size / self.rate
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        self.callbacks += 1
+        if status & PA_INPUT_OVERFLOW:
+            self.input_overflows += 1
+        if status & PA_INPUT_UNDERFLOW:
+            self.input_underflows += 1
+        now = time.monotonic()
+        device_time = time_info.get("input_buffer_adc_time", 0.0) if time_info else 0.0
+        current_time = time_info.get("current_time", 0.0) if time_info else 0.0
+        if device_time and current_time:
+            captured_at = now - max(0.0, current_time - device_time)
+        else:
+            # Bazı sürücüler zaman damgası vermez; parça bir tampon süresi önce başlamıştır
+            captured_at = now - frame_count / self.rate
+        if self.first_device_time is None:
+            self.first_device_time = device_time
+        self.last_device_time = device_time
+        self.ring.push(in_data, device_time, status, captured_at)
+        return None, PA_CONTINUE
+
+    def start(self):
+        if self.device == TEST_TONE_DEVICE:
+            self._stream = ToneInputStream(self._callback, self.channels, self.rate, self.chunk_size)
+        elif self.device == APP_AUDIO_DEVICE:
+            if not self.source:
+                raise RuntimeError("Uygulama sesi için kayıt kaynağı belirtilmedi.")
+            self._stream = PulseInputStream(self._callback, self.source, self.channels, self.rate, self.chunk_size,
+                                            server=self.pulse_server)
+        else:
+            import pyaudio
+            # PyAudio thread'ler arasında paylaşılmaz, her kayıt kendi örneğini kullanır
+            self._pa = pyaudio.PyAudio()
+            self._stream = self._pa.open(format=pyaudio.paInt16, channels=self.channels, rate=self.rate,
+                                         input=True, frames_per_buffer=self.chunk_size,
+                                         input_device_index=self.device, stream_callback=self._callback)
+        self._stream.start_stream()
+
+    def stop(self):
+        """Akışı durdurur; halkada kalan parçalar okunmaya devam edebilir."""
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+        finally:
+            self._stream = None
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+
+    def stats(self):
+        stats = self.ring.stats()
+        stats.update({"input_overflows": self.input_overflows, "input_underflows": self.input_underflows,
+                      "callbacks": self.callbacks})
+        if self.first_device_time is not None:
+            stats["device_seconds"] = self.last_device_time - self.first_device_time
+        return stats
+
+
+class AudioMixer:
+    """Birden çok ses girişini tek bir 16 bit PCM akışında gerçek zamanlı karıştırır.
+
+    Her giriş kendi thread'inden ``write(index, data)`` ile parça verir; tüm
+    açık girişlerde bulunan ortak uzunluk float32 üzerinde ``gains`` ile
+    ölçeklenip toplanır, 16 bit aralığına kırpılır ve ``write`` ile yazılır.
+    Girişlerin örnek ``n``'leri aynı ana karşılık gelmelidir (her giriş
+    AudioSyncCorrector'dan geçtiğinde kayıt saatine hizalıdır). Bir giriş
+    ``max_lag`` saniyeden fazla geride kalırsa (cihaz takıldı) eksik kısmı
+    sessizlik sayılır ve o giriş geldiğinde aynı uzunluk atılır; böylece
+    diğer girişler beklemez ve hizalama bozulmaz. Kapanan giriş karışımdan
+    çıkar; son giriş kapanınca kalan örnekler yazılır ve True döner.
+    """
+
+    def __init__(self, inputs, channels, rate, write, gains=None, max_lag=0.25):
+        if inputs < 1:
+            raise ValueError("Karıştırıcı en az bir giriş gerektirir.")
+        gains = list(gains or [])
+        self.inputs = inputs
+        self.channels = channels
+        self.rate = rate
+        self.gains = [float(gains[i]) if i < len(gains) else 1.0 for i in range(inputs)]
+        self.max_lag = max_lag
+        self._write = write
+        self._frame_bytes = channels * SAMPLE_WIDTH
+        self._pending = [bytearray() for _ in range(inputs)]
+        self._skip = [0] * inputs
+        self._open = [True] * inputs
+        self._lock = threading.Lock()
+        self.mixed = 0
+        self.clipped = 0
+        self.padded = [0] * inputs
+
+    def write(self, index, data):
+        """``index`` girişinin bir parçasını ekler ve karıştırılabilen kısmı yazar."""
+        with self._lock:
+            if not self._open[index]:
+                return
+            skip = min(self._skip[index], len(data) // self._frame_bytes)
+            if skip:
+                # Geride kalırken sessizlikle doldurulan kısım zaten yazıldı
+                self._skip[index] -= skip
+                data = memoryview(data)[skip * self._frame_bytes:]
+            self._pending[index] += data
+            self._mix_available()
+
+    def close(self, index):
+        """Girişi karışımdan çıkarır; tüm girişler kapandıysa kalanları yazar ve True döndürür."""
+        with self._lock:
+            if not self._open[index]:
+                return not any(self._open)
+            self._open[index] = False
+            if any(self._open):
+                self._mix_available()
+                return False
+            # Son giriş: en uzun bekleyen kadar yazılır, kısa kalanlar sessizlikle tamamlanır
+            length = max(len(buffer) for buffer in self._pending) // self._frame_bytes
+            if length:
+                self._mix(length)
+            return True
+
+    def _mix_available(self):
+        active = [i for i in range(self.inputs) if self._open[i]]
+        lengths = [len(self._pending[i]) // self._frame_bytes for i in active]
+        length = min(lengths)
+        longest = max(lengths)
+        lag_limit = int(self.max_lag * self.rate)
+        if longest - length > lag_limit:
+            length = longest - lag_limit
+        # Kapanmış girişlerin kalanı da bu uzunluğa kadar karışıma girer
+        if length > 0:
+            self._mix(length)
+
+    def _mix(self, length):
+        frame_bytes = self._frame_bytes
+        mixed = np.zeros((length, self.channels), dtype=np.float32)
+        for i in range(self.inputs):
+            buffer = self._pending[i]
+            available = min(length, len(buffer) // frame_bytes)
+            if available:
+                samples = np.frombuffer(buffer, dtype="<i2", count=available * self.channels)
+                if self.gains[i] == 1.0:
+                    mixed[:available] += samples.reshape(-1, self.channels)
+                else:
+                    mixed[:available] += samples.reshape(-1, self.channels) * np.float32(self.gains[i])
+                # bytearray küçültülmeden önce üzerindeki görünüm bırakılmalı
+                del samples
+                del buffer[:available * frame_bytes]
+            if available < length and self._open[i]:
+                self._skip[i] += length - available
+                self.padded[i] += length - available
+        self.clipped += int(np.count_nonzero((mixed > 32767) | (mixed < -32768)))
+        np.clip(mixed, -32768, 32767, out=mixed)
+        self.mixed += length
+        self._write(np.rint(mixed).astype("<i2").tobytes())
+
+    def stats(self):
+        total = self.mixed * self.channels
+        return {"inputs": self.inputs, "mixed_seconds": self.mixed / self.rate, "clipped_samples": self.clipped,
+                "clipped_ratio": self.clipped / total if total else 0.0,
+                "padded_seconds": [padded / self.rate for padded in self.padded]}
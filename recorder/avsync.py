@@ -0,0 +1,175 @@
+"""Sesi video ile aynı kayıt saatine (CaptureClock) hizalayan senkron düzeltici ve rapor."""
+import json
+
+import numpy as np
+
+from .log import log_print
+from .metrics import Histogram
+
+
+class AudioSyncCorrector:
+    """Ses parçalarını, ilk örneklerinin ortak kayıt saatindeki zamanına göre hizalar.
+
+    Video kare ``i`` saatte ``i / fps`` anına karşılık gelir; ses akışında da
+    ``n``. örnek ``n / rate`` anına denk gelmelidir. Her parça için yazılmış
+    örnek sayısının saat zamanından farkı (senkron hatası) ölçülür:
+
+    - Hata ``tolerance`` saniyeyi aşarsa (ses geç başladı, cihaz taştı, halka
+      parça düşürdü) fark bir kerede kapatılır: eksik kısım sessizlikle
+      doldurulur, fazla kısım parçanın başından atılır.
+    - Daha küçük, yavaş biriken sapma (cihaz saati ile sistem saati arasındaki
+      kayma) yumuşatılmış hataya göre parçanın en fazla ``max_stretch`` oranında
+      doğrusal yeniden örneklenmesiyle düzeltilir; duyulur bir atlama olmaz.
+
+    Böylece birleştiriciye giden PCM akışının ``t=0`` anı videonun ilk karesiyle
+    aynıdır ve ffmpeg'in girişleri ``t=0``'dan hizalaması doğru sonuç verir.
+    """
+
+    def __init__(self, rate, channels, sample_width=2, tolerance=0.04, max_stretch=0.005, deadband=0.002,
+                 smoothing=0.05):
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.tolerance = tolerance
+        self.max_stretch = max_stretch
+        self.deadband = deadband
+        self.smoothing = smoothing
+        self.error = Histogram("av_sync_error_seconds", "Düzeltme öncesi ses/görüntü senkron hatası (mutlak)")
+
+        self.input_samples = 0
+        self.written = 0
+        self.inserted = 0
+        self.dropped = 0
+        self.stretched = 0
+        self.hard_corrections = 0
+        self.first_time = None
+        self.last_end_time = None
+        self.max_error = 0.0
+        self._filtered = 0.0
+
+    def process(self, data, start_time):
+        """``start_time`` (saat saniyesi) anında başlayan parçanın hizalanmış halini döndürür."""
+        samples = np.frombuffer(data, dtype="<i2").reshape(-1, self.channels)
+        count = len(samples)
+        self.input_samples += count
+        if self.first_time is None:
+            self.first_time = start_time
+        self.last_end_time = start_time + count / self.rate
+
+        # Pozitif hata: ses saatin ilerisinde (fazla örnek yazılmış)
+        error = self.written / self.rate - start_time
+        self.error.observe(abs(error))
+        if abs(error) > abs(self.max_error):
+            self.max_error = error
+        self._filtered += (error - self._filtered) * self.smoothing
+
+        if abs(error) > self.tolerance:
+            self.hard_corrections += 1
+            self._filtered = 0.0
+            offset = int(round(error * self.rate))
+            if offset < 0:
+                silence = np.zeros((-offset, self.channels), dtype="<i2")
+                self.inserted += -offset
+                samples = np.concatenate([silence, samples])
+            else:
+                drop = min(offset, count)
+                self.dropped += drop
+                samples = samples[drop:]
+        elif abs(self._filtered) > self.deadband and count > 1:
+            limit = max(1, int(count * self.max_stretch))
+            change = int(np.clip(round(-self._filtered * self.rate), -limit, limit))
+            if change:
+                samples = self._resample(samples, count + change)
+                self.stretched += abs(change)
+                self._filtered += change / self.rate
+
+        self.written += len(samples)
+        return samples.tobytes()
+
+    def finish(self, end_time):
+        """Kayıt bitişinde cihaz tamponunda kalan son kısmın yerine, sesi ``end_time``'a kadar sessizlikle tamamlar."""
+        missing = int(round(end_time * self.rate)) - self.written
+        if self.first_time is None or missing <= 0 or missing > self.tolerance * self.rate * 4:
+            return b""
+        self.inserted += missing
+        self.written += missing
+        return bytes(missing * self.channels * self.sample_width)
+
+    @staticmethod
+    def _resample(samples, length):
+        """Parçayı ``length`` örneğe doğrusal aradeğerlemeyle uzatır veya kısaltır."""
+        positions = np.linspace(0, len(samples) - 1, length)
+        left = np.floor(positions).astype(np.intp)
+        right = np.minimum(left + 1, len(samples) - 1)
+        fraction = (positions - left)[:, None]
+        mixed = samples[left] * (1.0 - fraction) + samples[right] * fraction
+        return np.clip(np.rint(mixed), -32768, 32767).astype("<i2")
+
+    def stats(self):
+        """Düzeltmelerin milisaniye cinsinden özeti ve cihazın saate göre kayması (ppm)."""
+        span = (self.last_end_time - self.first_time) if self.first_time is not None else 0.0
+        # Kısa kayıtlarda zamanlama titreşimi kaymadan büyüktür
+        drift = (self.input_samples / self.rate - span) / span * 1e6 if span >= 10.0 else None
+        snapshot = self.error.snapshot()
+        return {
+            "audio_start_ms": self.first_time * 1000.0 if self.first_time is not None else None,
+            "error_p50_ms": snapshot["p50"] * 1000.0,
+            "error_p99_ms": snapshot["p99"] * 1000.0,
+            "error_max_ms": self.max_error * 1000.0,
+            "inserted_ms": self.inserted / self.rate * 1000.0,
+            "dropped_ms": self.dropped / self.rate * 1000.0,
+            "stretched_ms": self.stretched / self.rate * 1000.0,
+            "hard_corrections": self.hard_corrections,
+            "device_drift_ppm": drift,
+            "audio_seconds": self.written / self.rate,
+        }
+
+
+def sync_report(correctors, lateness, video_frames, fps):
+    """Bir kaydın senkron raporu: ses düzeltmeleri, kare gecikmeleri ve bitişteki ses/görüntü farkı.
+
+    ``correctors`` ses girişlerinin düzelticileridir (senkron kapalıysa None
+    olabilir). İlk girişin değerleri raporun üst düzeyindedir; birden çok
+    girişte her birininki ayrıca ``inputs`` listesinde yer alır.
+    """
+    report = {"video_seconds": video_frames / fps if fps else 0.0}
+    snapshot = lateness.snapshot()
+    report.update({"frame_lateness_p50_ms": snapshot["p50"] * 1000.0,
+                   "frame_lateness_p99_ms": snapshot["p99"] * 1000.0,
+                   "frame_lateness_max_ms": snapshot["max"] * 1000.0})
+    inputs = []
+    for corrector in correctors or ():
+        if corrector is None:
+            continue
+        stats = corrector.stats()
+        stats["end_offset_ms"] = (stats["audio_seconds"] - report["video_seconds"]) * 1000.0
+        inputs.append(stats)
+    if inputs:
+        report.update(inputs[0])
+    if len(inputs) > 1:
+        report["inputs"] = inputs
+    return report
+
+
+def log_sync_report(report):
+    parts = [f"kare gecikmesi p99={report['frame_lateness_p99_ms']:.1f} ms"]
+    if "audio_seconds" in report:
+        drift = report["device_drift_ppm"]
+        parts += [f"ses başlangıcı={report['audio_start_ms']:.1f} ms",
+                  f"hata p99/maks={report['error_p99_ms']:.1f}/{report['error_max_ms']:.1f} ms",
+                  f"eklenen/atılan/esnetilen={report['inserted_ms']:.0f}/{report['dropped_ms']:.0f}/"
+                  f"{report['stretched_ms']:.1f} ms",
+                  f"cihaz kayması={'?' if drift is None else f'{drift:.0f} ppm'}",
+                  f"bitiş farkı={report['end_offset_ms']:.1f} ms"]
+    if "inputs" in report:
+        worst = max(report["inputs"], key=lambda stats: abs(stats["end_offset_ms"]))
+        parts.append(f"{len(report['inputs'])} giriş, en büyük bitiş farkı={worst['end_offset_ms']:.1f} ms")
+    log_print("Ses/görüntü senkronu: " + ", ".join(parts))
+
+
+def write_sync_report(report, path):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        log_print(f"Senkron raporu yazılamadı: {e}", level="warning")
@@ -0,0 +1,425 @@
+"""Kayıt yolunun aşamalarını ekransız ölçen kıyaslama: ``python -m recorder.bench``.
+
+Yakalama, renk dönüşümü, önizleme küçültmesi ve kodlama aşamaları
+``SyntheticScreen`` ile, ses karıştırıcısı yapay PCM girişleriyle beslenir;
+Xvfb'de veya ekransız bir derleme makinesinde çalışır. Sonuçlar JSON olarak
+yazılır, ``--compare`` önceki bir çalıştırmaya göre gerilemeleri bildirir ve
+çıkış kodunu 1 yapar.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .audio import SAMPLE_WIDTH, AudioMixer
+from .damage import DamageDetector
+from .encoders import ENCODER_PRESETS, FFMPEG_CODECS, VIDEO_ENCODERS, FFmpegEncoder, OpenCVEncoder
+from .engine import Recorder
+from .framepath import FramePath
+from .log import log_print
+from .mux import ffmpeg_available
+from .synthetic import SyntheticScreen
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "1440p": (2560, 1440), "4k": (3840, 2160)}
+# Arayüzdeki önizleme tuvalinin en büyük boyutu
+PREVIEW_SIZE = (850, 700)
+# Kodlama aşamasında döngüyle yazılan farklı kare sayısı (4K'da kare başına ~33 MB)
+ENCODE_SOURCE_FRAMES = 4
+# Karşılaştırmada bakılan ölçüler ve hangi yönün kötüleşme olduğu
+COMPARED_METRICS = {"fps_achieved": "lower", "peak_rss_mb": "higher"}
+
+
+class ResourceSampler:
+    """Bir aşama boyunca CPU süresini ve (psutil varsa) bu süreç ile alt süreçlerinin en yüksek RSS'ini ölçer.
+
+    CPU yüzdesi ``os.times`` farklarından hesaplanır; beklenmiş alt süreçlerin
+    (ör. ffmpeg) süresi dahildir, 100 bir çekirdeğin tamamıdır.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+
+    def _rss(self):
+        total = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self._rss())
+
+    def __enter__(self):
+        if self._process is not None:
+            self.peak_rss = self._rss()
+            self._thread = threading.Thread(target=self._run, name="recorder-bench-rss", daemon=True)
+            self._thread.start()
+        self._times = os.times()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._started
+        end = os.times()
+        cpu = sum(end[i] - self._times[i] for i in range(4))
+        self.cpu_percent = cpu / self.seconds * 100.0 if self.seconds > 0 else 0.0
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak_rss = max(self.peak_rss, self._rss())
+
+    @property
+    def peak_rss_mb(self):
+        return round(self.peak_rss / 2 ** 20, 1) if self._process is not None else None
+
+
+def _result(stage, resolution, size, frames, sampler, bytes_processed, fps=None, codec=None):
+    width, height = size
+    achieved = frames / sampler.seconds if sampler.seconds > 0 else 0.0
+    return {
+        "stage": stage,
+        "resolution": resolution,
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "codec": codec,
+        "frames": frames,
+        "seconds": round(sampler.seconds, 4),
+        "fps_achieved": round(achieved, 2),
+        "realtime_factor": round(achieved / fps, 3) if fps else None,
+        "cpu_percent": round(sampler.cpu_percent, 1),
+        "peak_rss_mb": sampler.peak_rss_mb,
+        "bytes_per_second": round(bytes_processed / sampler.seconds) if sampler.seconds > 0 else 0,
+    }
+
+
+def bench_frame_stages(resolution, frames):
+    """Yakalama, dönüşüm, önizleme küçültmesi ve hasar tespiti aşamalarını ölçer."""
+    size = RESOLUTIONS[resolution]
+    width, height = size
+    region = {"left": 0, "top": 0, "width": width, "height": height}
+    frame_bytes = width * height * 4
+    results = []
+    with SyntheticScreen(width, height) as screen:
+        path = FramePath("bgr24")
+        with ResourceSampler() as sampler:
+            for _ in range(frames):
+                path.wrap(screen.grab(region))
+        results.append(_result("capture", resolution, size, frames, sampler, frames * frame_bytes))
+
+        sources = [path.wrap(screen.grab(region)) for _ in range(ENCODE_SOURCE_FRAMES)]
+
+    with ResourceSampler() as sampler:
+        for i in range(frames):
+            path.convert(sources[i % len(sources)])
+    results.append(_result("convert", resolution, size, frames, sampler, frames * frame_bytes))
+
+    # Arayüzdeki _screen_preview_loop ile aynı küçültme ve renk dönüşümü
+    ratio = min(PREVIEW_SIZE[0] / width, PREVIEW_SIZE[1] / height)
+    preview_size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+    with ResourceSampler() as sampler:
+        for i in range(frames):
+            preview = cv2.resize(sources[i % len(sources)], preview_size, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(preview, cv2.COLOR_BGRA2RGB)
+    results.append(_result("resize", resolution, size, frames, sampler, frames * frame_bytes))
+
+    detector = DamageDetector()
+    with ResourceSampler() as sampler:
+        for i in range(frames):
+            detector.update(sources[i % len(sources)])
+    results.append(_result("damage", resolution, size, frames, sampler, frames * frame_bytes))
+    return results, sources
+
+
+def bench_encode(resolution, sources, fps, codec, frames, preset, workdir):
+    """Kareleri hız sınırı olmadan kodlayıcıya verir; gerçek zamana oranı ve çıktı bit hızını ölçer."""
+    size = RESOLUTIONS[resolution]
+    width, height = size
+    if codec == "opencv":
+        encoder = OpenCVEncoder()
+        filename = os.path.join(workdir, f"{resolution}_{fps}_{codec}.avi")
+    else:
+        encoder = FFmpegEncoder(codec, preset=preset)
+        filename = encoder.output_filename(os.path.join(workdir, f"{resolution}_{fps}_{codec}.mp4"))
+    path = FramePath(encoder.input_pix_fmt)
+    with ResourceSampler() as sampler:
+        encoder.open(filename, width, height, fps)
+        for i in range(frames):
+            encoder.write(path.convert(sources[i % len(sources)]))
+        returncode = encoder.finish()
+    result = _result("encode", resolution, size, frames, sampler, frames * width * height * 4, fps=fps, codec=codec)
+    output_bytes = os.path.getsize(filename) if os.path.exists(filename) else 0
+    # Çıktının bit hızı: dosya boyutu / videonun süresi
+    result["output_bytes_per_second"] = round(output_bytes / (frames / fps))
+    result["returncode"] = returncode
+    if returncode != 0:
+        result["error"] = encoder.error_text.strip()[-500:]
+    if os.path.exists(filename):
+        os.remove(filename)
+    return result
+
+
+def bench_record(resolution, fps, codec, seconds, change_rate, preset, workdir):
+    """Kayıt motorunu yapay kaynakla uçtan uca çalıştırır; zamanlamayı ve kare sayaçlarını ölçer.
+
+    ``fps_achieved`` yapılan yakalama sayısı / süredir; ``realtime_factor`` 1'in
+    altındaysa yakalama kare zamanlarına yetişememiştir.
+    """
+    size = RESOLUTIONS[resolution]
+    width, height = size
+    settings = {"capture_source": "synthetic", "synthetic_width": width, "synthetic_height": height,
+                "synthetic_change_rate": change_rate, "video_encoder": codec, "encoder_preset": preset}
+    filename = os.path.join(workdir, f"record_{resolution}_{fps}_{codec}.{'avi' if codec == 'opencv' else 'mp4'}")
+    recorder = Recorder(filename, {"left": 0, "top": 0, "width": width, "height": height}, fps=fps, settings=settings)
+    with ResourceSampler() as sampler:
+        recorder.start()
+        recorder.wait(seconds)
+        outcome = recorder.stop()
+    metrics = recorder.metrics
+    result = _result("record", resolution, size, metrics.grab.count, sampler,
+                     metrics.grab.count * width * height * 4, fps=fps, codec=codec)
+    # Durdurma ve tamamlama süresi kayıt süresine sayılmaz
+    result["fps_achieved"] = round(metrics.grab.count / seconds, 2)
+    result["realtime_factor"] = round(metrics.grab.count / seconds / fps, 3)
+    result["change_rate"] = change_rate
+    result.update(metrics.counters())
+    result["grab_p99_ms"] = round(metrics.grab.quantile(0.99) * 1000, 2)
+    result["encode_p99_ms"] = round(metrics.encode.quantile(0.99) * 1000, 2)
+    result["returncode"] = outcome["returncode"] if outcome["error"] is None else 1
+    if outcome["error"] or outcome["encoder_error"]:
+        result["error"] = outcome["error"] or outcome["encoder_error"]
+    for path in (outcome["video"], recorder.filename):
+        if path and os.path.exists(path):
+            os.remove(path)
+    return result
+
+
+def bench_audio_mix(inputs, rate, seconds, channels=2, chunk_size=1024):
+    """``inputs`` girişi parça parça AudioMixer'a verir ve karışımın gerçek zamana oranını ölçer.
+
+    Girişler kırpma yolunun da ölçülmesi için tam ölçeğe yakın gürültüdür ve
+    kazançları farklıdır (1, 0.5, 0.7, ...).
+    """
+    rng = np.random.default_rng(0)
+    chunks = [rng.integers(-20000, 20000, (chunk_size, channels)).astype("<i2").tobytes() for _ in range(inputs)]
+    gains = [1.0] + [0.5 + 0.2 * (i % 3) for i in range(1, inputs)]
+    mixer = AudioMixer(inputs, channels, rate, lambda data: None, gains=gains)
+    count = max(1, int(seconds * rate / chunk_size))
+    with ResourceSampler() as sampler:
+        for _ in range(count):
+            for i in range(inputs):
+                mixer.write(i, chunks[i])
+    audio_seconds = count * chunk_size / rate
+    return {
+        "stage": "audio_mix",
+        "resolution": None,
+        "fps": None,
+        "codec": None,
+        "inputs": inputs,
+        "rate": rate,
+        "channels": channels,
+        "frames": count,
+        "seconds": round(sampler.seconds, 4),
+        "fps_achieved": round(count / sampler.seconds, 2) if sampler.seconds > 0 else 0.0,
+        "realtime_factor": round(audio_seconds / sampler.seconds, 1) if sampler.seconds > 0 else None,
+        "cpu_percent": round(sampler.cpu_percent, 1),
+        "peak_rss_mb": sampler.peak_rss_mb,
+        "bytes_per_second": round(count * chunk_size * channels * SAMPLE_WIDTH * inputs / sampler.seconds)
+        if sampler.seconds > 0 else 0,
+        "clipped_ratio": round(mixer.stats()["clipped_ratio"], 4),
+    }
+
+
+def environment():
+    """Sonuçların hangi ortamda alındığını kaydeder."""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "psutil": psutil.__version__ if PSUTIL_AVAILABLE else None,
+        "ffmpeg": None,
+    }
+    if ffmpeg_available():
+        try:
+            output = subprocess.run(["ffmpeg", "-hide_banner", "-version"], capture_output=True, text=True).stdout
+            info["ffmpeg"] = output.splitlines()[0] if output else None
+        except OSError:
+            pass
+    return info
+
+
+def run_benchmark(resolutions, fps_values, codecs, frames, encode_frames, preset, record_seconds=0.0,
+                  change_rate=1.0, audio_inputs=4, audio_rate=48000, audio_seconds=0.0):
+    """Tüm aşamaları çalıştırır ve JSON'a yazılacak raporu döndürür."""
+    report = {
+        "version": 1,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "config": {"resolutions": resolutions, "fps": fps_values, "codecs": codecs, "frames": frames,
+                   "encode_frames": encode_frames, "preset": preset, "record_seconds": record_seconds,
+                   "change_rate": change_rate, "audio_inputs": audio_inputs, "audio_rate": audio_rate,
+                   "audio_seconds": audio_seconds},
+        "results": [],
+    }
+    have_ffmpeg = ffmpeg_available()
+    workdir = tempfile.mkdtemp(prefix="recorder_bench_")
+    try:
+        for resolution in resolutions:
+            log_print(f"Kıyaslama: {resolution} kare aşamaları")
+            results, sources = bench_frame_stages(resolution, frames)
+            report["results"] += results
+            for fps in fps_values:
+                for codec in codecs:
+                    if codec in FFMPEG_CODECS and not have_ffmpeg:
+                        log_print(f"ffmpeg bulunamadı, {codec} atlanıyor.", level="warning")
+                        continue
+                    log_print(f"Kıyaslama: {resolution} {fps} FPS {codec}")
+                    report["results"].append(
+                        bench_encode(resolution, sources, fps, codec, encode_frames, preset, workdir))
+                    if record_seconds > 0:
+                        log_print(f"Kıyaslama: {resolution} {fps} FPS {codec} kayıt ({record_seconds:g} sn)")
+                        report["results"].append(bench_record(resolution, fps, codec, record_seconds, change_rate,
+                                                              preset, workdir))
+            del sources
+        if audio_seconds > 0:
+            log_print(f"Kıyaslama: ses karıştırıcısı, {audio_inputs} giriş, {audio_rate} Hz")
+            report["results"].append(bench_audio_mix(audio_inputs, audio_rate, audio_seconds))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def _key(result):
+    return (result["stage"], result["resolution"], result["fps"], result["codec"])
+
+
+def compare(report, baseline, tolerance):
+    """``baseline`` raporuna göre ``tolerance`` oranından fazla kötüleşen ölçüleri listeler."""
+    previous = {_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(_key(result))
+        if old is None:
+            continue
+        for metric, worse in COMPARED_METRICS.items():
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (worse == "lower" and change < -tolerance) or (worse == "higher" and change > tolerance):
+                regressions.append({"stage": result["stage"], "resolution": result["resolution"],
+                                    "fps": result["fps"], "codec": result["codec"], "metric": metric,
+                                    "baseline": before, "current": after, "change": round(change, 3)})
+    return regressions
+
+
+def _csv(cast):
+    def parse(text):
+        try:
+            return [cast(part) for part in text.split(",") if part]
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"virgülle ayrılmış liste bekleniyordu: {text}")
+    return parse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m recorder.bench",
+                                     description="Kayıt yolunu yapay kareler ile ekransız ölçer.")
+    parser.add_argument("--resolutions", type=_csv(str), default=["720p", "1080p", "1440p", "4k"],
+                        help=f"virgülle ayrılmış çözünürlükler ({', '.join(RESOLUTIONS)})")
+    parser.add_argument("--fps", type=_csv(int), default=[30, 60], help="kodlama aşamasının kare hızları (ör. 30,60)")
+    parser.add_argument("--codecs", type=_csv(str), default=["libx264", "opencv"],
+                        help=f"virgülle ayrılmış kodlayıcılar ({', '.join(VIDEO_ENCODERS)})")
+    parser.add_argument("--frames", type=int, default=120, help="kare aşamalarında ölçülen kare sayısı")
+    parser.add_argument("--encode-frames", type=int, help="kodlama aşamasında yazılan kare sayısı (varsayılan --frames)")
+    parser.add_argument("--preset", choices=ENCODER_PRESETS, default="veryfast", help="ffmpeg kodlayıcı preset'i")
+    parser.add_argument("--record-seconds", type=float, default=0.0,
+                        help="her çözünürlük/FPS/kodlayıcı için kayıt motorunu yapay kaynakla bu kadar saniye "
+                             "çalıştır (0 = atla)")
+    parser.add_argument("--change-rate", type=float, default=1.0,
+                        help="kayıt aşamasında değişen karelerin oranı (0-1)")
+    parser.add_argument("--audio-seconds", type=float, default=30.0,
+                        help="ses karıştırıcısında karıştırılacak ses süresi (0 = atla)")
+    parser.add_argument("--audio-inputs", type=int, default=4, help="ses karıştırıcısının giriş sayısı")
+    parser.add_argument("--audio-rate", type=int, default=48000, help="ses karıştırıcısının örnekleme hızı (Hz)")
+    parser.add_argument("--output", help="JSON raporun yazılacağı dosya (varsayılan standart çıktı)")
+    parser.add_argument("--compare", metavar="RAPOR", help="gerilemeleri bulmak için önceki JSON rapor")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="karşılaştırmada kabul edilen kötüleşme oranı (varsayılan 0.1)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [r for r in args.resolutions if r not in RESOLUTIONS] + \
+              [c for c in args.codecs if c not in VIDEO_ENCODERS]
+    if unknown:
+        parser.error(f"bilinmeyen çözünürlük veya kodlayıcı: {', '.join(unknown)}")
+    if args.frames <= 0 or any(fps <= 0 for fps in args.fps):
+        parser.error("kare sayısı ve kare hızları pozitif olmalı")
+    if not 0 <= args.change_rate <= 1:
+        parser.error("değişim oranı 0 ile 1 arasında olmalı")
+    if args.audio_inputs <= 0 or args.audio_rate <= 0:
+        parser.error("ses girişi sayısı ve örnekleme hızı pozitif olmalı")
+
+    # Mesajlar zaten konsola yazılıyor, logging ikinci kez stderr'e basmasın
+    logging.getLogger().addHandler(logging.NullHandler())
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Rapor standart çıktıya yazılıyorsa ilerleme mesajları onu bozmasın
+    progress = contextlib.redirect_stdout(sys.stderr) if args.output is None else contextlib.nullcontext()
+    with progress:
+        report = run_benchmark(args.resolutions, args.fps, args.codecs, args.frames,
+                               args.encode_frames or args.frames, args.preset, args.record_seconds,
+                               args.change_rate, args.audio_inputs, args.audio_rate, args.audio_seconds)
+        if baseline is not None:
+            report["regressions"] = compare(report, baseline, args.tolerance)
+            for item in report["regressions"]:
+                case = " ".join(str(item[key]) for key in ("stage", "resolution", "fps", "codec") if item[key])
+                log_print(f"Gerileme: {case} {item['metric']} {item['baseline']} -> {item['current']} "
+                          f"(%{item['change'] * 100:+.0f})", level="warning")
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        log_print(f"Kıyaslama raporu yazıldı: {args.output}")
+    else:
+        print(text)
+    failed = any(r.get("returncode", 0) != 0 for r in report["results"])
+    return 1 if report.get("regressions") or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
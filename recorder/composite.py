@@ -0,0 +1,111 @@
+"""Birden çok monitörü tek bir çıktı karesinde birleştiren (kompozit) yakalama."""
+import math
+
+import cv2
+import numpy as np
+
+from .framepath import wrap_screenshot
+
+COMPOSITE_LAYOUTS = ("desktop", "horizontal", "vertical", "grid")
+
+
+def _even(value):
+    return max(2, int(value) // 2 * 2)
+
+
+class Compositor:
+    """Monitör bölgelerini önceden ayrılmış tek bir BGRA tamponda yan yana dizer.
+
+    Yerleşimler: ``desktop`` monitörleri sanal masaüstündeki konumlarıyla tutar ve
+    tüm alanı tek bir ``grab`` ile yakalar (mss'in ``monitors[0]`` birleştirmesi);
+    ``horizontal``, ``vertical`` ve ``grid`` her monitörü ayrı yakalayıp sırayla
+    dizer. ``scale`` (0 < scale <= 1) çıktıyı küçültür. Ölçekleme ``cv2.resize``
+    ile doğrudan tampondaki hedef dilime yazılır, ölçeksiz döşeme ``np.copyto``
+    ile yapılır; kare başına bellek ayrılmaz. Çıktı boyutu çift sayıya yuvarlanır.
+    1/2, 1/3 gibi tam sayı oranlarında kaynak oranın katına kırpılır, böylece
+    OpenCV'nin hızlı tam sayı INTER_AREA yolu kullanılır; diğer oranlarda
+    INTER_LINEAR seçilir.
+    """
+
+    def __init__(self, monitors, layout="desktop", scale=1.0):
+        if not monitors:
+            raise ValueError("Kompozit kayıt için en az bir monitör gerekli.")
+        if layout not in COMPOSITE_LAYOUTS:
+            raise ValueError(f"Geçersiz kompozit yerleşim: {layout}")
+        if not 0 < scale <= 1:
+            raise ValueError(f"Geçersiz ölçek: {scale}")
+        self.monitors = [dict(m) for m in monitors]
+        self.layout = layout
+        self.scale = scale
+
+        if layout == "desktop":
+            left = min(m["left"] for m in self.monitors)
+            top = min(m["top"] for m in self.monitors)
+            right = max(m["left"] + m["width"] for m in self.monitors)
+            bottom = max(m["top"] + m["height"] for m in self.monitors)
+            # Tek yakalama: sanal masaüstündeki sınırlayıcı dikdörtgen
+            self.grabs = [{"left": left, "top": top, "width": right - left, "height": bottom - top}]
+            self.width = _even((right - left) * scale)
+            self.height = _even((bottom - top) * scale)
+            self.tiles = [(0, 0, self.width, self.height)]
+        else:
+            self.grabs = self.monitors
+            self.tiles, self.width, self.height = self._arrange()
+
+        self.buffer = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        self._views = [self.buffer[y:y + h, x:x + w] for x, y, w, h in self.tiles]
+        inverse = 1.0 / scale
+        self._integer_ratio = abs(inverse - round(inverse)) < 1e-6
+        self._interpolation = cv2.INTER_AREA if self._integer_ratio else cv2.INTER_LINEAR
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def _arrange(self):
+        """Sıralı yerleşimlerde her monitörün çıktıdaki (x, y, w, h) dilimini hesaplar."""
+        sizes = [(max(1, round(m["width"] * self.scale)), max(1, round(m["height"] * self.scale)))
+                 for m in self.monitors]
+        if self.layout == "horizontal":
+            columns = len(sizes)
+        elif self.layout == "vertical":
+            columns = 1
+        else:
+            columns = math.ceil(math.sqrt(len(sizes)))
+        rows = [sizes[i:i + columns] for i in range(0, len(sizes), columns)]
+        column_widths = [max(row[c][0] for row in rows if c < len(row)) for c in range(columns)]
+        row_heights = [max(h for _, h in row) for row in rows]
+
+        tiles = []
+        y = 0
+        for row, row_height in zip(rows, row_heights):
+            x = 0
+            for c, (w, h) in enumerate(row):
+                tiles.append((x, y, w, h))
+                x += column_widths[c]
+            y += row_height
+        width, height = _even(sum(column_widths)), _even(sum(row_heights))
+        # Çift sayıya yuvarlama son döşemeyi kırpabilir
+        tiles = [(x, y, min(w, width - x), min(h, height - y)) for x, y, w, h in tiles]
+        return tiles, width, height
+
+    def capture(self, sct, wrap=wrap_screenshot):
+        """Tüm monitörleri yakalayıp kompozit kareyi döndürür (bir sonraki yakalamaya kadar geçerli)."""
+        for region, view in zip(self.grabs, self._views):
+            frame = wrap(sct.grab(region))
+            h, w = view.shape[:2]
+            if len(self.grabs) == 1 and frame.shape[:2] == (h, w):
+                # Ölçeksiz masaüstü: yakalanan kare zaten kompozit karedir, kopya gerekmez
+                return frame
+            if self.scale == 1.0:
+                # Çift sayıya yuvarlama nedeniyle kaynak bir piksel büyük olabilir
+                np.copyto(view, frame[:h, :w])
+            else:
+                if self._integer_ratio:
+                    inverse = round(1.0 / self.scale)
+                    frame = frame[:h * inverse, :w * inverse]
+                cv2.resize(frame, (w, h), dst=view, interpolation=self._interpolation)
+        return self.buffer
+
+    def describe(self):
+        return f"{len(self.monitors)} monitör, {self.layout} yerleşim, ölçek {self.scale:g} -> {self.width}x{self.height}"
@@ -0,0 +1,143 @@
+"""Kodlayıcıyı ayrı bir süreçte çalıştıran, kareleri paylaşılan bellekten alan sarmalayıcı."""
+import multiprocessing
+import queue
+import signal
+import time
+
+from .framepath import FramePath
+from .pipeline import drain_ring
+from .shmring import SharedFrameRing
+
+
+def _encoder_process(ring, settings, filename, width, height, fps, messages):
+    """Alt süreç: kodlayıcıyı açar, halkadaki kareleri kopyalamadan kodlar ve sonucu bildirir."""
+    # Ctrl+C tüm süreç grubuna gider; kodlama halka kapanana kadar sürer, dosya yarım kalmaz
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # encoders modülü bu modülü içe aktardığı için burada yüklenir
+    from .encoders import create_encoder
+    encoder = create_encoder(dict(settings, encode_process=False))
+    try:
+        encoder.open(encoder.output_filename(filename), width, height, fps)
+    except Exception as e:
+        messages.put(("failed", str(e)))
+        ring.detach()
+        return
+    messages.put(("ready", encoder.filename, encoder.describe()))
+
+    frame_path = FramePath(encoder.input_pix_fmt)
+    error = None
+    duplicated = 0
+    try:
+        duplicated = drain_ring(ring, encoder.write, frame_path.convert, lambda: ring.total_frames or 0)
+    except Exception as e:
+        ring.close()
+        error = f"Video yazılırken hata oluştu: {e}"
+    try:
+        encoder.close_video()
+        returncode = encoder.finish()
+    except Exception as e:
+        returncode = -1
+        error = error or str(e)
+    if error is None and returncode != 0:
+        error = encoder.error_text
+    messages.put(("result", returncode if error is None else (returncode or -1), error or "", duplicated))
+    ring.detach()
+
+
+class ProcessEncoder:
+    """``settings``'teki kodlayıcıyı ayrı bir süreçte çalıştırır (yakalama ve kodlama ayrı çekirdeklerde).
+
+    ``open`` paylaşılan bellekte bir SharedFrameRing oluşturur ve kodlama sürecini
+    başlatır; süreç kodlayıcıyı açtığını bildirene kadar bekler. Recorder kareleri
+    ``write`` yerine doğrudan ``ring`` yuvalarına yakalar; süreç onları kopyalamadan
+    dönüştürüp kodlar ve sabit kare hızı için boşlukları kendisi doldurur. Halka
+    dolduğunda ``frame_ring_policy`` uygulanır (geri basınç veya kare düşürme).
+
+    Ses taşımaz; ses ayrı bir dosyaya kodlanır ve kayıttan sonra birleştirilir.
+    """
+
+    input_pix_fmt = "bgra"
+    has_audio = False
+
+    def __init__(self, settings, ring_size=6, ring_policy="drop_oldest", ready_timeout=30.0):
+        from .encoders import create_encoder
+        self.settings = dict(settings)
+        # Yalnızca dosya adı ve açıklama için; asıl kodlayıcı alt süreçte oluşturulur
+        self._inner = create_encoder(dict(self.settings, encode_process=False))
+        self.name = f"process-{self._inner.name}"
+        self.ring_size = ring_size
+        self.ring_policy = ring_policy
+        self.ready_timeout = ready_timeout
+
+        self.filename = None
+        self.ring = None
+        self._process = None
+        self._messages = None
+        self._description = self._inner.describe()
+        self._error_text = ""
+        self.duplicated = 0
+
+    @property
+    def needs_ffmpeg(self):
+        """Alt süreçte çalışacak kodlayıcı ffmpeg gerektiriyorsa True."""
+        return self._inner.needs_ffmpeg
+
+    def output_filename(self, filename):
+        return self._inner.output_filename(filename)
+
+    def open(self, filename, width, height, fps, audio_channels=None, audio_rate=None, audio_tracks=1):
+        self.ring = SharedFrameRing((height, width, 4), capacity=self.ring_size, policy=self.ring_policy)
+        self._messages = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_encoder_process, name="recorder-encoder",
+            args=(self.ring, self.settings, filename, width, height, fps, self._messages))
+        self._process.daemon = True
+        self._process.start()
+        try:
+            message = self._messages.get(timeout=self.ready_timeout)
+        except queue.Empty:
+            message = ("failed", "Kodlama süreci zamanında hazır olmadı.")
+        if message[0] != "ready":
+            self._shutdown(timeout=5)
+            raise RuntimeError(message[1])
+        _, self.filename, self._description = message
+
+    def close_video(self):
+        """Halkayı kapatır; süreç bekleyen kareleri kodlayıp dosyayı tamamlar."""
+        if self.ring is not None:
+            self.ring.close()
+
+    def finish(self, timeout=None):
+        """Kodlama sürecinin bitmesini bekler ve kodlayıcının çıkış kodunu döndürür."""
+        self.close_video()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        returncode = -1
+        while True:
+            try:
+                _, returncode, self._error_text, self.duplicated = self._messages.get(timeout=1.0)
+                break
+            except queue.Empty:
+                if not self._process.is_alive():
+                    self._error_text = "Kodlama süreci sonuç bildirmeden sonlandı."
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    self._error_text = "Kodlama süreci zaman aşımına uğradı."
+                    break
+        self._shutdown(timeout=5)
+        return returncode
+
+    def _shutdown(self, timeout):
+        if self._process is not None:
+            self._process.join(timeout=timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+        if self.ring is not None:
+            self.ring.detach()
+            self.ring = None
+
+    @property
+    def error_text(self):
+        return self._error_text
+
+    def describe(self):
+        return f"{self._description} (ayrı süreçte)"
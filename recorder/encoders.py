@@ -0,0 +1,303 @@
+"""Donanımdan bağımsız (yalnızca CPU) video kodlayıcı arka uçları."""
+import os
+
+import cv2
+
+from .log import log_print
+from .mux import AUDIO_CODECS, DEFAULT_AUDIO_BITRATE, EVEN_CROP_FILTER, FFmpegMuxer, audio_codec_args
+from .segments import FRAGMENTED_MP4_FLAGS, OUTPUT_MODES, concat_segments, read_segment_index, segment_paths
+
+# ffmpeg kodlayıcıları ve desteklenen kapsayıcılar; uyumsuz formatta mkv kullanılır
+FFMPEG_CODECS = {
+    "libx264": ("mp4", "mkv", "avi"),
+    "libx265": ("mp4", "mkv"),
+    "libvpx-vp9": ("mp4", "mkv", "webm"),
+    "ffv1": ("mkv", "avi"),
+}
+VIDEO_ENCODERS = ("opencv",) + tuple(FFMPEG_CODECS)
+ENCODER_PRESETS = ("ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow")
+
+# libvpx-vp9 preset yerine -cpu-used kullanır (büyük değer = daha hızlı)
+_VP9_CPU_USED = {"ultrafast": 8, "superfast": 8, "veryfast": 7, "faster": 6, "fast": 5, "medium": 4, "slow": 2}
+
+
+class OpenCVEncoder:
+    """cv2.VideoWriter ile FourCC tabanlı kodlayıcı.
+
+    Ses taşımaz; ses kayıt sırasında ayrı bir dosyaya kodlanır (ffmpeg yoksa
+    WAV) ve kayıttan sonra ffmpeg ile birleştirilir. Preset ve iş parçacığı ayarları uygulanmaz,
+    ``quality`` yalnızca bunu destekleyen FourCC'lerde (ör. MJPG) etkilidir.
+    """
+
+    name = "opencv"
+    input_pix_fmt = "bgr24"
+    has_audio = False
+    needs_ffmpeg = False
+
+    def __init__(self, fourcc=None, quality=None):
+        self.fourcc = fourcc
+        self.quality = quality
+        self.filename = None
+        self.writer = None
+
+    def output_filename(self, filename):
+        return filename
+
+    def open(self, filename, width, height, fps, audio_channels=None, audio_rate=None, audio_tracks=1):
+        ext = os.path.splitext(filename)[1].lower()
+        # Eski davranış: mp4 için mp4v, diğerleri için XVID
+        fourcc = self.fourcc or ("mp4v" if ext == ".mp4" else "XVID")
+        self.fourcc = fourcc
+        self.filename = filename
+        self.writer = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height), True)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Video yazıcısı açılamadı ({fourcc}). '{filename}' yazılabilir mi veya codec destekleniyor mu?")
+        if self.quality is not None:
+            self.writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.quality)
+
+    def write(self, frame):
+        self.writer.write(frame)
+
+    def close_video(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def finish(self, timeout=None):
+        self.close_video()
+        return 0
+
+    @property
+    def error_text(self):
+        return ""
+
+    def describe(self):
+        return f"OpenCV VideoWriter ({self.fourcc or 'otomatik'})"
+
+
+class FFmpegEncoder:
+    """Ham kareleri boru üzerinden ffmpeg'e veren kodlayıcı (x264, x265, VP9, FFV1).
+
+    Ses ve görüntü aynı ffmpeg sürecinde canlı olarak birleştirilir.
+    ``crf`` sabit kalite, ``bitrate`` (ör. "6M") verilirse hedef bit hızı
+    kullanılır. ``threads`` 0 ise ffmpeg iş parçacığı sayısını kendisi seçer.
+    Kareler mss'in BGRA düzeninde verilir; renk dönüşümünü ffmpeg yapar.
+
+    ``output_mode`` çökmeye karşı dayanıklılığı belirler: ``fragmented`` mp4'ü
+    parçalı (moov başta) yazar, ``segmented`` ``segment_seconds`` uzunluğunda ayrı
+    dosyalar ve bir dizin dosyası üretir; kayıt bitince parçalar yeniden
+    kodlanmadan asıl dosyada birleştirilir. Her iki modda da anahtar kareler
+    ``segment_seconds`` aralıkla zorlanır, böylece çökmede en fazla bu kadar kayıp olur.
+
+    ``scale`` 1'den küçükse kareler kodlamadan önce ffmpeg'de küçültülür. Ses
+    ``audio_codec`` (aac, opus) ile ``audio_bitrate`` hızında kodlanır; FFV1'de FLAC kullanılır.
+    """
+
+    input_pix_fmt = "bgra"
+    needs_ffmpeg = True
+
+    def __init__(self, codec="libx264", preset="veryfast", crf=23, bitrate=None, threads=0, ffmpeg="ffmpeg",
+                 output_mode="single", segment_seconds=10.0, scale=1.0, audio_codec="aac",
+                 audio_bitrate=DEFAULT_AUDIO_BITRATE):
+        if codec not in FFMPEG_CODECS:
+            raise ValueError(f"Desteklenmeyen ffmpeg kodlayıcısı: {codec}")
+        if audio_codec not in AUDIO_CODECS:
+            raise ValueError(f"Desteklenmeyen ses kodlayıcısı: {audio_codec}")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Geçersiz çıktı modu: {output_mode}")
+        if not 0 < scale <= 1:
+            raise ValueError(f"Geçersiz ölçek: {scale}")
+        self.name = codec
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.bitrate = bitrate or None
+        self.threads = int(threads or 0)
+        self.ffmpeg = ffmpeg
+        self.output_mode = output_mode
+        self.segment_seconds = segment_seconds
+        self.scale = scale
+        self.audio_codec = audio_codec
+        self.audio_bitrate = audio_bitrate or DEFAULT_AUDIO_BITRATE
+        self.muxer = None
+        self.index_path = None
+        self._filename = None
+        self._finalize_error = ""
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def has_audio(self):
+        return bool(self.muxer and self.muxer.has_audio)
+
+    def output_filename(self, filename):
+        """Kodlayıcıyla uyumsuz kapsayıcı uzantısını mkv ile değiştirir."""
+        base, ext = os.path.splitext(filename)
+        ext = ext.lstrip(".").lower()
+        if ext in FFMPEG_CODECS[self.codec] and not (self.output_mode == "fragmented" and ext == "avi"):
+            return filename
+        # AVI dizini dosya sonunda yazılır, çökmede oynatılamaz; parçalı modda mkv kullanılır
+        return base + ".mkv"
+
+    def video_args(self):
+        """Seçilen kodlayıcı için ffmpeg çıktı argümanları."""
+        args = []
+        # Küçültülen boyut da çift sayıya yuvarlanır, ayrıca kırpma gerekmez
+        scale_filter = f"scale=trunc(iw*{self.scale:g}/2)*2:trunc(ih*{self.scale:g}/2)*2" if self.scale != 1 else None
+        if self.codec == "ffv1":
+            # Kayıpsız: RGB korunur, kırpma ve renk alt örneklemesi gerekmez
+            if scale_filter:
+                args += ["-vf", scale_filter]
+            args += ["-c:v", "ffv1", "-level", "3", "-g", "1", "-slicecrc", "1", "-pix_fmt", "bgr0"]
+        else:
+            args += ["-vf", scale_filter or EVEN_CROP_FILTER, "-c:v", self.codec]
+            if self.codec == "libvpx-vp9":
+                args += ["-deadline", "realtime", "-cpu-used", str(_VP9_CPU_USED.get(self.preset, 7)),
+                         "-row-mt", "1"]
+            else:
+                args += ["-preset", self.preset]
+            if self.bitrate:
+                args += ["-b:v", str(self.bitrate)]
+            else:
+                args += ["-crf", str(self.crf)]
+                if self.codec == "libvpx-vp9":
+                    # VP9'da sabit kalite modu için hedef bit hızı sıfır olmalı
+                    args += ["-b:v", "0"]
+            args += ["-pix_fmt", "yuv420p"]
+            if self.codec == "libx265":
+                args += ["-tag:v", "hvc1", "-x265-params", "log-level=error"]
+            if self.output_mode != "single":
+                # Parçalar ve fragmanlar anahtar karelerde kesilir
+                args += ["-force_key_frames", f"expr:gte(t,n_forced*{self.segment_seconds:g})"]
+        args += ["-threads", str(self.threads)]
+        return args
+
+    def output_args(self, filename):
+        """Çıktı moduna göre kapsayıcı argümanlarını ve ffmpeg'in yazacağı dosya adını döndürür."""
+        ext = os.path.splitext(filename)[1].lower()
+        if self.output_mode == "segmented":
+            pattern, self.index_path = segment_paths(filename)
+            # Dizin her parça kapandığında güncellenir; çökmede yalnızca tamam parçaları listeler
+            return ["-f", "segment", "-segment_time", f"{self.segment_seconds:g}", "-reset_timestamps", "1",
+                    "-segment_list", self.index_path, "-segment_list_type", "ffconcat"], pattern
+        if self.output_mode == "fragmented" and ext in (".mp4", ".mov"):
+            return ["-movflags", FRAGMENTED_MP4_FLAGS], filename
+        # mkv/webm kümeleri zaten artımlı yazılır; çökmede yalnızca dizin (cues) eksik kalır
+        return [], filename
+
+    def audio_args(self):
+        if self.codec == "ffv1":
+            return ["-c:a", "flac"]
+        return audio_codec_args(self.audio_codec, self.audio_bitrate)
+
+    def open(self, filename, width, height, fps, audio_channels=None, audio_rate=None, audio_tracks=1):
+        self._filename = filename
+        if audio_channels and self.audio_codec == "opus" and os.path.splitext(filename)[1].lower() == ".avi":
+            log_print("AVI kapsayıcısı Opus sesi taşıyamaz, ses AAC ile kodlanacak.", level="warning")
+            self.audio_codec = "aac"
+        output_args, target = self.output_args(filename)
+        self.muxer = FFmpegMuxer(target, width, height, fps, pix_fmt=self.input_pix_fmt,
+                                 audio_channels=audio_channels, audio_rate=audio_rate,
+                                 video_args=self.video_args(), audio_args=self.audio_args(),
+                                 output_args=output_args, ffmpeg=self.ffmpeg, audio_tracks=audio_tracks)
+        self.muxer.start()
+
+    def write(self, frame):
+        self.muxer.write(frame)
+
+    def write_audio(self, data, track=0):
+        self.muxer.write_audio(data, track)
+
+    def close_video(self):
+        if self.muxer:
+            self.muxer.close_video()
+
+    def close_audio(self, track=None):
+        if self.muxer:
+            self.muxer.close_audio(track)
+
+    def finish(self, timeout=None):
+        """ffmpeg'in dosyayı tamamlamasını bekler ve çıkış kodunu döndürür.
+
+        Parçalı kayıtta parçalar yeniden kodlanmadan asıl dosyada birleştirilir;
+        birleştirme başarısız olursa parçalar ve dizin dosyası yerinde kalır.
+        """
+        returncode = self.muxer.wait(timeout=timeout)
+        if self.output_mode == "segmented" and returncode == 0:
+            returncode, self._finalize_error = concat_segments(self.index_path, self._filename, ffmpeg=self.ffmpeg)
+        return returncode
+
+    @property
+    def segments(self):
+        """Parçalı kayıtta henüz birleştirilmemiş tamamlanmış parçalar (yoksa boş liste)."""
+        if self.index_path and os.path.exists(self.index_path):
+            return read_segment_index(self.index_path)
+        return []
+
+    @property
+    def error_text(self):
+        if self._finalize_error:
+            return self._finalize_error
+        return self.muxer.stderr_text if self.muxer else ""
+
+    def describe_mode(self):
+        """Çıktı modunun açıklaması; tek dosyada boş."""
+        return "" if self.output_mode == "single" else f"{self.output_mode} {self.segment_seconds:g} sn"
+
+    def describe(self):
+        quality = f"bitrate={self.bitrate}" if self.bitrate else f"crf={self.crf}"
+        mode = self.describe_mode()
+        mode = f", {mode}" if mode else ""
+        if self.scale != 1:
+            mode = f", ölçek={self.scale:g}{mode}"
+        return f"ffmpeg {self.codec} (preset={self.preset}, {quality}, threads={self.threads or 'otomatik'}{mode})"
+
+
+def create_encoder(settings):
+    """settings.json sözlüğüne göre uygun kodlayıcıyı oluşturur."""
+    name = settings.get("video_encoder", "libx264")
+    if settings.get("replay_buffer"):
+        # Tampon kodlanmış paketleri tutar; OpenCV yerine varsayılan ffmpeg kodlayıcısı kullanılır
+        from .replay import ReplayBufferEncoder
+        return ReplayBufferEncoder(name if name in FFMPEG_CODECS else "libx264",
+                                   buffer_seconds=float(settings.get("replay_buffer_seconds", 30)),
+                                   segment_seconds=float(settings.get("replay_segment_seconds", 2.0)),
+                                   preset=settings.get("encoder_preset", "veryfast"),
+                                   crf=int(settings.get("encoder_crf", 23)),
+                                   bitrate=settings.get("encoder_bitrate") or None,
+                                   threads=int(settings.get("encoder_threads", 0)),
+                                   scale=float(settings.get("encoder_scale", 1.0)),
+                                   audio_codec=settings.get("audio_codec", "aac"),
+                                   audio_bitrate=settings.get("audio_bitrate") or DEFAULT_AUDIO_BITRATE)
+    if settings.get("encode_process") and int(settings.get("parallel_encoding_workers", 0)) <= 1:
+        # Paralel kodlama zaten ayrı süreçlerde çalışır; tek kodlayıcı ise ayrı sürece taşınır
+        from .encodeproc import ProcessEncoder
+        return ProcessEncoder(settings, ring_size=int(settings.get("frame_ring_size", 6)),
+                              ring_policy=settings.get("frame_ring_policy", "drop_oldest"))
+    if name == "opencv":
+        return OpenCVEncoder(fourcc=settings.get("opencv_fourcc") or None)
+    if name not in FFMPEG_CODECS:
+        raise ValueError(f"Bilinmeyen video kodlayıcısı: {name}")
+    workers = int(settings.get("parallel_encoding_workers", 0))
+    if workers > 1:
+        # parallel modülü bu modülü içe aktardığı için burada yüklenir
+        from .parallel import SegmentParallelEncoder
+        return SegmentParallelEncoder(name, workers=workers,
+                                      segment_seconds=float(settings.get("parallel_segment_seconds", 2.0)),
+                                      preset=settings.get("encoder_preset", "veryfast"),
+                                      crf=int(settings.get("encoder_crf", 23)),
+                                      bitrate=settings.get("encoder_bitrate") or None,
+                                      threads=int(settings.get("encoder_threads", 0)),
+                                      scale=float(settings.get("encoder_scale", 1.0)))
+    return FFmpegEncoder(name,
+                         preset=settings.get("encoder_preset", "veryfast"),
+                         crf=int(settings.get("encoder_crf", 23)),
+                         bitrate=settings.get("encoder_bitrate") or None,
+                         threads=int(settings.get("encoder_threads", 0)),
+                         output_mode=settings.get("output_mode", "single"),
+                         segment_seconds=float(settings.get("output_segment_seconds", 10.0)),
+                         scale=float(settings.get("encoder_scale", 1.0)),
+                         audio_codec=settings.get("audio_codec", "aac"),
+                         audio_bitrate=settings.get("audio_bitrate") or DEFAULT_AUDIO_BITRATE)
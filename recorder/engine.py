@@ -0,0 +1,796 @@
+"""Tk arayüzüne bağlı olmayan, betiklerden ve komut satırından kullanılabilen kayıt motoru."""
+import math
+import os
+import threading
+import time
+
+import mss
+import numpy as np
+
+from .adaptive import create_quality_controller
+from .audio import (APP_AUDIO_DEVICE, AUDIO_MODES, SAMPLE_WIDTH, TEST_TONE_DEVICE, AudioCapture, AudioMixer,
+                    StreamingWavWriter)
+from .avsync import AudioSyncCorrector, log_sync_report, sync_report, write_sync_report
+from .damage import DamageDetector
+from .encodeproc import ProcessEncoder
+from .encoders import OpenCVEncoder, create_encoder
+from .framepath import FramePath
+from .log import log_print
+from .metrics import MetricsDumper, MetricsServer, RecorderMetrics
+from .mux import AUDIO_CODECS, DEFAULT_AUDIO_BITRATE, FFmpegAudioWriter, ffmpeg_available, merge_audio_video
+from .pacing import CaptureClock, FramePacer
+from .pipeline import FrameRing, RING_POLICIES, drain_ring
+from .pulse import AppAudioExcluder, pulse_available
+from .sources import create_capture_source
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    pyaudio = None
+    PYAUDIO_AVAILABLE = False
+
+
+class Recorder:
+    """Ekranın bir bölgesini ve isteğe bağlı olarak bir veya birden çok mikrofonu tek dosyaya kaydeder.
+
+    Yakalama, kodlama ve ses kendi thread'lerinde çalışır: ``start`` döndüğünde
+    kayıt sürmektedir, ``stop`` kaydı bitirip dosyayı tamamlar ve sonucu döndürür.
+    Worker thread'lerdeki hatalar kaydı durdurur ve ``on_error`` geri çağrısına
+    (worker thread'inden) iletilir; motor hiçbir arayüz çağrısı yapmaz.
+
+    Kodlayıcı, halka tampon ve değişim tespiti ayarları ``settings`` sözlüğünden
+    (settings/settings.json ile aynı anahtarlar) okunur. ``track_position`` verilirse
+    her karede çağrılır ve ``(left, top)`` döndürürse yakalama bölgesi oraya taşınır.
+    Kare zamanları ``clock`` (CaptureClock) üzerinden hedeflenir; birden çok kaynak
+    aynı saati paylaşırsa saati başlatan ve durduran taraf onlardır. ``compositor``
+    verilirse ``region`` yok sayılır ve kareler birden çok monitörün birleşiminden
+    (Compositor) üretilir. Kareler ``capture_source`` ayarının seçtiği kaynaktan
+    (canlı ekran, yapay desen veya video dosyası) alınır. ``quality`` (AdaptiveQualityController) verilmezse ve
+    ``adaptive_quality`` ayarı açıksa kayda özel bir denetleyici oluşturulur.
+
+    Kare başına süreler ``metrics`` (RecorderMetrics) histogramlarına yazılır;
+    ``metrics_dump`` ayarı açıksa kayıt dosyasının yanına JSON satırları olarak
+    dökülür, ``metrics_server`` verilirse (veya ``metrics_port`` ayarlıysa) HTTP
+    ``/metrics`` adresinden sunulur.
+
+    Ses parçaları yakalandıkları anın kayıt saatindeki karşılığına göre
+    (AudioSyncCorrector) videoyla hizalanır; ``av_sync`` ayarı kapatılmadıkça
+    başlangıç gecikmesi, taşmalar ve cihaz saati kayması düzeltilir.
+
+    ``audio_device`` bir liste ise her giriş kendi thread'inde, kendi halkası ve
+    senkron düzelticisiyle kaydedilir. ``audio_mode`` ayarı ``mix`` ise girişler
+    ``audio_gains_db`` kazançlarıyla tek izde karıştırılır (AudioMixer),
+    ``tracks`` ise kapsayıcıda her giriş ayrı bir ses izi olur. ``APP_AUDIO_DEVICE``
+    girişi (Linux) uygulama seslerini, ``excluded_apps`` ayarındaki uygulamalar
+    olmadan kaydeder (AppAudioExcluder).
+
+    Kodlayıcı sesi taşımıyorsa (OpenCV, ayrı süreç, paralel kodlama) ses izleri
+    kayıt sırasında ``audio_codec`` ve ``audio_bitrate`` ayarlarıyla sıkıştırılmış
+    dosyalara kodlanır (FFmpegAudioWriter) ve kayıttan sonra yeniden kodlanmadan
+    videoya eklenir; ffmpeg yoksa WAV yazılır.
+    """
+
+    def __init__(self, output, region, fps=20, settings=None, audio_device=None, audio_filename=None,
+                 audio_channels=2, audio_rate=44100, audio_chunk_size=1024, frame_bus=None,
+                 track_position=None, on_error=None, clock=None, compositor=None, quality=None,
+                 metrics_server=None):
+        self.output = output
+        self.compositor = compositor
+        if compositor is not None:
+            region = {"left": 0, "top": 0, "width": compositor.width, "height": compositor.height}
+        self.region = dict(region)
+        self.fps = fps
+        self.settings = dict(settings or {})
+        if audio_device is None:
+            self.audio_devices = []
+        elif isinstance(audio_device, (list, tuple)):
+            self.audio_devices = list(audio_device)
+        else:
+            self.audio_devices = [audio_device]
+        self.audio_device = self.audio_devices[0] if self.audio_devices else None
+        self.audio_filename = audio_filename or os.path.splitext(output)[0] + ".wav"
+        self.audio_channels = audio_channels
+        self.audio_rate = audio_rate
+        self.audio_chunk_size = audio_chunk_size
+        self.frame_bus = frame_bus
+        self.track_position = track_position
+        self.on_error = on_error
+        self.clock = clock if clock is not None else CaptureClock()
+        self._owns_clock = clock is None
+
+        self.ring_size = int(self.settings.get("frame_ring_size", 6))
+        self.ring_policy = self.settings.get("frame_ring_policy", "drop_oldest")
+        if self.ring_policy not in RING_POLICIES:
+            log_print(f"Geçersiz halka politikası '{self.ring_policy}', 'drop_oldest' kullanılacak.", level="warning")
+            self.ring_policy = "drop_oldest"
+            self.settings["frame_ring_policy"] = self.ring_policy
+        self.damage_detection = bool(self.settings.get("damage_detection", True))
+        self.damage_tile_size = int(self.settings.get("damage_tile_size", 64))
+        self.quality = quality if quality is not None else create_quality_controller(self.settings, fps)
+        self.metrics = RecorderMetrics()
+        self.metrics_server = metrics_server
+        self._owns_metrics_server = False
+        self._metrics_dumper = None
+        self.av_sync = bool(self.settings.get("av_sync", True))
+        self._audio_syncs = []
+        self._video_frames = 0
+        self.audio_mode = self.settings.get("audio_mode", "mix")
+        if self.audio_mode not in AUDIO_MODES:
+            log_print(f"Geçersiz ses modu '{self.audio_mode}', 'mix' kullanılacak.", level="warning")
+            self.audio_mode = "mix"
+        self.audio_gains = [10 ** (float(db) / 20.0) for db in self.settings.get("audio_gains_db") or []]
+        self.audio_codec = self.settings.get("audio_codec", "aac")
+        if self.audio_codec not in AUDIO_CODECS:
+            log_print(f"Geçersiz ses kodlayıcısı '{self.audio_codec}', 'aac' kullanılacak.", level="warning")
+            self.audio_codec = "aac"
+            self.settings["audio_codec"] = self.audio_codec
+        self.audio_bitrate = self.settings.get("audio_bitrate") or DEFAULT_AUDIO_BITRATE
+        # İlk iz verilen dosya adını kullanır, ayrı izler _2, _3... ekiyle yazılır
+        base, ext = os.path.splitext(self.audio_filename)
+        self.audio_filenames = [self.audio_filename] + [f"{base}_{track + 1}{ext}"
+                                                        for track in range(1, self.audio_tracks)]
+
+        self.encoder = None
+        self.ring = None
+        self.error = None
+        self.result = None
+        self._stop_event = threading.Event()
+        self._capture_thread = None
+        self._audio_threads = []
+        self._audio_captures = []
+        self._audio_writers = []
+        self._mixer = None
+        self._app_audio = None
+        self._audio_to_file = False
+        self._audio_compressed = False
+
+    @property
+    def filename(self):
+        """Videonun yazıldığı dosya (kodlayıcı uzantıyı değiştirmiş olabilir)."""
+        return self.encoder.filename if self.encoder else self.output
+
+    @property
+    def has_audio(self):
+        return bool(self.audio_devices)
+
+    @property
+    def audio_tracks(self):
+        """Kapsayıcıdaki ses izi sayısı: karıştırmada 1, ayrı izlerde giriş sayısı."""
+        if not self.has_audio:
+            return 0
+        return len(self.audio_devices) if self.audio_mode == "tracks" else 1
+
+    @property
+    def paused(self):
+        return self.clock.paused
+
+    @property
+    def recording(self):
+        return self._capture_thread is not None and not self._stop_event.is_set()
+
+    def start(self):
+        """Kodlayıcıyı açar ve yakalama/ses thread'lerini başlatır.
+
+        Kayıt başlatılamazsa (geçersiz bölge, kodlayıcı hatası, PyAudio eksik)
+        hiçbir thread başlamadan istisna yükselir.
+        """
+        if self._capture_thread is not None:
+            raise RuntimeError("Kayıt zaten başlatıldı.")
+        if self.region["width"] <= 0 or self.region["height"] <= 0:
+            raise ValueError(f"Geçersiz kayıt alanı boyutları: Genişlik={self.region['width']}, "
+                             f"Yükseklik={self.region['height']}")
+        if not PYAUDIO_AVAILABLE and any(device not in (TEST_TONE_DEVICE, APP_AUDIO_DEVICE)
+                                         for device in self.audio_devices):
+            raise RuntimeError("Ses kaydı için PyAudio gerekli.")
+        if APP_AUDIO_DEVICE in self.audio_devices:
+            if not pulse_available():
+                raise RuntimeError("Uygulama sesi kaydı için PulseAudio veya PipeWire (pactl, parec) gerekli.")
+            # Akışlar kayıt başlamadan yönlendirilir; ilk saniyelerin sesi de kayda girer
+            self._app_audio = AppAudioExcluder(self.settings.get("excluded_apps", []),
+                                               server=self.settings.get("pulse_server") or None)
+            self._app_audio.start()
+
+        # Kodlayıcı thread'lerden önce açılır; ses thread'i canlı birleştirmeyi hemen kullanabilsin
+        try:
+            self.encoder = self._open_encoder()
+        except Exception:
+            self._stop_app_audio()
+            raise
+        self._audio_to_file = self.has_audio and not self.encoder.has_audio
+        self._open_audio_outputs()
+        self._start_metrics()
+
+        self._capture_thread = threading.Thread(target=self._capture_loop, name="recorder-capture")
+        self._capture_thread.start()
+        self._audio_syncs = [None] * len(self.audio_devices)
+        self._audio_captures = [None] * len(self.audio_devices)
+        for index in range(len(self.audio_devices)):
+            thread = threading.Thread(target=self._audio_loop, args=(index,), name=f"recorder-audio-{index}")
+            self._audio_threads.append(thread)
+            thread.start()
+        if self._owns_clock:
+            self.clock.start()
+        log_print(f"Video kaydı başlatılıyor: {self.filename}")
+
+    def _open_audio_outputs(self):
+        """Ses izlerinin dosya yazıcılarını (canlı birleştirme yoksa) ve gerekirse karıştırıcıyı hazırlar."""
+        if not self.has_audio:
+            return
+        if self._audio_to_file:
+            self._open_audio_writers()
+        if self.audio_mode == "mix" and len(self.audio_devices) > 1:
+            self._mixer = AudioMixer(len(self.audio_devices), self.audio_channels, self.audio_rate,
+                                     self._track_writer(0), gains=self.audio_gains)
+            log_print(f"{len(self.audio_devices)} ses girişi tek izde karıştırılacak "
+                      f"(kazanç: {', '.join(f'{gain:.2f}' for gain in self._mixer.gains)})")
+        elif self.audio_tracks > 1:
+            log_print(f"{self.audio_tracks} ses girişi ayrı izler olarak kaydedilecek")
+
+    def _open_audio_writers(self):
+        """Her iz için canlı kodlayan yazıcıyı açar; ffmpeg yoksa veya başlatılamazsa WAV yazılır.
+
+        Parçalar geldikçe diske yazılır; bellek kullanımı kayıt süresinden bağımsızdır.
+        """
+        if ffmpeg_available():
+            ext = AUDIO_CODECS[self.audio_codec][1]
+            paths = [os.path.splitext(path)[0] + ext for path in self.audio_filenames]
+            try:
+                for path in paths:
+                    self._audio_writers.append(FFmpegAudioWriter(path, self.audio_channels, self.audio_rate,
+                                                                 self.audio_codec, self.audio_bitrate,
+                                                                 sample_width=SAMPLE_WIDTH))
+            except OSError as e:
+                log_print(f"Ses kodlayıcısı başlatılamadı, ses WAV olarak yazılacak: {e}", level="warning")
+                for writer in self._audio_writers:
+                    writer.close()
+                self._audio_writers = []
+            else:
+                self.audio_filenames = paths
+                self.audio_filename = paths[0]
+                self._audio_compressed = True
+                log_print(f"Ses kayıt sırasında kodlanıyor: {self.audio_codec} {self.audio_bitrate}")
+                return
+        self._audio_writers = [StreamingWavWriter(path, self.audio_channels, SAMPLE_WIDTH, self.audio_rate)
+                               for path in self.audio_filenames]
+
+    def _track_writer(self, track):
+        if self._audio_writers:
+            return self._audio_writers[track].write
+        # Canlı birleştirmede ses doğrudan ffmpeg'e gider, ayrı ses dosyası oluşmaz
+        return lambda data: self.encoder.write_audio(data, track)
+
+    def _close_audio_input(self, index):
+        """Girişin izini kapatır; karıştırmada iz, son giriş de kapandığında kapanır."""
+        track = index
+        if self._mixer is not None:
+            if not self._mixer.close(index):
+                return
+            track = 0
+            stats = self._mixer.stats()
+            log_print(f"Ses karıştırıcısı: {stats['mixed_seconds']:.2f} sn, "
+                      f"kırpılan örnek={stats['clipped_samples']} (%{stats['clipped_ratio'] * 100:.3f})")
+        if self._audio_writers:
+            writer = self._audio_writers[track]
+            writer.close()
+            size = os.path.getsize(writer.filename) if os.path.exists(writer.filename) else 0
+            log_print(f"Ses dosyası kaydedildi: {writer.filename} ({writer.frames_written} örnek, "
+                      f"{size / 1024:.0f} KB)")
+        else:
+            self.encoder.close_audio(track)
+
+    def _stop_app_audio(self):
+        """Uygulama seslerini eski çıkışlarına döndürür ve sanal hoparlörleri kaldırır."""
+        if self._app_audio is None:
+            return
+        stats = self._app_audio.stats()
+        try:
+            self._app_audio.stop()
+        except Exception as e:
+            log_print(f"Uygulama sesi yönlendirmesi kaldırılamadı: {e}", level="warning")
+        log_print(f"Uygulama sesi: {stats['routed']} akış kaydedildi, {stats['excluded']} akış hariç tutuldu")
+        self._app_audio = None
+
+    def _start_metrics(self):
+        """Ayarlara göre metrik dökümünü ve HTTP sunucusunu başlatır; sunucu açılamazsa kayıt sürer."""
+        if self.settings.get("metrics_dump"):
+            path = os.path.splitext(self.filename)[0] + ".metrics.jsonl"
+            self._metrics_dumper = MetricsDumper(self.metrics, path,
+                                                 float(self.settings.get("metrics_interval_seconds", 5.0)))
+            self._metrics_dumper.start()
+            log_print(f"Metrikler yazılıyor: {path}")
+        port = int(self.settings.get("metrics_port", 0))
+        if self.metrics_server is None and port:
+            try:
+                self.metrics_server = MetricsServer(port)
+                self.metrics_server.start()
+                self._owns_metrics_server = True
+            except OSError as e:
+                log_print(f"Metrik sunucusu başlatılamadı ({port}): {e}", level="warning")
+                self.metrics_server = None
+        if self.metrics_server is not None:
+            self.metrics_server.register(self.metrics, source=os.path.basename(self.filename))
+
+    def _stop_metrics(self):
+        if self._metrics_dumper is not None:
+            self._metrics_dumper.stop()
+        if self.metrics_server is not None:
+            if self._owns_metrics_server:
+                self.metrics_server.stop()
+            else:
+                self.metrics_server.unregister(self.metrics)
+
+    def pause(self):
+        self.clock.pause()
+
+    def resume(self):
+        self.clock.resume()
+
+    def wait(self, timeout=None):
+        """Kayıt durdurulana veya bir hata oluşana kadar bekler; durduysa True döner."""
+        return self._stop_event.wait(timeout)
+
+    def save_replay(self, path=None, seconds=None):
+        """Anlık tekrar tamponundaki son saniyeleri dosyaya aktarır; ``(returncode, stderr, path)`` döndürür."""
+        if not hasattr(self.encoder, "save"):
+            raise RuntimeError("Bu kayıt anlık tekrar tamponu kullanmıyor.")
+        return self.encoder.save(path, seconds)
+
+    def stop(self, timeout=60):
+        """Kaydı durdurur, dosyayı tamamlar ve sonuç sözlüğünü döndürür.
+
+        Sonuç; ``video``, ayrı kalan ses dosyası için ``audio`` (ayrı izlerde tüm
+        dosyalar ``audio_tracks`` listesinde), kodlayıcının
+        ``returncode`` ve ``encoder_error`` değerleri, birleştirme başarısızsa
+        ``merge_error`` (ffmpeg yoksa ``ffmpeg_missing``), parçalar tek dosyada
+        birleştirilemediyse yerinde kalan ``segments`` listesini, anlık tekrar
+        modunda kaydedilen ``replays`` dosyalarını (bu modda ``video`` None),
+        uyarlamalı kalite açıksa son düzeyi ve yapılan ayarları ``quality`` olarak,
+        ses/görüntü senkron raporunu ``sync`` olarak ve kaydı durduran hatayı
+        ``error`` olarak içerir.
+        """
+        if self.result is not None:
+            return self.result
+        if self._owns_clock:
+            self.clock.stop()
+        self._stop_event.set()
+        log_print("Kayıt durdurma sinyali gönderildi.")
+        for name, thread in [("Video", self._capture_thread)] + [("Ses", thread) for thread in self._audio_threads]:
+            if thread and thread.is_alive():
+                log_print(f"{name} kayıt thread'inin bitmesi bekleniyor...")
+                thread.join(timeout=10)
+                if thread.is_alive():
+                    log_print(f"Uyarı: {name} kayıt thread'i zaman aşımına uğradı.", level="warning")
+        self._stop_app_audio()
+
+        result = {"video": self.filename, "audio": None, "audio_tracks": None, "returncode": None,
+                  "encoder_error": None, "merge_error": None, "ffmpeg_missing": False, "segments": None, "replays": None,
+                  "quality": self.quality.stats() if self.quality else None, "sync": None, "error": self.error}
+        if self._capture_thread is not None:
+            result["sync"] = sync_report(self._audio_syncs, self.metrics.lateness, self._video_frames, self.fps)
+            log_sync_report(result["sync"])
+            if self.settings.get("sync_report"):
+                write_sync_report(result["sync"], os.path.splitext(self.output)[0] + ".sync.json")
+        mux_started = time.perf_counter()
+        if self.encoder is not None:
+            try:
+                result["returncode"] = self.encoder.finish(timeout=timeout)
+                if result["returncode"] == 0 and hasattr(self.encoder, "save"):
+                    log_print(f"Anlık tekrar tamponu kapatıldı ({len(self.encoder.saved)} kayıt)")
+                elif result["returncode"] == 0:
+                    log_print(f"Video dosyası tamamlandı: {self.filename} ({self.encoder.describe()})")
+                else:
+                    result["encoder_error"] = self.encoder.error_text
+                    log_print(f"Kodlayıcı hatası ({result['returncode']}): {self.encoder.error_text}", level="error")
+                    # Parçalı kayıt birleştirilemediyse tamamlanmış parçalar korunur
+                    result["segments"] = getattr(self.encoder, "segments", None) or None
+            except Exception as e:
+                result["encoder_error"] = str(e)
+                log_print(f"Kodlayıcı sonlandırılırken hata: {e}", level="error")
+
+        if hasattr(self.encoder, "save"):
+            # Tampon silindi; kalıcı dosyalar yalnızca kaydedilen tekrarlardır
+            result["video"] = None
+            result["replays"] = list(self.encoder.saved)
+
+        # Ses ayrı dosyalara yazıldıysa (OpenCV kodlayıcı) video ile birleştir
+        if (self._audio_to_file and os.path.exists(self.filename)
+                and all(os.path.exists(path) for path in self.audio_filenames)):
+            self._merge_audio(result)
+        # Dosyanın tamamlanması: ffmpeg'in kapanışı, parça birleştirme ve gerekirse ses birleştirme
+        self.metrics.mux_seconds = time.perf_counter() - mux_started
+        self._stop_metrics()
+
+        self.result = result
+        return result
+
+    def _open_encoder(self):
+        """Ayarlara göre video kodlayıcısını oluşturup açar.
+
+        FFmpeg bulunamazsa veya başlatılamazsa OpenCV VideoWriter'a dönülür (ayrı
+        süreçte kodlama seçiliyse o da ayrı süreçte çalışır); bu durumda ses ayrı
+        dosyaya yazılır ve kayıttan sonra birleştirilir.
+        """
+        width, height = self.region["width"], self.region["height"]
+        settings = self.settings
+        if self.quality is not None:
+            # Önceki kayıtta düşürülen preset ve ölçek kodlayıcı açılırken uygulanır
+            settings = dict(settings, **self.quality.encoder_overrides())
+        encoder = create_encoder(settings)
+        # Anlık tekrar kalıcı dosya yazmamalı; tek dosyaya yazan OpenCV'ye dönülmez
+        replay = hasattr(encoder, "save")
+        if replay and not ffmpeg_available():
+            raise RuntimeError("Anlık tekrar tamponu için FFmpeg gerekli.")
+        if not encoder.needs_ffmpeg and self.settings.get("output_mode", "single") != "single":
+            log_print("OpenCV VideoWriter parçalı/fragmanlı çıktıyı desteklemez, tek dosya yazılacak.", level="warning")
+        if encoder.needs_ffmpeg and not ffmpeg_available():
+            log_print("FFmpeg bulunamadı, OpenCV VideoWriter ve kayıt sonrası birleştirme kullanılacak.", level="warning")
+            encoder = self._fallback_encoder(encoder)
+
+        audio_channels = self.audio_channels if self.has_audio else None
+        audio_rate = self.audio_rate if self.has_audio else None
+        try:
+            encoder.open(encoder.output_filename(self.output), width, height, self.fps, audio_channels, audio_rate,
+                         audio_tracks=max(1, self.audio_tracks))
+        except Exception as e:
+            if not encoder.needs_ffmpeg or replay:
+                raise
+            log_print(f"FFmpeg kodlayıcısı başlatılamadı, OpenCV VideoWriter kullanılacak: {e}", level="warning")
+            encoder = self._fallback_encoder(encoder)
+            encoder.open(self.output, width, height, self.fps)
+        log_print(f"Video kodlayıcısı: {encoder.describe()} -> {encoder.filename}")
+        return encoder
+
+    @staticmethod
+    def _fallback_encoder(encoder):
+        """FFmpeg kullanılamadığında OpenCV kodlayıcısı; ayrı süreç sınırı korunur."""
+        if isinstance(encoder, ProcessEncoder):
+            return ProcessEncoder(dict(encoder.settings, video_encoder="opencv"), ring_size=encoder.ring_size,
+                                  ring_policy=encoder.ring_policy)
+        return OpenCVEncoder()
+
+    def _fail(self, message):
+        """Worker thread'deki bir hatayı kaydeder, kaydı durdurur ve istemciye bildirir."""
+        log_print(message, level="error")
+        if self.error is None:
+            self.error = message
+        self._stop_event.set()
+        if self.on_error:
+            self.on_error(message)
+
+    def _capture_loop(self):
+        """Ekranı zamanlayıcıya göre yakalayıp halka tampona yazan üretici thread."""
+        try:
+            # Canlı ekran (mss), yapay desen veya video dosyası; dosya kaynağı duraklamada donar
+            sct = create_capture_source(self.settings, clock=self.clock.now)
+        except Exception as e:
+            self._fail(f"Yakalama kaynağı başlatılırken hata oluştu: {e}")
+            self.encoder.close_video()
+            return
+
+        region = dict(self.region)
+        video_width, video_height = region["width"], region["height"]
+
+        # Yakalama (üretici) ile dönüştürme/yazma (tüketici) halka tamponla ayrılır,
+        # böylece kodlayıcıdaki takılmalar yakalama süresinden çalmaz. Kodlayıcı ayrı
+        # süreçte çalışıyorsa (ProcessEncoder) halka onun paylaşılan bellek halkasıdır.
+        remote = getattr(self.encoder, "ring", None) is not None
+        if remote:
+            ring = self.encoder.ring
+        else:
+            ring = FrameRing((video_height, video_width, 4), capacity=self.ring_size, policy=self.ring_policy)
+        self.ring = ring
+        metrics = self.metrics
+        metrics.ring = ring
+        # Sabit kare hızlı çıktı: kaçırılan kare zamanları tüketicide tekrar kareyle doldurulur.
+        # Zamanlayıcı ortak saate bağlıdır; duraklatmada saat donar, kare zamanları kaymaz.
+        pacer = FramePacer(self.fps, clock=self.clock.now)
+        # BGRA kabul eden kodlayıcılarda dönüşüm atlanır, diğerlerinde tampon yeniden kullanılır
+        frame_path = FramePath(self.encoder.input_pix_fmt)
+        damage = None
+        if self.damage_detection:
+            damage = DamageDetector(tile_size=self.damage_tile_size)
+        quality = self.quality
+
+        def observe(frame_index):
+            # Kare zamanından kuyruğa girene (veya atlanana) kadar geçen süre
+            quality.observe_capture(self.clock.now() - pacer.deadline(frame_index), ring.queued, ring.capacity)
+
+        encode_thread = None
+        if not remote:
+            encode_thread = threading.Thread(target=self._encode_loop, args=(ring, pacer, frame_path),
+                                             name="recorder-encode")
+            encode_thread.daemon = True
+            encode_thread.start()
+
+        # Ortak saat başlayana kadar (diğer kaynaklar hazırlanırken) bekle
+        while not self.clock.wait_started(0.1) and not self._stop_event.is_set():
+            pass
+        pacer.start(at=0.0)
+        if quality is not None:
+            quality.begin(self.clock.now)
+        while not self._stop_event.is_set():
+            if self.paused:
+                time.sleep(0.01)
+                continue
+            try:
+                frame_index = pacer.wait()
+                if frame_index is None:
+                    # Saat bekleme sırasında duraklatıldı veya durduruldu
+                    continue
+                if quality is not None:
+                    quality.update(ring.stats)
+                    if not quality.should_capture(frame_index):
+                        # Etkin kare hızı düşürüldü; boşluğu tüketici önceki kareyle doldurur
+                        continue
+                if self.track_position:
+                    # Boyut video yazıcısıyla aynı kalmalı, sadece konum takip edilir
+                    position = self.track_position()
+                    if position:
+                        region["left"], region["top"] = position
+
+                # Karenin kayıt saatindeki zamanı deadline'dır; geç yakalama senkron hatasıdır
+                metrics.lateness.observe(max(0.0, self.clock.now() - pacer.deadline(frame_index)))
+                grab_started = time.perf_counter()
+                if self.compositor:
+                    frame = self.compositor.capture(sct, frame_path.wrap)
+                else:
+                    frame = frame_path.wrap(sct.grab(region))
+                metrics.grab.observe(time.perf_counter() - grab_started)
+                changed = damage.update(frame) if damage else 1.0
+                if changed == 0.0:
+                    # Ekran değişmedi: kare kuyruğa girmez, tüketici önceki kareyi tekrarlar
+                    if quality is not None:
+                        observe(frame_index)
+                    continue
+                slot = ring.acquire_write(timeout=1 / self.fps)
+                if slot is None:
+                    # Düşürülen değişiklik kaybolmasın, sonraki kare tam kare sayılsın
+                    if damage:
+                        damage.reset()
+                    if quality is not None:
+                        observe(frame_index)
+                    continue
+                copy_started = time.perf_counter()
+                try:
+                    np.copyto(ring.slots[slot], frame)
+                except Exception:
+                    ring.abort_write(slot)
+                    raise
+                metrics.write.observe(time.perf_counter() - copy_started)
+                timestamp = time.monotonic()
+                ring.commit_write(slot, timestamp, sequence=frame_index, damage=changed)
+                metrics.queue_depth.observe(ring.queued)
+                if quality is not None:
+                    observe(frame_index)
+                if remote and self.frame_bus is not None:
+                    # Kodlama süreci yuvayı yalnızca okur; önizleme aynı yuvadan beslenebilir
+                    self.frame_bus.publish(ring.slots[slot], timestamp)
+            except mss.exception.ScreenShotError as e:
+                self._fail(f"Ekran yakalama hatası: {e}")
+                break
+            except Exception as e:
+                self._fail(f"Kayıt sırasında beklenmeyen hata: {e}")
+                break
+
+        # Kuyruktaki çerçevelerin yazılmasını bekle
+        pacer.stop()
+        self._video_frames = pacer.total_frames()
+        if remote:
+            # Kodlama süreci sonu kendi tamamlar; toplam kare sayısı halka başlığıyla gider
+            ring.close(total_frames=pacer.total_frames())
+        else:
+            ring.close()
+            encode_thread.join()
+        self._log_stats(ring, pacer, frame_path, damage)
+        if quality is not None:
+            log_print(f"Uyarlamalı kalite: {len(quality.adjustments)} ayar, son etkin FPS={quality.effective_fps:g}, "
+                      f"sonraki kayıt için preset={quality.preset}, ölçek={quality.scale:g}")
+
+        self.encoder.close_video()
+        sct.close()
+        log_print("Kayıt thread'i sonlandı.")
+
+    def _encode_loop(self, ring, pacer, frame_path):
+        """Halka tampondaki çerçeveleri dönüştürüp kodlayıcıya aktaran tüketici thread."""
+        def publish(slot):
+            # Önizleme gibi aboneler istediyse kareyi onlara da ver (istemiyorlarsa kopya yok)
+            self.frame_bus.publish(ring.slots[slot], ring.timestamps[slot])
+
+        metrics = self.metrics
+        quality = self.quality
+
+        def convert(bgra):
+            started = time.perf_counter()
+            img = frame_path.convert(bgra)
+            metrics.convert.observe(time.perf_counter() - started)
+            return img
+
+        def write(img):
+            # Kodlayıcıda geçen süre; boru dolduğunda ffmpeg'in hızını da yansıtır
+            started = time.perf_counter()
+            self.encoder.write(img)
+            elapsed = time.perf_counter() - started
+            metrics.encode.observe(elapsed)
+            if quality is not None:
+                quality.observe_encode(elapsed)
+
+        try:
+            duplicated = drain_ring(ring, write, convert, pacer.total_frames,
+                                    publish if self.frame_bus is not None else None)
+            log_print(f"Sabit kare hızı için tekrarlanan kare sayısı: {duplicated}")
+        except Exception as e:
+            ring.close()
+            self._fail(f"Video yazılırken hata oluştu: {e}")
+        log_print("Kodlama thread'i sonlandı.")
+
+    def _audio_loop(self, index):
+        """``index`` numaralı girişin halkasını boşaltıp parçaları izine (WAV, ffmpeg veya karıştırıcı) yazan thread.
+
+        Yakalama PortAudio geri çağrısında (AudioCapture) yapılır ve duraklatmada
+        da sürer; duraklatma sırasında ve kayıt saati başlamadan gelen parçalar
+        atılır. Senkron açıksa her parça yakalandığı anın kayıt saatindeki
+        karşılığına göre hizalanır; kapalıysa halkada düşürülen parçaların yerine
+        sessizlik yazılır.
+        """
+        device = self.audio_devices[index]
+        log_print(f"Ses kaydı başlatılıyor (Cihaz Indeksi: {device})")
+        capture = AudioCapture(device, channels=self.audio_channels, rate=self.audio_rate,
+                               chunk_size=self.audio_chunk_size,
+                               ring_chunks=int(self.settings.get("audio_ring_chunks", 64)),
+                               source=self._app_audio.monitor_source if device == APP_AUDIO_DEVICE else None,
+                               pulse_server=self.settings.get("pulse_server") or None)
+        self._audio_captures[index] = capture
+        ring = capture.ring
+        metrics = self.metrics
+        try:
+            if self._mixer is not None:
+                def write_audio(data):
+                    self._mixer.write(index, data)
+            else:
+                write_audio = self._track_writer(index)
+
+            silence = bytes(ring.chunk_bytes)
+            seen_drops = 0
+            sync = None
+            if self.av_sync:
+                sync = AudioSyncCorrector(
+                    self.audio_rate, self.audio_channels, SAMPLE_WIDTH,
+                    tolerance=float(self.settings.get("av_sync_tolerance_ms", 40)) / 1000.0,
+                    max_stretch=float(self.settings.get("av_sync_max_stretch", 0.005)))
+                self._audio_syncs[index] = sync
+
+            def drain():
+                nonlocal seen_drops
+                while True:
+                    chunk = ring.pop()
+                    if chunk is None:
+                        return
+                    data, _, captured_at, _, drops = chunk
+                    lost, seen_drops = drops - seen_drops, drops
+                    metrics.audio_queue.observe(time.monotonic() - captured_at)
+                    self._update_audio_metrics()
+                    start_time = self.clock.at(captured_at)
+                    if self.paused or start_time is None:
+                        continue
+                    metrics.audio_chunks += 1
+                    if sync is not None:
+                        # Kayıplar saatle karşılaştırmada görünür ve sessizlikle kapatılır
+                        data = sync.process(data, start_time)
+                    else:
+                        for _ in range(lost):
+                            write_audio(silence)
+                    if data:
+                        write_audio(data)
+
+            capture.start()
+            # Halka en fazla yarım parça süresi bekletilir
+            while not self._stop_event.wait(capture.chunk_seconds / 2):
+                drain()
+            capture.stop()
+            drain()
+            if sync is not None:
+                # Video son kare zamanını da kapsayacak şekilde tam kare sayısına yuvarlanır
+                tail = sync.finish(math.ceil(self.clock.now() * self.fps) / self.fps)
+                if tail:
+                    write_audio(tail)
+            self._update_audio_metrics()
+            stats = capture.stats()
+            log_print(f"Ses akışı durduruldu ({device}): {stats['callbacks']} parça, "
+                      f"cihaz taşması={stats['input_overflows']}, eksilme={stats['input_underflows']}, "
+                      f"halkada düşen={stats['dropped']}, en dolu={stats['max_queued']}/{stats['capacity']}")
+            if "device_seconds" in stats:
+                log_print(f"Ses cihazı zaman damgaları: {stats['device_seconds']:.3f} sn "
+                          f"({stats['callbacks'] * capture.chunk_seconds:.3f} sn örnek)")
+        except Exception as e:
+            self._fail(f"Ses kaydı sırasında hata oluştu: {e}")
+        finally:
+            try:
+                capture.stop()
+            except Exception:
+                pass
+            # Hata durumunda da o ana kadar yazılan ses geçerli kalsın; karışımdaki diğer girişler beklemesin
+            try:
+                self._close_audio_input(index)
+            except Exception as e:
+                self._fail(f"Ses izi kapatılırken hata oluştu: {e}")
+            log_print("Ses kayıt thread'i sonlandı.")
+
+    def _update_audio_metrics(self):
+        """Cihaz taşması ve halka kayıplarını tüm girişler üzerinden toplar."""
+        captures = [capture for capture in self._audio_captures if capture is not None]
+        self.metrics.audio_overruns = sum(capture.input_overflows for capture in captures)
+        self.metrics.audio_underruns = sum(capture.input_underflows for capture in captures)
+        self.metrics.audio_dropped = sum(capture.ring.dropped for capture in captures)
+
+    def _merge_audio(self, result):
+        """Ayrı yazılan ses dosyalarını videoyla birleştirir; başarısızsa dosyalar ayrı kalır.
+
+        Kayıt sırasında sıkıştırılan ses kopyalanır; kapsayıcı bu kodlayıcıyı
+        taşıyamıyorsa (ör. AVI'de Opus) ses bir kez AAC'ye kodlanır.
+        """
+        video_path = self.filename
+        base_name, ext = os.path.splitext(video_path)
+        temp_output = base_name + "_temp" + ext
+        audio_paths = self.audio_filenames
+
+        def keep_separate():
+            result["audio"] = audio_paths[0]
+            if len(audio_paths) > 1:
+                result["audio_tracks"] = list(audio_paths)
+
+        log_print("Video ve ses dosyaları birleştiriliyor...")
+        try:
+            if self._audio_compressed:
+                returncode, stderr = merge_audio_video(video_path, audio_paths, temp_output, audio_codec="copy")
+                if returncode != 0:
+                    log_print("Ses kopyalanarak eklenemedi, yeniden kodlanacak.", level="warning")
+            if not self._audio_compressed or returncode != 0:
+                returncode, stderr = merge_audio_video(video_path, audio_paths, temp_output)
+        except FileNotFoundError:
+            log_print("FFmpeg bulunamadı. Lütfen FFmpeg'in sistem PATH'inde olduğundan emin olun.", level="error")
+            keep_separate()
+            result["ffmpeg_missing"] = True
+            return
+        except Exception as e:
+            log_print(f"Birleştirme sırasında beklenmeyen hata: {e}", level="error")
+            keep_separate()
+            result["merge_error"] = str(e)
+            return
+
+        if returncode == 0:
+            os.replace(temp_output, video_path)
+            for path in audio_paths:
+                os.remove(path)
+            log_print(f"Video ve ses başarıyla birleştirildi: {video_path}")
+        else:
+            log_print(f"FFmpeg hatası: {stderr}", level="error")
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            keep_separate()
+            result["merge_error"] = stderr
+
+    @staticmethod
+    def _log_stats(ring, pacer, frame_path, damage):
+        stats = ring.stats()
+        log_print(f"Halka tampon istatistikleri: yakalanan={stats['pushed']}, yazılan={stats['consumed']}, "
+                  f"düşürülen={stats['dropped']}, en yüksek kuyruk={stats['max_queued']}/{stats['capacity']} "
+                  f"(politika: {stats['policy']})"
+                  + (f", okuyucu taşması={stats['overruns']}" if "overruns" in stats else ""))
+        pacing = pacer.stats()
+        log_print(f"Kare zamanlama istatistikleri: hedef={pacing['target_fps']} FPS, "
+                  f"ölçülen={pacing['measured_fps']:.2f} FPS, çıktı karesi={pacing['output_frames']}, "
+                  f"geç kalan={pacing['late_frames']}, atlanan zaman={pacing['skipped_deadlines']}, "
+                  f"titreşim ort/maks={pacing['jitter_ms_mean']:.2f}/{pacing['jitter_ms_max']:.2f} ms")
+        path_stats = frame_path.stats()
+        if path_stats["frames"]:
+            # Kodlama ayrı süreçteyse dönüşüm orada yapılır, bu süreçte sayaç boş kalır
+            log_print(f"Kare yolu istatistikleri: dönüşüm={path_stats['conversions']}/{path_stats['frames']} "
+                      f"(doğrudan BGRA: {path_stats['passthrough']}), ayırma: "
+                      f"mss={path_stats['source_alloc_bytes_per_capture'] / 1024:.0f} KB/yakalama, "
+                      f"kayıt yolu={path_stats['pipeline_alloc_bytes_per_frame'] / 1024:.1f} KB/kare")
+        if damage:
+            damage_stats = damage.stats()
+            log_print(f"Değişim tespiti: durağan kare={damage_stats['static_frames']}/{damage_stats['frames']} "
+                      f"(%{damage_stats['static_ratio'] * 100:.1f}), ortalama değişen alan="
+                      f"%{damage_stats['mean_changed_fraction'] * 100:.1f}")
@@ -0,0 +1,92 @@
+"""Kaydedicinin karelerini önizleme gibi yavaş abonelere dağıtan veri yolu."""
+import threading
+
+import numpy as np
+
+
+class FrameSubscription:
+    """Bir abonenin kendi tamponu ve bekleme durumu.
+
+    Abone ``get`` ile bir sonraki kareyi ister; kare yalnızca istendiğinde bu
+    aboneye ait tampona kopyalanır, arada yayınlanan kareler atlanır. Dönen
+    tampon bir sonraki ``get`` çağrısına kadar değişmez.
+    """
+
+    def __init__(self, bus):
+        self._bus = bus
+        self._ready = threading.Event()
+        self.wanted = False
+        self.buffer = None
+        self.timestamp = 0.0
+        self.frames_received = 0
+
+    def get(self, timeout=None):
+        """Yayınlanacak bir sonraki kareyi bekler; zaman aşımında None döner."""
+        self._bus._request(self)
+        if not self._ready.wait(timeout):
+            return None
+        return self.buffer
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class FrameBus:
+    """En son kareyi isteyen abonelere dağıtan, düşürmeli bir yayın/abone yapısı.
+
+    Yayıncı (kayıt thread'i) her karede ``publish`` çağırır; kopyalama yalnızca
+    kare isteyen bir abone varsa yapılır, bu yüzden abone olmadığında maliyet
+    tek bir bayrak kontrolüdür.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._pending = 0
+        self.frames_published = 0
+        self.frames_copied = 0
+
+    def subscribe(self):
+        subscription = FrameSubscription(self)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+                if subscription.wanted:
+                    subscription.wanted = False
+                    self._pending -= 1
+
+    def _request(self, subscription):
+        with self._lock:
+            subscription._ready.clear()
+            if not subscription.wanted:
+                subscription.wanted = True
+                self._pending += 1
+
+    @property
+    def has_waiting_subscribers(self):
+        return self._pending > 0
+
+    def publish(self, frame, timestamp):
+        """Kareyi bekleyen abonelerin tamponlarına kopyalar; kopya yapıldıysa True döner."""
+        self.frames_published += 1
+        if not self._pending:
+            return False
+        with self._lock:
+            for subscription in self._subscribers:
+                if not subscription.wanted:
+                    continue
+                if subscription.buffer is None or subscription.buffer.shape != frame.shape:
+                    subscription.buffer = np.empty_like(frame)
+                np.copyto(subscription.buffer, frame)
+                subscription.timestamp = timestamp
+                subscription.frames_received += 1
+                subscription.wanted = False
+                self._pending -= 1
+                self.frames_copied += 1
+                subscription._ready.set()
+        return True
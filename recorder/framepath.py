@@ -0,0 +1,71 @@
+"""mss görüntüsünden kodlayıcıya kadar kopyasız BGRA kare yolu."""
+import cv2
+import numpy as np
+
+# Kodlayıcı giriş düzenleri: "bgra" dönüştürmesiz geçer, "bgr24" tek dönüşüm gerektirir
+PIX_FMT_CHANNELS = {"bgra": 4, "bgr24": 3}
+
+
+def wrap_screenshot(shot):
+    """mss ScreenShot'ın ham BGRA tamponunu kopyalamadan (H, W, 4) dizi olarak sarar."""
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+class FramePath:
+    """BGRA kareleri kodlayıcının istediği düzene yeniden kullanılan tamponlarla çevirir.
+
+    ``bgra`` kabul eden kodlayıcılarda (ör. ffmpeg rawvideo ``-pix_fmt bgra``)
+    dönüşüm tamamen atlanır. ``bgr24`` için hedef tampon bir kez ayrılır ve
+    ``cv2.cvtColor(..., dst=...)`` ile her karede yeniden kullanılır.
+
+    Bellek ayırma miktarı iki parçada raporlanır: ``source`` mss'in her yakalamada
+    (``wrap``) kendi ayırdığı ham tampon, yakalama başına; ``pipeline`` ise bu yolun
+    ayırdıkları, dönüştürülen kare başına (kararlı durumda sıfır). Değişim tespitinin
+    atladığı kareler yakalanır ama dönüştürülmez; iki oran ayrı sayaçlara bölünür.
+    """
+
+    def __init__(self, output_pix_fmt="bgr24"):
+        if output_pix_fmt not in PIX_FMT_CHANNELS:
+            raise ValueError(f"Desteklenmeyen piksel düzeni: {output_pix_fmt}")
+        self.output_pix_fmt = output_pix_fmt
+        self._dst = None
+        self.captures = 0
+        self.frames = 0
+        self.conversions = 0
+        self.source_alloc_bytes = 0
+        self.pipeline_alloc_bytes = 0
+
+    @property
+    def passthrough(self):
+        return self.output_pix_fmt == "bgra"
+
+    def wrap(self, shot):
+        """Yakalanan görüntüyü kopyasız sarar ve mss'in ayırdığı bayt sayısını kaydeder."""
+        self.captures += 1
+        self.source_alloc_bytes += len(shot.raw)
+        return wrap_screenshot(shot)
+
+    def convert(self, bgra):
+        """Kodlayıcıya yazılacak diziyi döndürür; dönen tampon bir sonraki çağrıda yeniden yazılır."""
+        self.frames += 1
+        if self.passthrough:
+            return bgra
+        height, width = bgra.shape[:2]
+        if self._dst is None or self._dst.shape[:2] != (height, width):
+            self._dst = np.empty((height, width, 3), dtype=np.uint8)
+            self.pipeline_alloc_bytes += self._dst.nbytes
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._dst)
+        self.conversions += 1
+        return self._dst
+
+    def stats(self):
+        """Yakalama ve kare başına ayırma oranlarını ve dönüşüm sayılarını döndürür."""
+        frames = max(self.frames, 1)
+        return {
+            "captures": self.captures,
+            "frames": self.frames,
+            "conversions": self.conversions,
+            "passthrough": self.passthrough,
+            "source_alloc_bytes_per_capture": self.source_alloc_bytes / max(self.captures, 1),
+            "pipeline_alloc_bytes_per_frame": self.pipeline_alloc_bytes / frames,
+        }
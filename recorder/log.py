@@ -0,0 +1,13 @@
+"""Kayıt motoru ve arayüz tarafından ortak kullanılan loglama yardımcısı."""
+import logging
+
+
+def log_print(message, level="info"):
+    """Konsola çıktı veren ve log dosyasına yazan yardımcı fonksiyon."""
+    print(message)
+    if level == "error":
+        logging.error(message)
+    elif level == "warning":
+        logging.warning(message)
+    else:
+        logging.info(message)
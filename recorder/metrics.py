@@ -0,0 +1,278 @@
+"""Kayıt yolundaki kare süreleri için düşük maliyetli histogramlar ve dışa aktarımları."""
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .log import log_print
+
+# Süre kovaları (saniye): 50 µs'den ~3,3 sn'ye ikiye katlanarak
+SECONDS_BUCKETS = tuple(0.00005 * 2 ** i for i in range(17))
+# Kuyruk derinliği kovaları (kare)
+DEPTH_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64)
+
+METRIC_PREFIX = "screenrec"
+
+
+class Histogram:
+    """Sabit kova sınırlı histogram; gözlem bir ikili arama ve birkaç toplamadan ibarettir.
+
+    Kilitsizdir: her histogram tek bir thread'den yazılır, okuyucular (döküm,
+    HTTP) en fazla bir gözlem geride kalmış bir görüntü görebilir.
+    """
+
+    __slots__ = ("name", "help", "bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, name, help_text, bounds=SECONDS_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(bounds)
+        # Son eleman üst sınırı aşan (+Inf) gözlemler içindir
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Yüzdeliği, içine düştüğü kova içinde doğrusal aradeğerlemeyle tahmin eder."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= target:
+                if i == len(self.bounds):
+                    return self.max
+                lower = self.bounds[i - 1] if i else 0.0
+                value = lower + (self.bounds[i] - lower) * (target - cumulative) / count
+                return min(value, self.max)
+            cumulative += count
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+    def prometheus(self, labels):
+        """Prometheus metin biçiminde başlık satırları ve kümülatif kova satırları."""
+        name = f"{METRIC_PREFIX}_{self.name}"
+        header = (f"# HELP {name} {self.help}", f"# TYPE {name} histogram")
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f"{name}_bucket{_labels(labels, le=le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.sum:.9g}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return header, lines
+
+
+def _labels(labels, **extra):
+    items = dict(labels, **extra)
+    if not items:
+        return ""
+    escaped = {key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for key, value in items.items()}
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped.items()) + "}"
+
+
+class RecorderMetrics:
+    """Bir kaydın kare başına süre histogramları ve sayaçları.
+
+    ``grab`` ekranın yakalanması, ``write`` karenin halka yuvasına kopyalanması,
+    ``convert`` kodlayıcının piksel düzenine dönüşüm, ``encode`` karenin
+    kodlayıcıya verilmesi (ffmpeg borusu dolduğunda bekleme dahil) ve
+    ``queue_depth`` kare kuyruğa eklendiğindeki bekleyen kare sayısı,
+    ``lateness`` yakalamanın karenin kayıt saatindeki zamanından ne kadar geç
+    başladığıdır.
+    ``audio_queue`` ses parçasının ilk örneğinin yakalanmasından yazıcıya kadar
+    geçen süredir; ses sayaçları cihaz taşması/eksilmesi ve halkada düşürülen parçalardır.
+    Kodlama ayrı süreçteyse ``convert`` ve ``encode`` bu süreçte boş kalır.
+    Düşürülen kareler ``ring`` atanmışsa halkanın sayaçlarından okunur.
+    """
+
+    def __init__(self):
+        self.grab = Histogram("grab_seconds", "Ekran yakalama süresi")
+        self.write = Histogram("ring_write_seconds", "Karenin halka yuvasına kopyalanma süresi")
+        self.convert = Histogram("convert_seconds", "Piksel düzeni dönüşüm süresi")
+        self.encode = Histogram("encode_seconds", "Karenin kodlayıcıya verilme süresi")
+        self.queue_depth = Histogram("queue_depth_frames", "Kuyruğa eklemede bekleyen kare sayısı", DEPTH_BUCKETS)
+        self.lateness = Histogram("frame_lateness_seconds", "Yakalamanın kare zamanına göre gecikmesi")
+        self.audio_queue = Histogram("audio_queue_seconds", "Ses parçasının yakalanmasından yazılmasına kadar geçen süre")
+        self.audio_overruns = 0
+        self.audio_underruns = 0
+        self.audio_dropped = 0
+        self.audio_chunks = 0
+        self.mux_seconds = None
+        self.ring = None
+        self.started_at = time.time()
+
+    @property
+    def histograms(self):
+        return (self.grab, self.write, self.convert, self.encode, self.queue_depth, self.lateness, self.audio_queue)
+
+    def counters(self):
+        """Sayaçların anlık değerleri; tekrarlanan kare sayısı yazılan ve dönüştürülen karelerin farkıdır."""
+        ring = self.ring.stats() if self.ring is not None else {}
+        return {
+            "frames_captured": ring.get("pushed", self.write.count),
+            "frames_dropped": ring.get("dropped", 0),
+            "frames_duplicated": max(0, self.encode.count - self.convert.count),
+            "audio_chunks": self.audio_chunks,
+            "audio_overruns": self.audio_overruns,
+            "audio_underruns": self.audio_underruns,
+            "audio_dropped": self.audio_dropped,
+        }
+
+    def snapshot(self):
+        """JSON'a yazılabilir anlık görüntü."""
+        return {
+            "time": time.time(),
+            "elapsed_s": time.time() - self.started_at,
+            "histograms": {h.name: h.snapshot() for h in self.histograms},
+            "counters": self.counters(),
+            "mux_seconds": self.mux_seconds,
+        }
+
+    def summary_lines(self):
+        """Arayüz katmanı için kısa, okunur özet satırları."""
+        lines = []
+        for label, histogram in (("Yakalama", self.grab), ("Kopyalama", self.write),
+                                 ("Dönüşüm", self.convert), ("Kodlama", self.encode)):
+            if histogram.count:
+                lines.append(f"{label}: p50 {histogram.quantile(0.5) * 1000:.1f} / "
+                             f"p99 {histogram.quantile(0.99) * 1000:.1f} / maks {histogram.max * 1000:.1f} ms")
+        counters = self.counters()
+        lines.append(f"Kuyruk p90: {self.queue_depth.quantile(0.9):g} kare, düşen: {counters['frames_dropped']}, "
+                     f"tekrar: {counters['frames_duplicated']}")
+        if counters["audio_chunks"]:
+            lines.append(f"Ses: {counters['audio_chunks']} parça, taşma: {counters['audio_overruns']}, "
+                         f"eksilme: {counters['audio_underruns']}, düşen: {counters['audio_dropped']}")
+        if self.mux_seconds is not None:
+            lines.append(f"Tamamlama: {self.mux_seconds:.2f} sn")
+        return lines
+
+    def prometheus(self, labels=None):
+        """Prometheus metin biçiminde ``(başlık satırları, örnek satırları)`` metrik aileleri."""
+        labels = labels or {}
+        families = [histogram.prometheus(labels) for histogram in self.histograms]
+        for name, value in self.counters().items():
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            families.append(((f"# TYPE {metric} counter",), [f"{metric}{_labels(labels)} {value}"]))
+        if self.mux_seconds is not None:
+            metric = f"{METRIC_PREFIX}_mux_seconds"
+            families.append(((f"# TYPE {metric} gauge",), [f"{metric}{_labels(labels)} {self.mux_seconds:.6g}"]))
+        return families
+
+
+class MetricsDumper:
+    """Metriklerin anlık görüntüsünü ``interval`` saniyede bir JSON satırı olarak dosyaya ekler."""
+
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="recorder-metrics-dump", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.dump()
+
+    def dump(self):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.metrics.snapshot(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            log_print(f"Metrik dökümü yazılamadı: {e}", level="warning")
+
+    def stop(self):
+        """Döngüyü durdurur ve son durumu (tamamlama süresi dahil) bir kez daha yazar."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.dump()
+
+
+class MetricsServer:
+    """Kayıtlı metrikleri yerel bir HTTP ``/metrics`` adresinden Prometheus biçiminde sunar."""
+
+    def __init__(self, port, host="127.0.0.1"):
+        self.port = port
+        self.host = host
+        self._sources = []
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def register(self, metrics, **labels):
+        with self._lock:
+            self._sources.append((labels, metrics))
+
+    def unregister(self, metrics):
+        with self._lock:
+            self._sources = [(labels, m) for labels, m in self._sources if m is not metrics]
+
+    def render(self):
+        with self._lock:
+            sources = list(self._sources)
+        # Bir metriğin tüm kaynaklardaki örnekleri tek başlığın altında art arda gelmelidir
+        families = {}
+        for labels, metrics in sources:
+            for header, samples in metrics.prometheus(labels):
+                families.setdefault(header, []).extend(samples)
+        lines = []
+        for header, samples in families.items():
+            lines += list(header) + samples
+        return "\n".join(lines) + "\n"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = server.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="recorder-metrics-http", daemon=True)
+        self._thread.start()
+        log_print(f"Metrik adresi: http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
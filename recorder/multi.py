@@ -0,0 +1,224 @@
+"""Birden çok ekran kaynağını ortak saatle, kaynak başına ayrı dosyaya kaydetme."""
+import multiprocessing
+import queue
+import threading
+
+from .engine import Recorder
+from .log import log_print
+from .metrics import MetricsServer
+from .pacing import CaptureClock
+
+
+def _run_source(index, output, region, fps, settings, clock, stop_event, messages):
+    """Alt süreçte tek bir kaynağı kaydeder; durumunu ``messages`` kuyruğuyla bildirir."""
+    # Kaynak zaten kendi sürecinde; daemon süreçler alt süreç başlatamadığından kodlayıcı burada çalışır
+    settings = dict(settings, encode_process=False, parallel_encoding_workers=0)
+    if int(settings.get("metrics_port", 0)):
+        # Metrikler süreç içinde tutulur; her süreç kendi portundan sunar
+        settings["metrics_port"] = int(settings["metrics_port"]) + index
+    recorder = Recorder(output, region, fps=fps, settings=settings, clock=clock,
+                        on_error=lambda message: messages.put(("error", index, message)))
+    try:
+        recorder.start()
+    except Exception as e:
+        messages.put(("failed", index, str(e)))
+        recorder.stop(timeout=5)
+        return
+    messages.put(("ready", index, recorder.filename))
+    try:
+        while not stop_event.wait(0.2):
+            if recorder.wait(0):
+                break
+    except KeyboardInterrupt:
+        # Ctrl+C tüm süreç grubuna gider; kaydı ana süreç durdurur, burada dosya tamamlanır
+        pass
+    messages.put(("result", index, recorder.stop()))
+
+
+class MultiRecorder:
+    """Birden çok ekran bölgesini, her biri kendi kodlayıcısıyla ayrı dosyaya kaydeder.
+
+    Tüm kaynaklar tek bir CaptureClock'un kare zamanlarını hedefler: n. kare her
+    dosyada aynı ana karşılık gelir, duraklatma hepsinde aynı anda etkili olur ve
+    dosyalar aynı kare sayısıyla biter. ``use_processes`` açıkken ilk kaynak dışındaki
+    kaynaklar ayrı süreçlerde yakalanır ve kodlanır (GIL paylaşılmaz). Ses, önizleme
+    ve pencere takibi (``primary_options``) ilk kaynağa bağlıdır ve o kaynak her
+    zaman bu süreçte çalışır.
+
+    ``metrics_port`` ayarlıysa bu süreçteki kaynakların metrikleri tek bir HTTP
+    sunucusundan, ayrı süreçlerdekiler ``metrics_port + kaynak indeksi`` portundan sunulur.
+
+    ``stop`` her kaynak için ``Recorder.stop`` sonuç sözlüklerinin listesini döndürür.
+    """
+
+    def __init__(self, sources, fps=20, settings=None, use_processes=False, on_error=None, **primary_options):
+        if not sources:
+            raise ValueError("En az bir kayıt kaynağı gerekli.")
+        self.sources = [(output, dict(region)) for output, region in sources]
+        self.fps = fps
+        self.settings = dict(settings or {})
+        self.use_processes = use_processes and len(self.sources) > 1
+        self.on_error = on_error
+        self.primary_options = primary_options
+
+        self.clock = CaptureClock(shared=self.use_processes)
+        self.error = None
+        self.results = None
+        self._stop_event = threading.Event()
+        self._recorders = []
+        self._processes = []
+        self._process_stop = None
+        self._messages = None
+        self._process_results = {}
+        self._filenames = {}
+        self._listener = None
+        self._metrics_server = None
+
+    @property
+    def metrics(self):
+        """Birincil kaynağın metrikleri (başlatılmadıysa None)."""
+        return self._recorders[0].metrics if self._recorders else None
+
+    @property
+    def filename(self):
+        """İlk (birincil) kaynağın video dosyası."""
+        return self._recorders[0].filename if self._recorders else self.sources[0][0]
+
+    @property
+    def filenames(self):
+        names = {i: recorder.filename for i, recorder in enumerate(self._recorders)}
+        names.update(self._filenames)
+        return [names.get(i, output) for i, (output, _) in enumerate(self.sources)]
+
+    @property
+    def paused(self):
+        return self.clock.paused
+
+    @property
+    def recording(self):
+        return self.clock.started and not self._stop_event.is_set()
+
+    def start(self):
+        """Tüm kaynakların kodlayıcılarını açar, hepsi hazır olunca ortak saati başlatır."""
+        try:
+            if self.use_processes:
+                self._start_processes()
+            port = int(self.settings.get("metrics_port", 0))
+            if port:
+                try:
+                    self._metrics_server = MetricsServer(port)
+                    self._metrics_server.start()
+                except OSError as e:
+                    log_print(f"Metrik sunucusu başlatılamadı ({port}): {e}", level="warning")
+                    self._metrics_server = None
+            local_sources = self.sources[:1] if self.use_processes else self.sources
+            for i, (output, region) in enumerate(local_sources):
+                options = self.primary_options if i == 0 else {}
+                # Sunucu açılamadıysa kaynaklar yeniden denemesin
+                recorder = Recorder(output, region, fps=self.fps, settings=dict(self.settings, metrics_port=0),
+                                    clock=self.clock, on_error=self._fail, metrics_server=self._metrics_server,
+                                    **options)
+                self._recorders.append(recorder)
+                recorder.start()
+        except Exception:
+            self.stop(timeout=5)
+            raise
+        # Tüm kodlayıcılar açık: kareler bu andan itibaren her kaynakta aynı zamanları hedefler
+        self.clock.start()
+        log_print(f"Çoklu kayıt başlatıldı: {len(self.sources)} kaynak"
+                  f"{' (ayrı süreçlerde)' if self.use_processes else ''}")
+
+    def _start_processes(self, ready_timeout=30.0):
+        self._process_stop = multiprocessing.Event()
+        self._messages = multiprocessing.Queue()
+        for index, (output, region) in enumerate(self.sources[1:], start=1):
+            process = multiprocessing.Process(
+                target=_run_source, name=f"recorder-source-{index}",
+                args=(index, output, region, self.fps, self.settings, self.clock,
+                      self._process_stop, self._messages))
+            process.daemon = True
+            process.start()
+            self._processes.append(process)
+
+        pending = set(range(1, len(self.sources)))
+        while pending:
+            try:
+                kind, index, payload = self._messages.get(timeout=ready_timeout)
+            except queue.Empty:
+                raise RuntimeError("Kayıt süreçleri zamanında hazır olmadı.")
+            if kind == "failed":
+                raise RuntimeError(f"Kaynak {index} başlatılamadı: {payload}")
+            if kind == "ready":
+                self._filenames[index] = payload
+                pending.discard(index)
+        self._listener = threading.Thread(target=self._listen, name="recorder-multi-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        """Alt süreçlerden gelen hata ve sonuç mesajlarını işler."""
+        while len(self._process_results) < len(self._processes):
+            message = self._messages.get()
+            if message is None:
+                break
+            kind, index, payload = message
+            if kind == "error":
+                self._fail(f"Kaynak {index}: {payload}")
+            elif kind == "result":
+                self._process_results[index] = payload
+
+    def _fail(self, message):
+        if self.error is None:
+            self.error = message
+        self._stop_event.set()
+        if self.on_error:
+            self.on_error(message)
+
+    def pause(self):
+        self.clock.pause()
+
+    def resume(self):
+        self.clock.resume()
+
+    def save_replay(self, path=None, seconds=None):
+        """Birincil kaynağın anlık tekrar tamponunu kaydeder (bkz. ``Recorder.save_replay``)."""
+        if not self._recorders:
+            raise RuntimeError("Kayıt başlatılmadı.")
+        return self._recorders[0].save_replay(path, seconds)
+
+    def wait(self, timeout=None):
+        """Kayıt durdurulana veya bir kaynakta hata oluşana kadar bekler; durduysa True döner."""
+        return self._stop_event.wait(timeout)
+
+    def stop(self, timeout=60):
+        """Ortak saati durdurur, tüm kaynakları tamamlar ve sonuç listesini döndürür."""
+        if self.results is not None:
+            return self.results
+        self.clock.stop()
+        self._stop_event.set()
+        if self._process_stop is not None:
+            self._process_stop.set()
+
+        results = {i: recorder.stop(timeout=timeout) for i, recorder in enumerate(self._recorders)}
+        for process in self._processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                log_print(f"Uyarı: {process.name} zaman aşımına uğradı, sonlandırılıyor.", level="warning")
+                process.terminate()
+        if self._listener is not None:
+            self._messages.put(None)
+            self._listener.join(timeout=5)
+        results.update(self._process_results)
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
+            self._metrics_server = None
+
+        self.results = []
+        for i, (output, _) in enumerate(self.sources):
+            if i not in results:
+                results[i] = {"video": self._filenames.get(i, output), "audio": None, "audio_tracks": None,
+                              "returncode": None,
+                              "encoder_error": "Kaynak sonuç bildirmeden sonlandı.", "merge_error": None,
+                              "ffmpeg_missing": False, "segments": None, "replays": None,
+                              "quality": None, "sync": None, "error": self.error}
+            self.results.append(results[i])
+        return self.results
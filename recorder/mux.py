@@ -0,0 +1,298 @@
+"""Ham video ve PCM sesi tek bir ffmpeg sürecinde canlı olarak birleştiren yazıcı ve canlı ses kodlayıcısı."""
+import collections
+import queue
+import shutil
+import socket
+import subprocess
+import threading
+
+# Windows'ta ffmpeg için konsol penceresi açılmasın
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# yuv420p çift genişlik/yükseklik ister; tek sayılı seçim alanları bir piksel kırpılır
+EVEN_CROP_FILTER = "crop=trunc(iw/2)*2:trunc(ih/2)*2"
+DEFAULT_VIDEO_ARGS = ["-vf", EVEN_CROP_FILTER, "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+                      "-pix_fmt", "yuv420p"]
+DEFAULT_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "160k"]
+# Ses kodlayıcıları: ffmpeg kodlayıcısı ve kayıt sırasında yazılan ara dosyanın uzantısı.
+# ADTS ve Ogg akış biçimlidir; kayıt yarıda kalsa da yazılan kısım okunabilir.
+AUDIO_CODECS = {"aac": ("aac", ".aac"), "opus": ("libopus", ".opus")}
+DEFAULT_AUDIO_BITRATE = "160k"
+
+
+def audio_codec_args(codec="aac", bitrate=DEFAULT_AUDIO_BITRATE):
+    """Seçilen ses kodlayıcısı ve bit hızı için ffmpeg çıktı argümanları."""
+    if codec not in AUDIO_CODECS:
+        raise ValueError(f"Desteklenmeyen ses kodlayıcısı: {codec}")
+    return ["-c:a", AUDIO_CODECS[codec][0], "-b:a", str(bitrate or DEFAULT_AUDIO_BITRATE)]
+
+
+def ffmpeg_available(ffmpeg="ffmpeg"):
+    """ffmpeg çalıştırılabilir dosyası PATH'te bulunuyorsa True döner."""
+    return shutil.which(ffmpeg) is not None
+
+
+class FFmpegMuxer:
+    """Kareleri stdin borusundan, PCM sesi yerel bir TCP soketinden ffmpeg'e aktarır.
+
+    Kayıt durduğu anda ses ve görüntü tek bir dosyada hazırdır; ayrı bir
+    birleştirme geçişi ve geçici dosyalar gerekmez. Video ve ses farklı
+    thread'lerden yazılabilir. Ses verilmezse yalnızca video kaydedilir.
+    ``audio_tracks`` birden büyükse her ses izi kendi soketinden gelir ve
+    kapsayıcıda ayrı bir ses akışı olur; izler farklı thread'lerden yazılabilir.
+    """
+
+    def __init__(self, filename, width, height, fps, pix_fmt="bgr24",
+                 audio_channels=None, audio_rate=None, audio_sample_fmt="s16le",
+                 video_args=None, audio_args=None, output_args=None, ffmpeg="ffmpeg", audio_tracks=1):
+        self.filename = filename
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.audio_channels = audio_channels
+        self.audio_rate = audio_rate
+        self.audio_sample_fmt = audio_sample_fmt
+        self.audio_tracks = max(1, int(audio_tracks))
+        self.video_args = list(video_args) if video_args is not None else list(DEFAULT_VIDEO_ARGS)
+        self.audio_args = list(audio_args) if audio_args is not None else list(DEFAULT_AUDIO_ARGS)
+        # Kapsayıcı seçenekleri (ör. parçalı mp4, segment muxer); çıktı adından hemen önce gelir
+        self.output_args = list(output_args or [])
+        self.ffmpeg = ffmpeg
+
+        self.process = None
+        self._audio_listeners = [None] * self.audio_tracks
+        self._audio_conns = [None] * self.audio_tracks
+        self._audio_locks = [threading.Lock() for _ in range(self.audio_tracks)]
+        self._stderr_tail = collections.deque(maxlen=50)
+        self._stderr_thread = None
+
+    @property
+    def has_audio(self):
+        return bool(self.audio_channels and self.audio_rate)
+
+    def build_command(self, audio_ports=None):
+        """ffmpeg komut satırını oluşturur; ``audio_ports`` her ses izinin soket portudur."""
+        cmd = [self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+               "-f", "rawvideo", "-pix_fmt", self.pix_fmt,
+               "-s", f"{self.width}x{self.height}", "-r", str(self.fps),
+               "-i", "pipe:0"]
+        for port in audio_ports or ():
+            # Ham PCM'in biçimi bellidir; ffmpeg akışı incelemek için saniyelerce ses beklemesin
+            cmd += ["-probesize", "32", "-analyzeduration", "0",
+                    "-f", self.audio_sample_fmt, "-ar", str(self.audio_rate),
+                    "-ac", str(self.audio_channels), "-i", f"tcp://127.0.0.1:{port}"]
+        if audio_ports:
+            cmd += ["-map", "0:v"]
+            for track in range(len(audio_ports)):
+                cmd += ["-map", f"{track + 1}:a"]
+        cmd += self.video_args
+        if audio_ports:
+            cmd += self.audio_args
+        cmd += self.output_args
+        cmd.append(self.filename)
+        return cmd
+
+    def start(self):
+        """ffmpeg sürecini başlatır; ses girişi varsa ffmpeg'in bağlanacağı soketi açar."""
+        audio_ports = []
+        if self.has_audio:
+            for track in range(self.audio_tracks):
+                listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self._audio_listeners[track] = listener
+                listener.bind(("127.0.0.1", 0))
+                listener.listen(1)
+                audio_ports.append(listener.getsockname()[1])
+        try:
+            self.process = subprocess.Popen(self.build_command(audio_ports), stdin=subprocess.PIPE,
+                                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                            creationflags=CREATE_NO_WINDOW)
+        except Exception:
+            for track in range(self.audio_tracks):
+                self._close_audio_sockets(track)
+            raise
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b""):
+            self._stderr_tail.append(line.decode("utf-8", errors="replace").rstrip())
+
+    @property
+    def stderr_text(self):
+        return "\n".join(self._stderr_tail)
+
+    def write(self, frame):
+        """Bir video karesini (``pix_fmt`` düzeninde) ffmpeg'e yazar."""
+        self.process.stdin.write(memoryview(frame).cast("B"))
+
+    def write_audio(self, data, track=0, accept_timeout=15.0):
+        """``track`` izine bir PCM ses parçası yazar; izin ilk çağrısında ffmpeg'in bağlanmasını bekler."""
+        with self._audio_locks[track]:
+            conn = self._audio_conns[track]
+            if conn is None:
+                listener = self._audio_listeners[track]
+                if listener is None:
+                    raise RuntimeError("Bu birleştirici ses girişi olmadan başlatıldı.")
+                listener.settimeout(accept_timeout)
+                conn, _ = listener.accept()
+                self._audio_conns[track] = conn
+                listener.close()
+                self._audio_listeners[track] = None
+            conn.sendall(data)
+
+    def close_video(self):
+        """Video borusunu kapatır; ffmpeg video akışının bittiğini anlar."""
+        if self.process and self.process.stdin and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    def close_audio(self, track=None):
+        """Ses bağlantısını (``track`` verilmezse tüm izleri) kapatır; ffmpeg akışın bittiğini anlar."""
+        for index in range(self.audio_tracks) if track is None else (track,):
+            with self._audio_locks[index]:
+                self._close_audio_sockets(index)
+
+    def _close_audio_sockets(self, track):
+        conn = self._audio_conns[track]
+        if conn is not None:
+            try:
+                conn.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            conn.close()
+            self._audio_conns[track] = None
+        if self._audio_listeners[track] is not None:
+            self._audio_listeners[track].close()
+            self._audio_listeners[track] = None
+
+    def wait(self, timeout=None):
+        """Girişleri kapatır, ffmpeg'in dosyayı tamamlamasını bekler ve çıkış kodunu döndürür."""
+        self.close_video()
+        self.close_audio()
+        try:
+            returncode = self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            returncode = self.process.wait()
+        if self._stderr_thread:
+            self._stderr_thread.join(timeout=1)
+        return returncode
+
+
+class FFmpegAudioWriter:
+    """PCM ses parçalarını kayıt sırasında sıkıştırılmış bir dosyaya kodlayan yazıcı.
+
+    StreamingWavWriter ile aynı arayüze sahiptir. Parçalar bir kuyruğa alınır,
+    worker thread onları ffmpeg'in stdin'ine aktarır ve kodlama ayrı süreçte
+    yapılır; ses thread'i kodlayıcıyı beklemez. Diske ham PCM yerine
+    ``bitrate`` hızında AAC veya Opus yazılır ve kayıttan sonra ses yeniden
+    kodlanmadan videoya eklenebilir. Kuyruk ``queue_chunks`` parçayla sınırlıdır;
+    ffmpeg geride kalırsa ``write`` bekler.
+    """
+
+    def __init__(self, filename, channels, rate, codec="aac", bitrate=DEFAULT_AUDIO_BITRATE, sample_width=2,
+                 ffmpeg="ffmpeg", queue_chunks=256):
+        self.filename = filename
+        self.channels = channels
+        self.rate = rate
+        self.codec = codec
+        self.bitrate = bitrate or DEFAULT_AUDIO_BITRATE
+        self.sample_width = sample_width
+        self.ffmpeg = ffmpeg
+        self.data_bytes = 0
+        self.returncode = None
+        self._queue = queue.Queue(maxsize=queue_chunks)
+        self._stderr_tail = collections.deque(maxlen=20)
+        self._error = None
+        self._closed = False
+        self.process = subprocess.Popen(self.build_command(), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.PIPE, creationflags=CREATE_NO_WINDOW)
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        self._thread = threading.Thread(target=self._feed, name="audio-encoder", daemon=True)
+        self._thread.start()
+
+    def build_command(self):
+        return ([self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+                 "-f", f"s{self.sample_width * 8}le", "-ar", str(self.rate), "-ac", str(self.channels),
+                 "-i", "pipe:0"] + audio_codec_args(self.codec, self.bitrate) + [self.filename])
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b""):
+            self._stderr_tail.append(line.decode("utf-8", errors="replace").rstrip())
+
+    def _feed(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            if self._error is not None:
+                continue  # close() kuyruğu boşaltabilsin diye parçalar atılır
+            try:
+                self.process.stdin.write(data)
+            except OSError as e:
+                self._error = e
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+    @property
+    def stderr_text(self):
+        return "\n".join(self._stderr_tail)
+
+    @property
+    def frames_written(self):
+        return self.data_bytes // (self.channels * self.sample_width)
+
+    def write(self, data):
+        """Bir ses parçasını kodlama kuyruğuna ekler; ffmpeg kapanmışsa ``RuntimeError`` yükselir."""
+        if self._error is not None:
+            raise RuntimeError(f"Ses kodlayıcısı durdu: {self.stderr_text or self._error}")
+        self._queue.put(bytes(data))
+        self.data_bytes += len(data)
+
+    def close(self, timeout=30):
+        """Kuyruktaki parçaları kodlatır, dosyayı tamamlar; ffmpeg başarısızsa ``RuntimeError`` yükselir."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self.returncode = self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.returncode = self.process.wait()
+        self._stderr_thread.join(timeout=1)
+        if self.returncode != 0:
+            raise RuntimeError(f"Ses kodlayıcısı hatası ({self.returncode}): {self.stderr_text}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def merge_audio_video(video_path, audio_path, output_path, ffmpeg="ffmpeg", audio_codec="aac"):
+    """Ayrı kaydedilmiş video ve ses dosyasını videoyu yeniden kodlamadan birleştirir.
+
+    ``audio_path`` bir liste ise her dosya çıktıda ayrı bir ses izi olur.
+    Ses kayıt sırasında sıkıştırıldıysa ``audio_codec="copy"`` ile o da
+    kopyalanır. ffmpeg'in çıkış kodunu ve hata çıktısını döndürür; ffmpeg
+    bulunamazsa ``FileNotFoundError`` yükselir.
+    """
+    audio_paths = [audio_path] if isinstance(audio_path, str) else list(audio_path)
+    cmd = [ffmpeg, "-i", video_path]
+    for path in audio_paths:
+        cmd += ["-i", path]
+    cmd += ["-map", "0:v"]
+    for track in range(len(audio_paths)):
+        cmd += ["-map", f"{track + 1}:a"]
+    cmd += ["-c:v", "copy", "-c:a", audio_codec, "-strict", "experimental", "-y", output_path]
+    result = subprocess.run(cmd, capture_output=True, text=True, creationflags=CREATE_NO_WINDOW)
+    return result.returncode, result.stderr
@@ -0,0 +1,218 @@
+"""Mutlak kare zamanlarını hedefleyen kare hızı zamanlayıcısı ve ortak kayıt saati."""
+import math
+import multiprocessing
+import threading
+import time
+
+
+class FramePacer:
+    """Monotonik saate göre kare zamanlarını (deadline) hedefleyen zamanlayıcı.
+
+    Her kare için ``start + n / fps`` zamanı beklenir; iş süresi bir sonraki
+    bekleme süresinden düşüldüğü için kayma birikmez. Geride kalındığında
+    kaçırılan kare zamanları atlanır ve ``wait`` çıktıdaki gerçek kare indeksini
+    döndürür; tüketici aradaki boşluğu önceki kareyi tekrarlayarak doldurur.
+    Böylece sabit kare hızlı dosyanın zaman damgaları duvar saatiyle örtüşür.
+    """
+
+    def __init__(self, fps, clock=time.monotonic, sleep=time.sleep):
+        if fps <= 0:
+            raise ValueError(f"Geçersiz FPS değeri: {fps}")
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self._clock = clock
+        self._sleep = sleep
+        self.start_time = None
+        self.stop_time = None
+        self._paused_at = None
+        self._next_index = 0
+
+        # İstatistikler
+        self.frames_captured = 0
+        self.late_frames = 0
+        self.skipped_deadlines = 0
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+
+    def start(self, at=None):
+        """Zamanlayıcıyı şimdiki andan (veya ``at`` saat değerinden) başlatır."""
+        self.start_time = self._clock() if at is None else at
+        self.stop_time = None
+        self._paused_at = None
+        self._next_index = 0
+
+    def pause(self):
+        """Duraklatma süresi kare zaman çizelgesine eklenmez."""
+        if self._paused_at is None:
+            self._paused_at = self._clock()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self.start_time += self._clock() - self._paused_at
+            self._paused_at = None
+
+    def stop(self):
+        """Bitiş zamanını sabitler; ``total_frames`` bu ana göre hesaplanır."""
+        if self.stop_time is None:
+            self.resume()
+            self.stop_time = self._clock()
+
+    def _elapsed(self, now):
+        if self._paused_at is not None:
+            now = self._paused_at
+        return now - self.start_time
+
+    def wait(self):
+        """Sıradaki kare zamanına kadar bekler ve yakalanacak karenin indeksini döndürür.
+
+        Bekledikten sonra saat kare zamanına ulaşmamışsa (saat duraklatılmış veya
+        durdurulmuş) kare tüketilmez ve ``None`` döner.
+        """
+        if self.start_time is None:
+            self.start()
+        deadline = self.start_time + self._next_index * self.interval
+        now = self._clock()
+        if now < deadline:
+            self._sleep(deadline - now)
+            now = self._clock()
+            if now < deadline:
+                return None
+
+        # Şu ana kadar vadesi gelmiş en son kare zamanı
+        due_index = max(self._next_index, int(self._elapsed(now) / self.interval))
+        if due_index > self._next_index:
+            self.late_frames += 1
+            self.skipped_deadlines += due_index - self._next_index
+        else:
+            jitter = abs(now - deadline)
+            self._jitter_sum += jitter
+            if jitter > self._jitter_max:
+                self._jitter_max = jitter
+
+        self._next_index = due_index + 1
+        self.frames_captured += 1
+        return due_index
+
+    def deadline(self, index):
+        """``index`` numaralı karenin hedef zamanı (zamanlayıcının saatinde)."""
+        return self.start_time + index * self.interval
+
+    def total_frames(self):
+        """Başlangıçtan bitişe (veya şimdiye) kadar çıktıda olması gereken kare sayısı."""
+        if self.start_time is None:
+            return 0
+        end = self.stop_time if self.stop_time is not None else self._clock()
+        return max(self._next_index, int(math.ceil(self._elapsed(end) / self.interval)))
+
+    def stats(self):
+        """Ölçülen FPS, titreşim ve geç kalan kare sayılarını döndürür."""
+        if self.start_time is None:
+            elapsed = 0.0
+        else:
+            end = self.stop_time if self.stop_time is not None else self._clock()
+            elapsed = self._elapsed(end)
+        on_time = self.frames_captured - self.late_frames
+        return {
+            "target_fps": self.fps,
+            "measured_fps": self.frames_captured / elapsed if elapsed > 0 else 0.0,
+            "captured_frames": self.frames_captured,
+            "output_frames": self.total_frames(),
+            "late_frames": self.late_frames,
+            "skipped_deadlines": self.skipped_deadlines,
+            "jitter_ms_mean": (self._jitter_sum / on_time * 1000.0) if on_time > 0 else 0.0,
+            "jitter_ms_max": self._jitter_max * 1000.0,
+            "elapsed_s": elapsed,
+        }
+
+
+class CaptureClock:
+    """Duraklatmaları dışarıda bırakan, birden çok kaynağın paylaşabildiği kayıt saati.
+
+    ``now`` kaydın başından beri geçen aktif süreyi döndürür; duraklatıldığında ve
+    durdurulduğunda donar. Aynı saati kullanan zamanlayıcılar (``FramePacer(fps,
+    clock=saat.now)`` ve ``start(at=0.0)``) aynı kare zamanlarını hedefler ve aynı
+    kare sayısıyla biter. ``shared=True`` ile durum ``multiprocessing`` nesnelerinde
+    tutulur ve saat alt süreçlere verilebilir; ``time.monotonic`` sistem genelinde
+    ortak olduğundan süreçler arasında da kareler hizalı kalır.
+    """
+
+    ORIGIN, PAUSED_TOTAL, FROZEN_AT = range(3)
+
+    def __init__(self, shared=False, clock=time.monotonic):
+        self._clock = clock
+        initial = [0.0, 0.0, -1.0]  # başlangıç, toplam duraklama, donma anı (-1: akıyor)
+        if shared:
+            self._state = multiprocessing.Array("d", initial)
+            self._lock = self._state.get_lock()
+            self._started = multiprocessing.Event()
+            self._stopped = multiprocessing.Event()
+        else:
+            self._state = initial
+            self._lock = threading.Lock()
+            self._started = threading.Event()
+            self._stopped = threading.Event()
+
+    @property
+    def started(self):
+        return self._started.is_set()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    @property
+    def paused(self):
+        with self._lock:
+            return self._state[self.FROZEN_AT] >= 0 and not self._stopped.is_set()
+
+    def wait_started(self, timeout=None):
+        """Saat başlatılana kadar bekler; başladıysa True döner."""
+        return self._started.wait(timeout)
+
+    def start(self):
+        with self._lock:
+            self._state[self.ORIGIN] = self._clock()
+            self._state[self.PAUSED_TOTAL] = 0.0
+            self._state[self.FROZEN_AT] = -1.0
+        self._started.set()
+
+    def now(self):
+        """Başlangıçtan beri geçen, duraklamalar hariç süre (saniye)."""
+        if not self._started.is_set():
+            return 0.0
+        with self._lock:
+            origin, paused_total, frozen_at = self._state[:]
+        current = frozen_at if frozen_at >= 0 else self._clock()
+        return current - origin - paused_total
+
+    def at(self, timestamp):
+        """``time.monotonic`` cinsinden bir anı kayıt saatine çevirir; saat başlamadıysa None.
+
+        Duraklama sırasındaki anlar duraklamanın başladığı ana sabitlenir.
+        """
+        if not self._started.is_set():
+            return None
+        with self._lock:
+            origin, paused_total, frozen_at = self._state[:]
+        if frozen_at >= 0:
+            timestamp = min(timestamp, frozen_at)
+        return timestamp - origin - paused_total
+
+    def pause(self):
+        with self._lock:
+            if self._state[self.FROZEN_AT] < 0:
+                self._state[self.FROZEN_AT] = self._clock()
+
+    def resume(self):
+        if self._stopped.is_set():
+            return
+        with self._lock:
+            frozen_at = self._state[self.FROZEN_AT]
+            if frozen_at >= 0:
+                self._state[self.PAUSED_TOTAL] += self._clock() - frozen_at
+                self._state[self.FROZEN_AT] = -1.0
+
+    def stop(self):
+        """Saati kalıcı olarak dondurur; tüm kaynakların bitiş anı aynı olur."""
+        self.pause()
+        self._stopped.set()
@@ -0,0 +1,249 @@
+"""Kaydı zaman parçalarına bölüp parçaları süreç havuzunda paralel kodlayan kodlayıcı."""
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from .encoders import FFmpegEncoder
+from .log import log_print
+from .mux import FFmpegMuxer
+from .segments import concat_segments, read_segment_index, write_segment_index
+from .shmring import SharedFrameRing
+
+
+def _encode_worker(worker_id, ring, segment_frames, segment_name, fps, video_args, ffmpeg, results):
+    """Kodlama süreci: kendisine atanan parçaların karelerini paylaşılan halkadan okuyup kodlar.
+
+    Parça sınırları karelerin sıra numarasından hesaplanır (parça = sıra // parça uzunluğu).
+    """
+    height, width = ring.shape[:2]
+    muxer = None
+    segment = None
+    frame_count = 0
+    busy = 0.0
+
+    def close_segment():
+        nonlocal muxer, busy
+        started = time.perf_counter()
+        returncode = muxer.wait()
+        busy += time.perf_counter() - started
+        results.put((worker_id, segment, returncode, frame_count, busy, muxer.stderr_text))
+        muxer = None
+
+    try:
+        while not ring.is_drained():
+            slot = ring.acquire_read(timeout=0.1)
+            if slot is None:
+                continue
+            started = time.perf_counter()
+            try:
+                index, offset = divmod(int(ring.sequence[slot]), segment_frames)
+                if muxer is None or index != segment:
+                    if muxer is not None:
+                        close_segment()
+                    segment = index
+                    base, ext = segment_name
+                    muxer = FFmpegMuxer(f"{base}.part{segment:04d}{ext}", width, height, fps, pix_fmt="bgra",
+                                        video_args=video_args, ffmpeg=ffmpeg)
+                    muxer.start()
+                    frame_count = 0
+                    busy = 0.0
+                # Kare paylaşılan bellekten doğrudan ffmpeg borusuna gider, kopyalanmaz
+                muxer.write(ring.slots[slot])
+            finally:
+                ring.release_read(slot)
+            busy += time.perf_counter() - started
+            frame_count += 1
+            if offset == segment_frames - 1:
+                close_segment()
+        if muxer is not None:
+            close_segment()
+    except Exception as e:
+        results.put((worker_id, segment, -1, frame_count, busy, str(e)))
+        if muxer is not None:
+            muxer.wait(timeout=5)
+    finally:
+        ring.detach()
+
+
+class SegmentParallelEncoder:
+    """Kaydı ``segment_seconds`` uzunluğunda parçalara bölüp ``workers`` süreçte kodlar.
+
+    Her parça sırayla bir kodlama sürecine atanır (parça i -> süreç i % workers).
+    Kareler sürecin SharedFrameRing yuvalarına bir kez kopyalanır; süreç onları
+    kopyalamadan kendi ffmpeg'ine aktarır. Bir süreç geride kaldığında halkası
+    dolar ve ``write`` boş yuva bekler (geri basınç); bu sırada önceki parçalar
+    diğer süreçlerde kodlanmaya devam eder. Kayıt bitince parçalar ffmpeg concat
+    ile yeniden kodlanmadan tek dosyada birleştirilir.
+
+    Ses taşımaz; ses ayrı bir dosyaya kodlanır ve kayıttan sonra birleştirilir.
+    """
+
+    input_pix_fmt = "bgra"
+    has_audio = False
+    needs_ffmpeg = True
+
+    def __init__(self, codec="libx264", workers=2, segment_seconds=2.0, slots_per_worker=None,
+                 preset="veryfast", crf=23, bitrate=None, threads=0, ffmpeg="ffmpeg", scale=1.0):
+        if workers < 1:
+            raise ValueError(f"Geçersiz işçi sayısı: {workers}")
+        if not threads:
+            # Süreçler aynı anda çalıştığından çekirdekler aralarında paylaştırılır
+            threads = max(1, (os.cpu_count() or 1) // workers)
+        self.settings = FFmpegEncoder(codec, preset=preset, crf=crf, bitrate=bitrate, threads=threads, ffmpeg=ffmpeg,
+                                      scale=scale)
+        self.name = f"parallel-{codec}"
+        self.codec = codec
+        self.workers = workers
+        self.segment_seconds = segment_seconds
+        self.slots_per_worker = slots_per_worker
+        self.ffmpeg = ffmpeg
+
+        self.filename = None
+        self.segment_frames = 0
+        self._procs = []
+        self._rings = []
+        self._results = None
+        self._segment_files = []
+        self._frames_written = 0
+        self._closed = False
+        self._error_text = ""
+        self._stats = None
+
+    def output_filename(self, filename):
+        return self.settings.output_filename(filename)
+
+    def open(self, filename, width, height, fps, audio_channels=None, audio_rate=None, audio_tracks=1):
+        self.filename = filename
+        self.segment_frames = max(1, int(round(self.segment_seconds * fps)))
+        slots = self.slots_per_worker or max(2, int(round(fps)))
+        video_args = self.settings.video_args()
+        self._results = multiprocessing.Queue()
+        try:
+            for worker_id in range(self.workers):
+                ring = SharedFrameRing((height, width, 4), capacity=slots, policy="block")
+                self._rings.append(ring)
+                process = multiprocessing.Process(
+                    target=_encode_worker, name=f"encoder-worker-{worker_id}",
+                    args=(worker_id, ring, self.segment_frames, os.path.splitext(filename), fps, video_args, self.ffmpeg,
+                          self._results))
+                process.daemon = True
+                process.start()
+                self._procs.append(process)
+        except Exception:
+            self._shutdown(timeout=5)
+            raise
+
+    def _segment_filename(self, index):
+        base, ext = os.path.splitext(self.filename)
+        return f"{base}.part{index:04d}{ext}"
+
+    def write(self, frame):
+        """Kareyi sıradaki parçanın sürecine verir; süreç geride kaldıysa boş yuva bekler."""
+        segment, offset = divmod(self._frames_written, self.segment_frames)
+        worker = segment % self.workers
+        if offset == 0:
+            self._segment_files.append(self._segment_filename(segment))
+        ring = self._rings[worker]
+        while True:
+            slot = ring.acquire_write(timeout=1.0)
+            if slot is not None:
+                break
+            if not self._procs[worker].is_alive():
+                raise RuntimeError(f"Kodlama süreci {worker} beklenmedik şekilde sonlandı.")
+        np.copyto(ring.slots[slot], frame)
+        ring.commit_write(slot, time.monotonic(), sequence=self._frames_written)
+        self._frames_written += 1
+
+    def close_video(self):
+        """Halkaları kapatır; süreçler kalan kareleri kodlayıp son parçalarını tamamlar."""
+        if self._closed:
+            return
+        self._closed = True
+        for ring in self._rings:
+            ring.close()
+
+    def finish(self, timeout=None):
+        """Parçaların kodlanmasını bekler, onları tek dosyada birleştirir ve çıkış kodunu döndürür."""
+        self.close_video()
+        segment_results = {}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while len(segment_results) < len(self._segment_files):
+            try:
+                worker_id, segment, returncode, frames, busy, stderr = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self._procs):
+                    self._error_text = "Kodlama süreçleri tüm parçaları bildirmeden sonlandı."
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    self._error_text = "Kodlama süreçleri zaman aşımına uğradı."
+                    break
+                continue
+            segment_results[segment] = (worker_id, returncode, frames, busy, stderr)
+        self._shutdown(timeout=5)
+        self._log_stats(segment_results)
+
+        failed = [s for s, r in segment_results.items() if r[1] != 0]
+        if failed or len(segment_results) < len(self._segment_files):
+            if failed:
+                self._error_text = segment_results[failed[0]][4] or f"Parça {failed[0]} kodlanamadı."
+            return 1
+        if not self._segment_files:
+            return 0
+        return self._concat()
+
+    def _concat(self):
+        """Parçaları yeniden kodlamadan (stream copy) hedef dosyada birleştirir; başarılıysa siler."""
+        list_file = os.path.splitext(self.filename)[0] + ".parts.ffconcat"
+        write_segment_index(list_file, self._segment_files)
+        returncode, stderr = concat_segments(list_file, self.filename, ffmpeg=self.ffmpeg)
+        if returncode != 0:
+            self._error_text = stderr
+        return returncode
+
+    @property
+    def segments(self):
+        """Birleştirilemeyip yerinde kalan parçalar (yoksa boş liste)."""
+        list_file = os.path.splitext(self.filename)[0] + ".parts.ffconcat" if self.filename else None
+        if list_file and os.path.exists(list_file):
+            return read_segment_index(list_file)
+        return []
+
+    def _shutdown(self, timeout):
+        for process in self._procs:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+        for ring in self._rings:
+            ring.detach()
+        self._rings = []
+
+    def _log_stats(self, segment_results):
+        per_worker = {}
+        for worker_id, _, frames, busy, _ in segment_results.values():
+            totals = per_worker.setdefault(worker_id, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += frames
+            totals[2] += busy
+        self._stats = {
+            worker_id: {"segments": segments, "frames": frames, "busy_s": busy,
+                        "fps": frames / busy if busy > 0 else 0.0}
+            for worker_id, (segments, frames, busy) in sorted(per_worker.items())
+        }
+        for worker_id, stats in self._stats.items():
+            log_print(f"Kodlama süreci {worker_id}: {stats['segments']} parça, {stats['frames']} kare, "
+                      f"{stats['fps']:.1f} kare/sn kodlama hızı")
+
+    def stats(self):
+        """Süreç başına parça sayısı, kare sayısı, meşgul süre ve kodlama hızı."""
+        return self._stats or {}
+
+    @property
+    def error_text(self):
+        return self._error_text
+
+    def describe(self):
+        return (f"{self.settings.describe()} x {self.workers} süreç, "
+                f"{self.segment_seconds:g} sn parçalar")
@@ -0,0 +1,187 @@
+"""Yakalama ve kodlama aşamaları arasındaki çerçeve tamponları."""
+import threading
+from collections import deque
+
+import numpy as np
+
+# Halka dolduğunda uygulanabilecek politikalar
+RING_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class FrameRing:
+    """Önceden ayrılmış, sınırlı sayıda çerçeve yuvasından oluşan halka tampon.
+
+    Yakalama thread'i ``acquire_write`` ile boş bir yuva alır, görüntüyü doğrudan
+    yuvanın içine yazar ve ``commit_write`` ile kuyruğa ekler. Tüketici
+    ``acquire_read`` ile en eski çerçevenin yuvasını alır, işi bitince
+    ``release_read`` ile yuvayı geri verir. Kayıt süresince yeni bellek ayrılmaz.
+    """
+
+    def __init__(self, shape, capacity=6, policy="drop_oldest", dtype=np.uint8):
+        if policy not in RING_POLICIES:
+            raise ValueError(f"Geçersiz halka politikası: {policy}")
+        if capacity < 2:
+            raise ValueError("Halka kapasitesi en az 2 olmalıdır.")
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.policy = policy
+        self.slots = [np.empty(self.shape, dtype=dtype) for _ in range(capacity)]
+        self.timestamps = [0.0] * capacity
+        self.sequence = [0] * capacity
+        # Karenin bir öncekine göre değişen döşeme oranı (kodlama aşaması için ipucu)
+        self.damage = [1.0] * capacity
+
+        self._free = deque(range(capacity))
+        self._filled = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._next_seq = 0
+
+        # Sayaçlar
+        self.frames_pushed = 0
+        self.frames_dropped = 0
+        self.frames_consumed = 0
+        self.max_queued = 0
+
+    @property
+    def queued(self):
+        """Tüketilmeyi bekleyen çerçeve sayısı."""
+        return len(self._filled)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def acquire_write(self, timeout=None):
+        """Yazmak için bir yuva indeksi döndürür; çerçeve düşürüldüyse None."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if self._free:
+                    return self._free.popleft()
+                if self.policy == "drop_oldest" and self._filled:
+                    # En eski bekleyen çerçeveyi feda et, yuvasını yeniden kullan
+                    self.frames_dropped += 1
+                    return self._filled.popleft()
+                if self.policy != "block":
+                    self.frames_dropped += 1
+                    return None
+                if not self._cond.wait(timeout):
+                    self.frames_dropped += 1
+                    return None
+
+    def commit_write(self, index, timestamp, sequence=None, damage=1.0):
+        """Doldurulan yuvayı tüketici kuyruğuna ekler.
+
+        ``sequence`` verilirse (ör. zamanlayıcının kare indeksi) sıra numarası
+        olarak o kullanılır; aksi halde sayaç bir artırılır.
+        """
+        with self._cond:
+            if sequence is None:
+                sequence = self._next_seq
+            self.timestamps[index] = timestamp
+            self.sequence[index] = sequence
+            self.damage[index] = damage
+            self._next_seq = sequence + 1
+            self._filled.append(index)
+            self.frames_pushed += 1
+            if len(self._filled) > self.max_queued:
+                self.max_queued = len(self._filled)
+            self._cond.notify_all()
+
+    def abort_write(self, index):
+        """Doldurulamayan yuvayı (ör. yakalama hatası) boş listeye geri koyar."""
+        with self._cond:
+            self._free.append(index)
+            self._cond.notify_all()
+
+    def acquire_read(self, timeout=None):
+        """Okunacak en eski yuvanın indeksini döndürür; bekleyen yoksa None."""
+        with self._cond:
+            if not self._filled and not self._closed:
+                self._cond.wait(timeout)
+            if self._filled:
+                return self._filled.popleft()
+            return None
+
+    def release_read(self, index):
+        """İşlenen yuvayı yeniden yazılabilmesi için serbest bırakır."""
+        with self._cond:
+            self._free.append(index)
+            self.frames_consumed += 1
+            self._cond.notify_all()
+
+    def is_drained(self):
+        """Halka kapatıldıysa ve bekleyen çerçeve kalmadıysa True döner."""
+        with self._cond:
+            return self._closed and not self._filled
+
+    def close(self):
+        """Yeni çerçeve kabulünü durdurur; bekleyen çerçeveler okunmaya devam eder."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        """Sayaçların anlık görüntüsünü sözlük olarak döndürür."""
+        with self._cond:
+            return {
+                "pushed": self.frames_pushed,
+                "consumed": self.frames_consumed,
+                "dropped": self.frames_dropped,
+                "queued": len(self._filled),
+                "max_queued": self.max_queued,
+                "capacity": self.capacity,
+                "policy": self.policy,
+            }
+
+
+def drain_ring(ring, write, convert, total_frames, on_frame=None):
+    """Halkadaki çerçeveleri sabit kare hızıyla ``write``'a aktarır; tekrarlanan kare sayısını döndürür.
+
+    Çerçevelerin sıra numarası zamanlayıcının kare indeksidir; aradaki boşluklar
+    (geç kalma veya düşürülen kare) son kare tekrarlanarak doldurulur. Son karenin
+    yuvası bir sonraki kare yazılana kadar tutulur, böylece tekrar için kopya gerekmez.
+    Halka kapanıp boşalınca çıktı ``total_frames()`` kareye tamamlanır. ``on_frame``
+    verilirse her yeni kare için yuva indeksiyle çağrılır. FrameRing ve
+    SharedFrameRing ile aynı şekilde çalışır.
+    """
+    held_slot = None
+    last_img = None
+    last_index = -1
+    duplicated = 0
+    while not ring.is_drained():
+        slot = ring.acquire_read(timeout=0.1)
+        if slot is None:
+            continue
+        frame_index = int(ring.sequence[slot])
+        gap = frame_index - last_index - 1
+        if last_img is not None:
+            # Boşluk yeni kare dönüştürülmeden yazılır; dönüştürücü çıktı tamponunu yeniden kullanabilir
+            for _ in range(gap):
+                write(last_img)
+            duplicated += gap
+        img = convert(ring.slots[slot])
+        if last_img is None:
+            # İlk kare gecikirse baştaki boşluk bu kareyle doldurulur (ortak saatle hizalı kalsın)
+            for _ in range(gap):
+                write(img)
+            duplicated += gap
+        write(img)
+        if on_frame is not None:
+            on_frame(slot)
+        if held_slot is not None:
+            ring.release_read(held_slot)
+        held_slot = slot
+        last_img = img
+        last_index = frame_index
+
+    # Dosya süresi kayıt süresiyle eşleşsin diye sonu son kareyle tamamla
+    if last_img is not None:
+        for _ in range(total_frames() - last_index - 1):
+            write(last_img)
+            duplicated += 1
+    if held_slot is not None:
+        ring.release_read(held_slot)
+    return duplicated
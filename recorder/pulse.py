@@ -0,0 +1,375 @@
+"""Linux'ta PulseAudio/PipeWire üzerinden, hariç tutulan uygulamalar olmadan uygulama sesi kaydı.
+
+Kayıt süresince iki sanal hoparlör açılır: ses dosyaya giden bir ``null``
+hoparlör ve hem bu hoparlöre hem varsayılan hoparlöre çalan bir
+``combine`` hoparlör. Varsayılan hoparlörde çalan ve hariç tutulmayan
+uygulama akışları combine hoparlöre taşınır; kullanıcı hepsini duymaya devam
+eder, kayıt ise yalnızca null hoparlörün monitöründen (``parec``) alınır.
+Hariç tutulan uygulamalar yerinde kalır ve kayda girmez. Kayıt bitince akışlar
+eski hoparlörlerine döner ve modüller kaldırılır.
+
+``pactl``/``parec`` komutları kullanılır; PipeWire'ın pipewire-pulse katmanı da
+aynı komutları destekler. ``server`` verilirse (ör. ``unix:/tmp/pa.sock``)
+tüm komutlar o sunucuya gider, böylece yerel bir null-sink PulseAudio
+örneğine karşı sınanabilir.
+"""
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from .log import log_print
+
+# Kayıt sırasında açılan sanal hoparlörlerin ad öneki; sonunda sürecin PID'i bulunur
+SINK_PREFIX = "screenrecord_"
+
+_SINK_INPUT_HEADER = re.compile(r"^Sink Input #(\d+)")
+_PROPERTY = re.compile(r'^([\w.\-]+) = "(.*)"$')
+_EVENT = re.compile(r"^Event '(\w+)' on sink-input #(\d+)")
+_STALE_SINK = re.compile(SINK_PREFIX + r"\w+?_(\d+)\b")
+
+
+def pulse_available():
+    """Linux'ta pactl ve parec PATH'te bulunuyorsa True döner."""
+    return sys.platform.startswith("linux") and shutil.which("pactl") is not None and shutil.which("parec") is not None
+
+
+def normalize_app_name(name):
+    """Uygulama adını platformdan bağımsız karşılaştırma için sadeleştirir (``Chrome.exe`` -> ``chrome``)."""
+    name = os.path.basename((name or "").strip()).lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+def parse_sink_inputs(text):
+    """``pactl list sink-inputs`` çıktısını ``{indeks: {"sink", "client", "properties"}}`` yapar."""
+    streams = {}
+    current = None
+    for line in text.splitlines():
+        header = _SINK_INPUT_HEADER.match(line)
+        if header:
+            current = {"sink": None, "client": None, "properties": {}}
+            streams[int(header.group(1))] = current
+            continue
+        if current is None:
+            continue
+        stripped = line.strip()
+        if stripped.startswith("Sink:"):
+            current["sink"] = stripped.split(":", 1)[1].strip()
+        elif stripped.startswith("Client:"):
+            current["client"] = stripped.split(":", 1)[1].strip()
+        else:
+            prop = _PROPERTY.match(stripped)
+            if prop:
+                current["properties"][prop.group(1)] = prop.group(2)
+    return streams
+
+
+class PulseClient:
+    """``pactl`` komutlarını (isteğe bağlı olarak belirli bir sunucuya) çalıştıran ince sarmalayıcı."""
+
+    def __init__(self, server=None, pactl="pactl"):
+        self.server = server or None
+        self.pactl = pactl
+        # Çıktı ayrıştırılıyor; yerelleştirilmiş başlıklar ("Hoparlör Girişi #") istenmez
+        self._env = dict(os.environ, LC_ALL="C")
+
+    def command(self, *args):
+        cmd = [self.pactl]
+        if self.server:
+            cmd += ["--server", self.server]
+        return cmd + list(args)
+
+    def run(self, *args):
+        result = subprocess.run(self.command(*args), capture_output=True, text=True, env=self._env)
+        if result.returncode != 0:
+            raise RuntimeError(f"pactl {' '.join(args)} başarısız: {result.stderr.strip()}")
+        return result.stdout
+
+    def default_sink(self):
+        for line in self.run("info").splitlines():
+            if line.startswith("Default Sink:"):
+                return line.split(":", 1)[1].strip()
+        raise RuntimeError("Varsayılan ses çıkışı bulunamadı.")
+
+    def sinks(self):
+        """Hoparlör adlarını indeksleriyle döndürür (``{ad: indeks}``)."""
+        sinks = {}
+        for line in self.run("list", "short", "sinks").splitlines():
+            parts = line.split("\t")
+            if len(parts) >= 2:
+                sinks[parts[1]] = parts[0]
+        return sinks
+
+    def modules(self):
+        """Yüklü modülleri ``(indeks, ad, argümanlar)`` olarak döndürür."""
+        modules = []
+        for line in self.run("list", "short", "modules").splitlines():
+            parts = line.split("\t")
+            if len(parts) >= 2:
+                modules.append((parts[0], parts[1], parts[2] if len(parts) > 2 else ""))
+        return modules
+
+    def sink_inputs(self):
+        return parse_sink_inputs(self.run("list", "sink-inputs"))
+
+    def load_module(self, name, *args):
+        return self.run("load-module", name, *args).strip()
+
+    def unload_module(self, index):
+        self.run("unload-module", str(index))
+
+    def move_sink_input(self, index, sink):
+        self.run("move-sink-input", str(index), sink)
+
+    def subscribe(self):
+        """Olayları satır satır yazan bir ``pactl subscribe`` süreci başlatır."""
+        return subprocess.Popen(self.command("subscribe"), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                text=True, env=self._env)
+
+
+class AppAudioExcluder:
+    """Hariç tutulan uygulamalar dışındaki uygulama seslerini kayda özel bir hoparlöre yönlendirir.
+
+    Akışların hangi sürece ait olduğu ``application.process.*`` özelliklerinden
+    okunur; özelliklerde ikili dosya adı yoksa ad ``/proc/<pid>/comm``'dan bir
+    kez okunup PID önbelleğinde tutulur. Tüm süreçler hiçbir zaman taranmaz.
+    ``pactl subscribe`` olayları yalnızca yeni ve kapanan akışları bildirir:
+    kapanan akış önbellekten düşer, yeni akışlar kısa bir bekleme sonrası
+    toplu olarak sınıflandırılır ve gerekirse taşınır; bilinen akışlar için
+    pactl çağrılmaz.
+    """
+
+    def __init__(self, excluded_apps, server=None, client=None, settle=0.05):
+        self.excluded = {normalize_app_name(name) for name in excluded_apps or [] if normalize_app_name(name)}
+        self.client = client or PulseClient(server)
+        self.settle = settle
+        suffix = os.getpid()
+        self.record_sink = f"{SINK_PREFIX}rec_{suffix}"
+        self.mix_sink = f"{SINK_PREFIX}mix_{suffix}"
+        self.default_sink = None
+        self._modules = []
+        self._streams = {}
+        self._routed = {}
+        self._pid_names = {}
+        self._lock = threading.Lock()
+        self._subscriber = None
+        self._thread = None
+        self.routed_total = 0
+        self.excluded_total = 0
+        self.lookups = 0
+
+    @property
+    def monitor_source(self):
+        """Kaydın okunacağı kaynak: kayıt hoparlörünün monitörü."""
+        return self.record_sink + ".monitor"
+
+    def start(self):
+        """Sanal hoparlörleri kurar, var olan akışları yönlendirir ve olayları dinlemeye başlar."""
+        client = self.client
+        self._unload_stale_modules()
+        self.default_sink = client.default_sink()
+        try:
+            self._modules.append(client.load_module(
+                "module-null-sink", f"sink_name={self.record_sink}",
+                f"sink_properties=device.description={self.record_sink}"))
+            self._modules.append(client.load_module(
+                "module-combine-sink", f"sink_name={self.mix_sink}", f"slaves={self.default_sink},{self.record_sink}",
+                f"sink_properties=device.description={self.mix_sink}"))
+            # Yeni hoparlöre otomatik geçiş (module-switch-on-connect) varsayılanı değiştirmiş olabilir
+            if client.default_sink() != self.default_sink:
+                client.run("set-default-sink", self.default_sink)
+            self._subscriber = client.subscribe()
+            self._thread = threading.Thread(target=self._watch, name="recorder-app-audio", daemon=True)
+            self._thread.start()
+            self.refresh()
+        except Exception:
+            self.stop()
+            raise
+        log_print(f"Uygulama sesi '{self.monitor_source}' kaynağından kaydedilecek; hariç tutulan: "
+                  f"{', '.join(sorted(self.excluded)) or 'yok'}")
+
+    def _unload_stale_modules(self):
+        """Çöken önceki kayıtlardan kalan (sahibi yaşamayan) sanal hoparlörleri kaldırır."""
+        for index, _, args in self.client.modules():
+            match = _STALE_SINK.search(args)
+            if match and not os.path.exists(f"/proc/{match.group(1)}") and int(match.group(1)) != os.getpid():
+                try:
+                    self.client.unload_module(index)
+                    log_print(f"Önceki kayıttan kalan ses modülü kaldırıldı: {args}")
+                except RuntimeError:
+                    pass
+
+    def app_name(self, info):
+        """Akışın ait olduğu uygulamanın sadeleştirilmiş adı; PID'den çözülen adlar önbelleğe alınır."""
+        properties = info["properties"]
+        binary = properties.get("application.process.binary")
+        pid = properties.get("application.process.id")
+        if binary:
+            return normalize_app_name(binary)
+        if pid:
+            name = self._pid_names.get(pid)
+            if name is None:
+                self.lookups += 1
+                try:
+                    with open(f"/proc/{pid}/comm", "r", encoding="utf-8") as f:
+                        name = normalize_app_name(f.read())
+                except OSError:
+                    name = ""
+                self._pid_names[pid] = name
+            if name:
+                return name
+        return normalize_app_name(properties.get("application.name"))
+
+    def is_excluded(self, info):
+        names = {self.app_name(info), normalize_app_name(info["properties"].get("application.name"))}
+        return bool(self.excluded & names)
+
+    def refresh(self):
+        """Önbellekte olmayan akışları sınıflandırır ve hariç tutulmayanları kayıt hoparlörüne taşır."""
+        streams = self.client.sink_inputs()
+        sinks = self.client.sinks()
+        default_index = sinks.get(self.default_sink)
+        with self._lock:
+            for index, info in streams.items():
+                if index in self._streams:
+                    continue
+                self._streams[index] = info
+                # Modüllerin kendi akışları (combine'ın çıkışları) bir istemciye ait değildir
+                if info["client"] in (None, "n/a"):
+                    continue
+                if self.is_excluded(info):
+                    self.excluded_total += 1
+                    log_print(f"Uygulama sesi kayda alınmıyor: {self.app_name(info)} (akış #{index})")
+                    continue
+                if info["sink"] != default_index:
+                    # Başka bir çıkışa çalan akışın hedefi değişmesin
+                    continue
+                try:
+                    self.client.move_sink_input(index, self.mix_sink)
+                except RuntimeError as e:
+                    log_print(f"Ses akışı #{index} yönlendirilemedi: {e}", level="warning")
+                    continue
+                self._routed[index] = self.default_sink
+                self.routed_total += 1
+
+    def forget(self, index):
+        """Kapanan akışı ve artık kullanılmayan PID adını önbellekten çıkarır."""
+        with self._lock:
+            info = self._streams.pop(index, None)
+            self._routed.pop(index, None)
+            if info is None:
+                return
+            pid = info["properties"].get("application.process.id")
+            if pid and all(other["properties"].get("application.process.id") != pid
+                           for other in self._streams.values()):
+                self._pid_names.pop(pid, None)
+
+    def _watch(self):
+        for line in iter(self._subscriber.stdout.readline, ""):
+            event = _EVENT.match(line)
+            if event is None:
+                continue
+            kind, index = event.group(1), int(event.group(2))
+            if kind == "remove":
+                self.forget(index)
+            elif kind == "new" and index not in self._streams:
+                # Aynı anda açılan akışlar tek bir listelemeyle işlenir; sonraki olayları önbellekte bulunur
+                time.sleep(self.settle)
+                try:
+                    self.refresh()
+                except RuntimeError as e:
+                    log_print(f"Ses akışları güncellenemedi: {e}", level="warning")
+
+    def stop(self):
+        """Akışları eski hoparlörlerine döndürür ve sanal hoparlörleri kaldırır."""
+        if self._subscriber is not None:
+            self._subscriber.terminate()
+            try:
+                self._subscriber.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._subscriber.kill()
+            self._subscriber = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._lock:
+            routed, self._routed = dict(self._routed), {}
+        for index, sink in routed.items():
+            try:
+                self.client.move_sink_input(index, sink)
+            except RuntimeError:
+                # Akış bu arada kapanmış olabilir
+                pass
+        # Önce combine hoparlör kaldırılır; null hoparlör onun çıkışıdır
+        for module in reversed(self._modules):
+            try:
+                self.client.unload_module(module)
+            except RuntimeError as e:
+                log_print(f"Ses modülü {module} kaldırılamadı: {e}", level="warning")
+        self._modules = []
+
+    def stats(self):
+        return {"routed": self.routed_total, "excluded": self.excluded_total, "active_streams": len(self._routed),
+                "pid_lookups": self.lookups}
+
+
+class PulseInputStream:
+    """Bir PulseAudio kaynağını ``parec`` ile okuyup PyAudio geri çağrı akışını taklit eden giriş.
+
+    Parçalar ``parec`` çıktısından tam ``chunk_size`` örnek olarak okunur ve
+    kendi thread'inden ``callback``'e verilir; ``parec`` düşük gecikme için
+    ``latency_ms`` ile başlatılır. ADC zaman damgası olmadığından AudioCapture
+    parçanın yakalanma anını bir tampon süresi önce kabul eder.
+    """
+
+    def __init__(self, callback, source, channels=2, rate=44100, chunk_size=1024, server=None, latency_ms=20,
+                 parec="parec"):
+        self.callback = callback
+        self.source = source
+        self.channels = channels
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.server = server or None
+        self.latency_ms = latency_ms
+        self.parec = parec
+        self._process = None
+        self._thread = None
+
+    def command(self):
+        cmd = [self.parec]
+        if self.server:
+            cmd += ["--server", self.server]
+        return cmd + [f"--device={self.source}", "--format=s16le", f"--rate={self.rate}",
+                      f"--channels={self.channels}", "--raw", f"--latency-msec={self.latency_ms}"]
+
+    def _run(self):
+        chunk_bytes = self.chunk_size * self.channels * 2
+        stdout = self._process.stdout
+        while True:
+            data = stdout.read(chunk_bytes)
+            if len(data) < chunk_bytes:
+                return
+            self.callback(data, self.chunk_size, None, 0)
+
+    def start_stream(self):
+        self._process = subprocess.Popen(self.command(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._thread = threading.Thread(target=self._run, name="recorder-parec", daemon=True)
+        self._thread.start()
+
+    def stop_stream(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def close(self):
+        self.stop_stream()
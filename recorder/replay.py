@@ -0,0 +1,114 @@
+"""Son N saniyeyi diskteki dairesel bir parça tamponunda tutan anlık tekrar kodlayıcısı."""
+import glob
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from .encoders import FFmpegEncoder
+from .log import log_print
+from .mux import CREATE_NO_WINDOW
+from .segments import write_segment_index
+
+# Matroska tüm kodlayıcıları (VP9, FFV1/FLAC dahil) taşır ve kümeleri artımlı yazar
+BUFFER_EXT = ".mkv"
+# Yazılmakta olan parça da okunabilsin: kümeler kısa tutulur ve her paket diske aktarılır.
+# Aksi halde parça ilk küme dolana kadar 0 bayttır ve kaydedilen tekrar parça sınırında biter.
+BUFFER_FORMAT_OPTIONS = "cluster_time_limit=250:flush_packets=1"
+
+
+class ReplayBufferEncoder(FFmpegEncoder):
+    """Kodlanmış görüntüyü geçici dizinde dönüşümlü (``-segment_wrap``) parçalara yazar.
+
+    Her parça zorlanmış bir anahtar kareyle başlar; tampon dolunca en eski parça,
+    yani bir anahtar kare sınırından başlayan en eski GOP grubu ezilir. Disk
+    kullanımı ``buffer_seconds`` ile sınırlıdır ve kalıcı dosya yazılmaz. ``save``
+    son ``buffer_seconds`` saniyeyi (o an yazılan parçanın diske aktarılmış
+    kümeleri dahil, başı parça sınırına yuvarlanarak) yeniden kodlamadan tek
+    dosyaya aktarır. ``finish`` tamponu siler.
+    """
+
+    def __init__(self, codec="libx264", buffer_seconds=30.0, segment_seconds=2.0, buffer_dir=None, **options):
+        super().__init__(codec, output_mode="segmented", segment_seconds=segment_seconds, **options)
+        if buffer_seconds <= 0:
+            raise ValueError(f"Geçersiz tampon süresi: {buffer_seconds}")
+        self.name = f"replay-{codec}"
+        self.buffer_seconds = buffer_seconds
+        self.buffer_dir = buffer_dir
+        # Kaydedilen parçalar + o an yazılan + ezilmeyi bekleyen bir yedek
+        self.segment_count = math.ceil(buffer_seconds / segment_seconds) + 2
+        self.saved = []
+        self._own_dir = False
+        self._save_lock = threading.Lock()
+
+    def video_args(self):
+        args = super().video_args()
+        if "-tag:v" in args:
+            # hvc1 etiketi yalnızca mp4 içindir; kaydederken eklenir
+            i = args.index("-tag:v")
+            del args[i:i + 2]
+        return args
+
+    def output_args(self, filename):
+        if self.buffer_dir is None:
+            self.buffer_dir = tempfile.mkdtemp(prefix="replay_")
+            self._own_dir = True
+        else:
+            os.makedirs(self.buffer_dir, exist_ok=True)
+        pattern = os.path.join(self.buffer_dir, "buffer%03d" + BUFFER_EXT)
+        return ["-f", "segment", "-segment_time", f"{self.segment_seconds:g}",
+                "-segment_wrap", str(self.segment_count), "-reset_timestamps", "1",
+                "-segment_format_options", BUFFER_FORMAT_OPTIONS], pattern
+
+    def _buffered_segments(self):
+        """Tampondaki parçaları eskiden yeniye sıralar (dönüşümlü adlar yazılma zamanına göre sıralanır)."""
+        files = glob.glob(os.path.join(glob.escape(self.buffer_dir), "buffer*" + BUFFER_EXT))
+        files = [f for f in files if os.path.getsize(f) > 0]
+        return sorted(files, key=os.path.getmtime)
+
+    def save(self, path=None, seconds=None):
+        """Tampondaki son ``seconds`` saniyeyi ``path``'e aktarır; ``(returncode, stderr, path)`` döndürür."""
+        seconds = self.buffer_seconds if seconds is None else min(seconds, self.buffer_seconds)
+        if path is None:
+            base, ext = os.path.splitext(self._filename)
+            path = f"{base}_{time.strftime('%Y%m%d_%H%M%S')}{ext}"
+        with self._save_lock:
+            files = self._buffered_segments()
+            if not files:
+                log_print("Anlık tekrar kaydedilemedi: tamponda henüz kare yok.", level="error")
+                return 1, "Tamponda henüz kare yok.", path
+            files = files[-(math.ceil(seconds / self.segment_seconds) + 1):]
+            list_file = os.path.join(self.buffer_dir, "save.ffconcat")
+            write_segment_index(list_file, files)
+            cmd = [self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-f", "concat", "-safe", "0",
+                   "-i", list_file, "-c", "copy"]
+            if self.codec == "libx265" and path.lower().endswith((".mp4", ".mov")):
+                cmd += ["-tag:v", "hvc1"]
+            cmd.append(path)
+            started = time.perf_counter()
+            result = subprocess.run(cmd, capture_output=True, text=True, creationflags=CREATE_NO_WINDOW)
+            os.remove(list_file)
+        if result.returncode == 0:
+            self.saved.append(path)
+            log_print(f"Anlık tekrar kaydedildi: {path} ({len(files)} parça, "
+                      f"{(time.perf_counter() - started) * 1000:.0f} ms)")
+        else:
+            log_print(f"Anlık tekrar kaydedilemedi: {result.stderr}", level="error")
+        return result.returncode, result.stderr, path
+
+    def finish(self, timeout=None):
+        """ffmpeg'i kapatır ve tamponu siler; kaydedilmemiş kareler atılır."""
+        returncode = self.muxer.wait(timeout=timeout)
+        with self._save_lock:
+            if self._own_dir:
+                shutil.rmtree(self.buffer_dir, ignore_errors=True)
+            else:
+                for segment_file in glob.glob(os.path.join(glob.escape(self.buffer_dir), "buffer*")):
+                    os.remove(segment_file)
+        return returncode
+
+    def describe_mode(self):
+        return f"anlık tekrar {self.buffer_seconds:g} sn"
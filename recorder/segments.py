@@ -0,0 +1,65 @@
+"""Parçalı (segment) kayıtların dizin dosyası ve yeniden kodlamadan birleştirilmesi."""
+import os
+import subprocess
+
+from .mux import CREATE_NO_WINDOW
+
+# single: tek dosya; fragmented: çökmede oynatılabilir kalan parçalı mp4/mkv;
+# segmented: sabit uzunlukta ayrı dosyalar + dizin, kayıt sonunda tek dosyada birleştirilir
+OUTPUT_MODES = ("single", "fragmented", "segmented")
+
+# mp4/mov: moov başta boş yazılır, her anahtar karede bir fragman kapanır
+FRAGMENTED_MP4_FLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+
+
+def segment_paths(filename):
+    """Kayıt dosyası için parça adı kalıbını (ffmpeg ``%05d``) ve dizin dosyasının yolunu döndürür."""
+    base, ext = os.path.splitext(filename)
+    return f"{base}.seg%05d{ext}", f"{base}.segments.ffconcat"
+
+
+def write_segment_index(index_path, files):
+    """Parça listesini ffmpeg concat demuxer'ın okuyabileceği ffconcat dosyasına yazar."""
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for segment_file in files:
+            escaped = os.path.abspath(segment_file).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def read_segment_index(index_path):
+    """Dizin dosyasındaki tamamlanmış parçaların mutlak yollarını sırayla döndürür."""
+    directory = os.path.dirname(os.path.abspath(index_path))
+    files = []
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith("file "):
+                continue
+            name = line[5:].strip()
+            if len(name) >= 2 and name[0] == name[-1] == "'":
+                name = name[1:-1].replace("'\\''", "'")
+            files.append(name if os.path.isabs(name) else os.path.join(directory, name))
+    return files
+
+
+def concat_segments(index_path, output_path, ffmpeg="ffmpeg", remove=True):
+    """Dizindeki parçaları stream copy ile tek dosyada birleştirir; ``(returncode, stderr)`` döndürür.
+
+    Başarılıysa ve ``remove`` açıksa parçalar ve dizin dosyası silinir. Kayıt
+    yarıda kaldıysa (çökme) dizinde yalnızca tamamlanmış parçalar bulunur, yarım
+    kalan son parça birleştirmeye girmez. ffmpeg bulunamazsa ``FileNotFoundError``
+    yükselir.
+    """
+    files = read_segment_index(index_path)
+    if not files:
+        return 1, "Dizinde tamamlanmış parça yok."
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-f", "concat", "-safe", "0",
+           "-i", index_path, "-c", "copy", output_path]
+    result = subprocess.run(cmd, capture_output=True, text=True, creationflags=CREATE_NO_WINDOW)
+    if result.returncode == 0 and remove:
+        for segment_file in files:
+            if os.path.exists(segment_file):
+                os.remove(segment_file)
+        os.remove(index_path)
+    return result.returncode, result.stderr
@@ -0,0 +1,237 @@
+"""Süreçler arasında paylaşılan bellekte tutulan çerçeve halka tamponu."""
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .pipeline import RING_POLICIES
+
+# Yuva durumları; geçersiz bir geçiş protokol hatasıdır (ör. iki kez serbest bırakma)
+SLOT_FREE, SLOT_WRITING, SLOT_READY, SLOT_READING = range(4)
+
+# Denetim alanının indeksleri
+(_FREE_HEAD, _FREE_COUNT, _FILLED_HEAD, _FILLED_COUNT, _CLOSED, _PUSHED, _CONSUMED, _DROPPED,
+ _OVERRUNS, _MAX_QUEUED, _TICKETS, _TOTAL_FRAMES) = range(12)
+_CONTROL_SIZE = 16
+_ALIGN = 64
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class SharedFrameRing:
+    """``multiprocessing.shared_memory`` üzerinde sabit boyutlu çerçeve yuvalarından oluşan halka.
+
+    FrameRing ile aynı üretici/tüketici arayüzünü sunar, fakat yuvalar ve küçük bir
+    başlık (yuva başına sıra numarası, zaman damgası, değişim oranı, durum ve
+    bilet) tek bir paylaşılan bellek bloğundadır. Halka nesnesi ``Process``
+    argümanı olarak alt sürece verilir; orada aynı bloğa bağlanır ve kareler
+    ``slots[i]`` görünümleri üzerinden kopyalanmadan okunur (pickle edilmez).
+
+    Boş/dolu yuva kuyrukları da paylaşılan bellekte tutulur ve süreçler arası bir
+    ``multiprocessing.Condition`` ile korunur; halka dolduğunda FrameRing'deki
+    politikalar (``drop_oldest``, ``drop_newest``, ``block``) uygulanır. Okuyucu her
+    karenin biletini bir öncekiyle karşılaştırır: üretici okunmamış kareleri
+    ezdiyse (taşma) aradaki kare sayısı ``overruns`` sayacına eklenir.
+
+    Belleği oluşturan süreç işi bitince ``detach`` ile bloğu kaldırır; alt
+    süreçlerdeki ``detach`` yalnızca bağlantıyı kapatır.
+    """
+
+    def __init__(self, shape, capacity=6, policy="drop_oldest"):
+        if policy not in RING_POLICIES:
+            raise ValueError(f"Geçersiz halka politikası: {policy}")
+        if capacity < 2:
+            raise ValueError("Halka kapasitesi en az 2 olmalıdır.")
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.policy = policy
+        self._cond = multiprocessing.Condition()
+        self._shm = shared_memory.SharedMemory(create=True, size=self._layout()[-1])
+        # fork ile başlayan alt süreç nesneyi pickle edilmeden devralır; sahiplik süreç kimliğiyle belirlenir
+        self._owner_pid = os.getpid()
+        self._last_ticket = -1
+        self._map()
+        self._control[:] = 0
+        self._control[_FREE_COUNT] = capacity
+        self._control[_TOTAL_FRAMES] = -1
+        self._free_queue[:] = np.arange(capacity)
+        self._state[:] = SLOT_FREE
+
+    def _layout(self):
+        """Başlık dizilerinin ve yuvaların bloktaki ofsetleri; son eleman toplam boyuttur."""
+        header = _CONTROL_SIZE + 7 * self.capacity
+        slots_offset = _aligned(header * 8)
+        frame_bytes = int(np.prod(self.shape))
+        return slots_offset, slots_offset + frame_bytes * self.capacity
+
+    def _map(self):
+        buf = self._shm.buf
+        cap = self.capacity
+        ints = np.ndarray((_CONTROL_SIZE + 5 * cap,), dtype=np.int64, buffer=buf)
+        self._control = ints[:_CONTROL_SIZE]
+        self._free_queue, self._filled_queue, self._state, self._ticket, self.sequence = (
+            ints[_CONTROL_SIZE + i * cap:_CONTROL_SIZE + (i + 1) * cap] for i in range(5))
+        floats = np.ndarray((2 * cap,), dtype=np.float64, buffer=buf, offset=ints.nbytes)
+        self.timestamps, self.damage = floats[:cap], floats[cap:]
+        slots_offset, _ = self._layout()
+        self.slots = np.ndarray((cap,) + self.shape, dtype=np.uint8, buffer=buf, offset=slots_offset)
+
+    def __getstate__(self):
+        return {"shape": self.shape, "capacity": self.capacity, "policy": self.policy,
+                "cond": self._cond, "shm": self._shm, "owner_pid": self._owner_pid}
+
+    def __setstate__(self, state):
+        self.shape = state["shape"]
+        self.capacity = state["capacity"]
+        self.policy = state["policy"]
+        self._cond = state["cond"]
+        self._shm = state["shm"]
+        self._owner_pid = state["owner_pid"]
+        self._last_ticket = -1
+        self._map()
+
+    @property
+    def name(self):
+        """Paylaşılan bellek bloğunun adı."""
+        return self._shm.name
+
+    @property
+    def queued(self):
+        """Tüketilmeyi bekleyen çerçeve sayısı."""
+        return int(self._control[_FILLED_COUNT])
+
+    @property
+    def closed(self):
+        return bool(self._control[_CLOSED])
+
+    @property
+    def total_frames(self):
+        """Üreticinin ``close`` ile bildirdiği toplam kare sayısı; bildirilmediyse None."""
+        total = int(self._control[_TOTAL_FRAMES])
+        return None if total < 0 else total
+
+    # Paylaşılan dairesel indeks kuyrukları (kilit tutulurken çağrılır)
+    def _push(self, queue, head, count, value):
+        queue[(self._control[head] + self._control[count]) % self.capacity] = value
+        self._control[count] += 1
+
+    def _pop(self, queue, head, count):
+        value = int(queue[self._control[head]])
+        self._control[head] = (self._control[head] + 1) % self.capacity
+        self._control[count] -= 1
+        return value
+
+    def _transition(self, index, expected, new):
+        if self._state[index] != expected:
+            raise RuntimeError(f"Yuva {index} beklenmeyen durumda: {int(self._state[index])} (beklenen {expected})")
+        self._state[index] = new
+
+    def acquire_write(self, timeout=None):
+        """Yazmak için bir yuva indeksi döndürür; çerçeve düşürüldüyse None."""
+        with self._cond:
+            while True:
+                if self._control[_CLOSED]:
+                    return None
+                if self._control[_FREE_COUNT]:
+                    index = self._pop(self._free_queue, _FREE_HEAD, _FREE_COUNT)
+                    self._transition(index, SLOT_FREE, SLOT_WRITING)
+                    return index
+                if self.policy == "drop_oldest" and self._control[_FILLED_COUNT]:
+                    # En eski bekleyen çerçeveyi feda et; okuyucu bileti atlandığında taşmayı görür
+                    self._control[_DROPPED] += 1
+                    index = self._pop(self._filled_queue, _FILLED_HEAD, _FILLED_COUNT)
+                    self._transition(index, SLOT_READY, SLOT_WRITING)
+                    return index
+                if self.policy != "block":
+                    self._control[_DROPPED] += 1
+                    return None
+                if not self._cond.wait(timeout):
+                    self._control[_DROPPED] += 1
+                    return None
+
+    def commit_write(self, index, timestamp, sequence=None, damage=1.0):
+        """Doldurulan yuvayı tüketici kuyruğuna ekler; ``sequence`` verilmezse bilet kullanılır."""
+        with self._cond:
+            self._transition(index, SLOT_WRITING, SLOT_READY)
+            ticket = int(self._control[_TICKETS])
+            self._control[_TICKETS] = ticket + 1
+            self._ticket[index] = ticket
+            self.sequence[index] = ticket if sequence is None else sequence
+            self.timestamps[index] = timestamp
+            self.damage[index] = damage
+            self._push(self._filled_queue, _FILLED_HEAD, _FILLED_COUNT, index)
+            self._control[_PUSHED] += 1
+            self._control[_MAX_QUEUED] = max(self._control[_MAX_QUEUED], self._control[_FILLED_COUNT])
+            self._cond.notify_all()
+
+    def abort_write(self, index):
+        """Doldurulamayan yuvayı (ör. yakalama hatası) boş kuyruğa geri koyar."""
+        with self._cond:
+            self._transition(index, SLOT_WRITING, SLOT_FREE)
+            self._push(self._free_queue, _FREE_HEAD, _FREE_COUNT, index)
+            self._cond.notify_all()
+
+    def acquire_read(self, timeout=None):
+        """Okunacak en eski yuvanın indeksini döndürür; bekleyen yoksa None."""
+        with self._cond:
+            if not self._control[_FILLED_COUNT] and not self._control[_CLOSED]:
+                self._cond.wait(timeout)
+            if not self._control[_FILLED_COUNT]:
+                return None
+            index = self._pop(self._filled_queue, _FILLED_HEAD, _FILLED_COUNT)
+            self._transition(index, SLOT_READY, SLOT_READING)
+            ticket = int(self._ticket[index])
+            if ticket > self._last_ticket + 1:
+                self._control[_OVERRUNS] += ticket - self._last_ticket - 1
+            self._last_ticket = ticket
+            return index
+
+    def release_read(self, index):
+        """İşlenen yuvayı yeniden yazılabilmesi için serbest bırakır."""
+        with self._cond:
+            self._transition(index, SLOT_READING, SLOT_FREE)
+            self._push(self._free_queue, _FREE_HEAD, _FREE_COUNT, index)
+            self._control[_CONSUMED] += 1
+            self._cond.notify_all()
+
+    def is_drained(self):
+        """Halka kapatıldıysa ve bekleyen çerçeve kalmadıysa True döner."""
+        with self._cond:
+            return bool(self._control[_CLOSED]) and not self._control[_FILLED_COUNT]
+
+    def close(self, total_frames=None):
+        """Yeni çerçeve kabulünü durdurur; ``total_frames`` okuyucuya çıktı uzunluğunu bildirir."""
+        with self._cond:
+            self._control[_CLOSED] = 1
+            if total_frames is not None:
+                self._control[_TOTAL_FRAMES] = total_frames
+            self._cond.notify_all()
+
+    def stats(self):
+        """Sayaçların anlık görüntüsünü sözlük olarak döndürür."""
+        with self._cond:
+            return {
+                "pushed": int(self._control[_PUSHED]),
+                "consumed": int(self._control[_CONSUMED]),
+                "dropped": int(self._control[_DROPPED]),
+                "overruns": int(self._control[_OVERRUNS]),
+                "queued": int(self._control[_FILLED_COUNT]),
+                "max_queued": int(self._control[_MAX_QUEUED]),
+                "capacity": self.capacity,
+                "policy": self.policy,
+            }
+
+    def detach(self):
+        """Bu süreçteki görünümleri ve bağlantıyı kapatır; oluşturan süreçte bloğu da kaldırır."""
+        if self._shm is None:
+            return
+        # Görünümler kapanmadan önce bırakılmalı, yoksa mmap kapatılamaz
+        self.slots = self.sequence = self.timestamps = self.damage = None
+        self._control = self._free_queue = self._filled_queue = self._state = self._ticket = None
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+        self._shm = None
@@ -0,0 +1,117 @@
+"""Kayıt yolunun görüntü aldığı yakalama kaynakları: canlı ekran, yapay desen ve video dosyası.
+
+Her kaynak ``mss.mss`` ile aynı küçük arayüzü sunar: ``monitors`` listesi,
+``grab(region)`` (``raw``, ``width``, ``height`` taşıyan bir görüntü) ve
+``close``. Böylece motor, kompozitör ve arayüz kaynağı bilmeden çalışır;
+yapay ve dosya kaynaklarıyla iş hacmi ve zamanlama ekransız, tekrarlanabilir
+biçimde sınanabilir.
+"""
+import time
+
+import cv2
+import mss
+
+from .synthetic import SyntheticScreen, SyntheticShot, capture_region
+
+CAPTURE_SOURCES = ("mss", "synthetic", "file")
+
+
+class VideoFileSource:
+    """Var olan bir video dosyasının karelerini ekran görüntüsü gibi döndürür.
+
+    ``rate`` 0 ise her ``grab`` dosyadaki bir sonraki kareyi verir (yakalama
+    hızından bağımsız, tamamen belirlenimci). ``rate`` verilirse kareler
+    ``clock`` saatine göre saniyede ``rate`` kare ilerler: yakalama daha hızlıysa
+    aynı kare tekrarlanır, daha yavaşsa aradaki kareler atlanır. Duraklamayı
+    dışlamak için ``CaptureClock.now`` verilebilir. ``loop`` açıkken dosya
+    bitince başa dönülür, kapalıyken son kare tutulur.
+    """
+
+    def __init__(self, path, rate=0.0, loop=True, clock=time.monotonic):
+        if rate < 0:
+            raise ValueError(f"Geçersiz oynatma hızı: {rate}")
+        self.path = path
+        self.rate = rate
+        self.loop = loop
+        self._clock = clock
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise RuntimeError(f"Video dosyası açılamadı: {path}")
+        self.width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.file_fps = self._capture.get(cv2.CAP_PROP_FPS) or 0.0
+        self.monitors = [{"left": 0, "top": 0, "width": self.width, "height": self.height},
+                         {"left": 0, "top": 0, "width": self.width, "height": self.height}]
+        self.frame_count = 0
+        self.position = -1
+        self.loops = 0
+        self._frame = None
+        self._started = None
+
+    def _target_position(self):
+        if not self.rate:
+            return self.frame_count
+        now = self._clock()
+        if self._started is None:
+            self._started = now
+        return int((now - self._started) * self.rate)
+
+    def _advance(self, target):
+        # Atlanan kareler yalnızca çözülür, renk dönüşümü hedef karede yapılır
+        while self.position < target:
+            if not self._capture.grab():
+                if not self.loop and self._frame is not None:
+                    self.position = target
+                    break
+                self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                if not self._capture.grab():
+                    raise RuntimeError(f"Video dosyasından kare okunamadı: {self.path}")
+                self.loops += 1
+            self.position += 1
+            if self.position == target:
+                ok, bgr = self._capture.retrieve()
+                if not ok:
+                    raise RuntimeError(f"Video dosyasından kare okunamadı: {self.path}")
+                self._frame = cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA)
+
+    def grab(self, region):
+        """Sıradaki (veya zamanı gelen) karenin ``region`` bölgesini yeni bir tamponda döndürür."""
+        self._advance(self._target_position())
+        self.frame_count += 1
+        frame = capture_region(self._frame, region)
+        return SyntheticShot(frame.reshape(-1).data, region["width"], region["height"])
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def create_capture_source(settings=None, clock=None):
+    """settings.json'daki ``capture_source`` ayarına göre yeni bir yakalama kaynağı açar.
+
+    Kaynaklar thread'ler arasında paylaşılmaz; her yakalama thread'i kendi
+    kaynağını açıp kapatır (mss de thread'e özeldir).
+    """
+    settings = settings or {}
+    kind = settings.get("capture_source", "mss")
+    if kind == "synthetic":
+        return SyntheticScreen(int(settings.get("synthetic_width", 1920)), int(settings.get("synthetic_height", 1080)),
+                               seed=int(settings.get("synthetic_seed", 0)),
+                               change_rate=float(settings.get("synthetic_change_rate", 1.0)))
+    if kind == "file":
+        path = settings.get("capture_source_file")
+        if not path:
+            raise ValueError("Dosya yakalama kaynağı için 'capture_source_file' ayarı gerekli.")
+        return VideoFileSource(path, rate=float(settings.get("capture_source_rate", 0)),
+                               loop=bool(settings.get("capture_source_loop", True)),
+                               clock=clock or time.monotonic)
+    if kind != "mss":
+        raise ValueError(f"Bilinmeyen yakalama kaynağı: {kind}")
+    return mss.mss()
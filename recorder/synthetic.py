@@ -0,0 +1,100 @@
+"""Ekran gerektirmeyen, mss ile aynı arayüzü sunan yapay görüntü kaynağı."""
+import numpy as np
+
+
+class SyntheticShot:
+    """mss ScreenShot'ın kayıt yolunun kullandığı kısmı: ham BGRA baytları ve boyut."""
+
+    __slots__ = ("raw", "width", "height")
+
+    def __init__(self, raw, width, height):
+        self.raw = raw
+        self.width = width
+        self.height = height
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def bgra(self):
+        return bytes(self.raw)
+
+
+def capture_region(image, region):
+    """(H, W, 4) görüntüden ``region`` bölgesini yeni bir tampona kopyalar; taşan kısım siyah kalır."""
+    left, top = region["left"], region["top"]
+    width, height = region["width"], region["height"]
+    frame = np.zeros((height, width, 4), dtype=np.uint8)
+    src_x, src_y = max(0, left), max(0, top)
+    dst_x, dst_y = src_x - left, src_y - top
+    view = image[src_y:src_y + height - dst_y, src_x:src_x + width - dst_x]
+    frame[dst_y:dst_y + view.shape[0], dst_x:dst_x + view.shape[1]] = view
+    return frame
+
+
+class SyntheticScreen:
+    """Belirlenimci (seed'li) bir masaüstü deseni üreten ``mss.mss`` yerine geçen nesne.
+
+    Arka plan (renk geçişi ve metin satırlarını andıran bloklar) bir kez çizilir;
+    her ``grab`` onu yeni bir tampona kopyalar ve üzerine her karede yer
+    değiştiren bir pencere çizer. mss'te olduğu gibi her yakalama yeni bir bayt
+    tamponu ayırır, böylece bellek ve kopya maliyeti gerçek yakalamaya yakındır.
+    Xvfb'de veya ekransız ortamda kıyaslama ve testler için kullanılır.
+
+    ``change_rate`` (0-1) yakalamaların ne kadarında görüntünün değiştiğidir:
+    1 her karede, 0.25 her dört karede bir, 0 hiçbir zaman (durağan ekran).
+    Değişimler rastgele değil eşit aralıklıdır, aynı ayarla aynı kare dizisi üretilir.
+    """
+
+    def __init__(self, width=1920, height=1080, seed=0, change_rate=1.0):
+        if not 0 <= change_rate <= 1:
+            raise ValueError(f"Geçersiz değişim oranı: {change_rate}")
+        self.width = width
+        self.height = height
+        self.change_rate = change_rate
+        self.monitors = [{"left": 0, "top": 0, "width": width, "height": height},
+                         {"left": 0, "top": 0, "width": width, "height": height}]
+        self.frame_count = 0
+        self.changes = 0
+        self._change_credit = 0.0
+        self._background = self._render_background(np.random.default_rng(seed))
+
+    def _render_background(self, rng):
+        height, width = self.height, self.width
+        image = np.empty((height, width, 4), dtype=np.uint8)
+        image[..., 0] = np.linspace(40, 200, width, dtype=np.uint8)[None, :]
+        image[..., 1] = np.linspace(60, 160, height, dtype=np.uint8)[:, None]
+        image[..., 2] = 90
+        image[..., 3] = 255
+        # Metin satırlarını andıran, kodlayıcıya gerçekçi ayrıntı veren küçük bloklar
+        for _ in range(max(1, width * height // 4000)):
+            x, y = int(rng.integers(0, width - 8)), int(rng.integers(0, height - 4))
+            image[y:y + 4, x:x + int(rng.integers(2, 8))] = rng.integers(0, 256, 4, dtype=np.uint8)
+        return image
+
+    def grab(self, region):
+        """``region`` (left, top, width, height) için sıradaki kareyi döndürür."""
+        self._change_credit += self.change_rate
+        if self._change_credit >= 1.0:
+            self._change_credit -= 1.0
+            self.changes += 1
+        width, height = region["width"], region["height"]
+        frame = capture_region(self._background, region)
+        # Köşegen boyunca kayan pencere: her değişimde konumu ve rengi değişir
+        box_w, box_h = max(1, width // 4), max(1, height // 4)
+        offset = self.changes * 8
+        x = offset % max(1, width - box_w)
+        y = offset % max(1, height - box_h)
+        frame[y:y + box_h, x:x + box_w, :3] = (self.changes * 3) % 256
+        self.frame_count += 1
+        return SyntheticShot(frame.reshape(-1).data, width, height)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()